@@ -33,6 +33,7 @@ import franz.openrdf.repository
 import franz.openrdf.repository.repositoryconnection
 import franz.openrdf.repository.repository
 import franz.openrdf.repository.repositoryresult
+import franz.openrdf.query.statementbatch
 import franz.openrdf.sail.spec
 import franz.openrdf.sail
 import franz.openrdf.sail.allegrographserver
@@ -41,7 +41,10 @@ setup(name='agraph-python',
       # To use these, install like this: pip install agraph-python-client[curl]
       extras_require={
           'simplejson': ['simplejson>=2.0.9'],
-          'curl': ['pycurl>=7.19.0,<8.0']
+          'orjson': ['orjson;python_version>="3.6"'],
+          'ujson': ['ujson'],
+          'curl': ['pycurl>=7.19.0,<8.0'],
+          'aiohttp': ['aiohttp>=3.3.0;python_version>="3.5"']
       },
       classifiers=[
           'Development Status :: 5 - Production/Stable',
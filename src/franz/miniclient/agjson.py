@@ -7,6 +7,7 @@
 
 from __future__ import print_function, unicode_literals
 
+import os
 import sys
 
 # JSON abstraction layer
@@ -21,15 +22,200 @@ class JsonDecodeError(Exception):
     pass
 
 
-def encode_json(value):
-    return json.dumps(value)
+# Names of supported JSON libraries, in order of preference.
+JSON_CODECS = ('orjson', 'ujson', 'rapidjson', 'simplejson', 'json')
+
+
+class _Codec(object):
+    """
+    Encoding and decoding functions of a JSON library.
+
+    ``loads`` must accept UTF-8 bytes as well as strings.
+    ``ascii_only`` is true if ``dumps`` escapes all non-ASCII characters.
+    ``parses_bytes`` is true if ``loads`` parses bytes without
+    converting them to a string first.
+    """
+    def __init__(self, name, dumps, loads, ascii_only=True, parses_bytes=False):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self.ascii_only = ascii_only
+        self.parses_bytes = parses_bytes
+
+
+# Maps ASCII digits to b'0' and all other bytes to b' ' (see _orjson_loads).
+_DIGITS_TABLE = bytes(bytearray(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256)))
+
+# orjson decodes integers that do not fit in 64 bits as floats. Integers
+# that short have fewer digits than this.
+_LONG_INTEGER = b'0' * 19
+
+
+def _make_codec(name):
+    """
+    Create a codec for a JSON library.
+
+    :raises ImportError: If the library is not installed.
+    :raises ValueError: If the name is not one of JSON_CODECS.
+    """
+    if name == 'orjson':
+        import orjson
+
+        def dumps(value):
+            return orjson.dumps(value).decode('utf-8')
+
+        def loads(text):
+            data = text if isinstance(text, bytes) else text.encode('utf-8')
+            # Documents with long runs of digits (possibly inside strings)
+            # are left to the standard decoder, which keeps large integers.
+            if _LONG_INTEGER in data.translate(_DIGITS_TABLE):
+                raise ValueError('Integer might not fit in 64 bits')
+            return orjson.loads(data)
+        return _Codec(name, dumps, loads, ascii_only=False, parses_bytes=True)
+    if name == 'ujson':
+        import ujson
+        return _Codec(name, ujson.dumps, ujson.loads)
+    if name == 'rapidjson':
+        import rapidjson
+        return _Codec(name, rapidjson.dumps, rapidjson.loads)
+    if name == 'simplejson':
+        import simplejson
+        return _Codec(name, simplejson.dumps, simplejson.loads)
+    if name == 'json':
+        import json as stdlib_json
+        if sys.version_info[0] > 2 and sys.version_info < (3, 6):
+            # Older versions only accept Unicode strings.
+            def loads(text):
+                if isinstance(text, bytes):
+                    text = text.decode('utf-8')
+                return stdlib_json.loads(text)
+            return _Codec(name, stdlib_json.dumps, loads)
+        return _Codec(name, stdlib_json.dumps, stdlib_json.loads)
+    raise ValueError('Unknown JSON codec: %s (supported: %s)' % (name, ', '.join(JSON_CODECS)))
+
+
+def set_json_codec(name=None):
+    """
+    Select the JSON library used to encode requests and decode responses.
+
+    By default the first installed library from :data:`JSON_CODECS` is used
+    (unless the ``AG_JSON_CODEC`` environment variable names another one).
+    The setting applies to the whole process.
+
+    Documents that a faster library cannot handle are processed with
+    the standard ``json`` module instead. This includes all documents
+    with integers that might not fit in 64 bits when orjson is used,
+    since orjson would decode them as floats.
+
+    :param name: Library name (``'orjson'``, ``'ujson'``, ``'rapidjson'``,
+                 ``'simplejson'`` or ``'json'``), or ``None`` to choose
+                 the fastest available library.
+    :type name: string
+    :raises ImportError: If the library is not installed.
+    """
+    global _codec
+    if name is None:
+        for candidate in JSON_CODECS:
+            try:
+                _codec = _make_codec(candidate)
+                return
+            except ImportError:
+                pass
+    else:
+        _codec = _make_codec(name)
+
+
+def get_json_codec():
+    """
+    Return the name of the JSON library currently in use (see :func:`set_json_codec`).
+
+    :rtype: string
+    """
+    return _codec.name
+
+
+def prefers_bytes():
+    """
+    Return ``True`` if the current library parses UTF-8 bytes directly.
+
+    Other libraries decode bytes to a string internally, so for large
+    responses it is cheaper to convert the body to a string as soon as it
+    is received and release the bytes before parsing.
+
+    :rtype: bool
+    """
+    return _codec.parses_bytes
+
+
+_codec = None
+set_json_codec(os.environ.get('AG_JSON_CODEC') or None)
+
+
+def encode_json(value, ensure_ascii=False):
+    """
+    Convert a value to a JSON string.
+
+    :param value: Value to convert.
+    :param ensure_ascii: If ``True`` the result will only contain
+                         ASCII characters (e.g. for use in HTTP headers).
+    :type ensure_ascii: bool
+    :rtype: str
+    """
+    if ensure_ascii and not _codec.ascii_only:
+        return json.dumps(value)
+    try:
+        return _codec.dumps(value)
+    except (TypeError, ValueError, OverflowError):
+        # Faster libraries support fewer types (e.g. non-string keys),
+        # fall back to the standard encoder.
+        if _codec.dumps is json.dumps:
+            raise
+        return json.dumps(value)
 
 
 def decode_json(text):
-    # JSON on Py3 insists on getting Unicode strings
-    if sys.version_info[0] > 2 and isinstance(text, bytes):
-        text = text.decode('utf-8')
+    """
+    Parse a JSON document.
+
+    :param text: JSON text, a string or UTF-8 encoded bytes.
+    :type text: str|bytes
+    :raises JsonDecodeError: If the text is not valid JSON.
+    """
+    try:
+        return _codec.loads(text)
+    except (ValueError, OverflowError):
+        # Faster libraries reject some valid documents (e.g. integers
+        # that do not fit in 64 bits, which the orjson codec refuses rather
+        # than let orjson turn them into floats), try the standard decoder.
+        pass
+    if _codec.loads is json.loads:
+        raise JsonDecodeError
     try:
+        if sys.version_info[0] > 2 and isinstance(text, bytes):
+            text = text.decode('utf-8')
         return json.loads(text)
     except ValueError:
         raise JsonDecodeError
+
+
+_decoder = json.JSONDecoder()
+
+
+def decode_json_prefix(text, start=0):
+    """
+    Decode a JSON value that starts at a given position in a string.
+
+    Any characters following the value are ignored.
+
+    :param text: JSON text.
+    :type text: str
+    :param start: Index of the first character of the value.
+    :type start: int
+    :return: The decoded value and the index of the first character after it.
+    :rtype: (object, int)
+    :raises JsonDecodeError: If there is no complete JSON value at the given position.
+    """
+    try:
+        return _decoder.raw_decode(text, start)
+    except ValueError:
+        raise JsonDecodeError
@@ -0,0 +1,129 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+An asynchronous variant of the mini-client repository.
+
+This module requires Python 3.5 or later and the aiohttp package.
+"""
+
+from franz.miniclient.agjson import encode_json
+from .asyncrequest import jsonRequest, nullRequest
+from .repository import Repository
+from .request import urlenc
+
+
+class AsyncRepository(Repository):
+    """
+    A repository whose request methods are coroutines.
+
+    Only the methods defined here are asynchronous, all other methods
+    are inherited from :class:`~franz.miniclient.repository.Repository`
+    and perform blocking requests.
+
+    Create instances by calling ``_instance_from_url(AsyncRepository)``
+    on an existing repository object.
+    """
+
+    async def getSize(self, context=None):
+        """Returns the amount of triples in the repository."""
+        return await jsonRequest(self, "GET", "/size", urlenc(context=context))
+
+    async def listContexts(self):
+        """Lists the contexts (named graphs) that are present in this repository."""
+        return [t["contextID"] for t in await jsonRequest(self, "GET", "/contexts")]
+
+    async def evalSparqlQuery(self, query, infer=False, context=None, namedContext=None, callback=None,
+                              bindings=None, planner=None, checkVariables=None, count=False, accept=None,
+                              analyze=False, analysisTechnique=None, analysisTimeout=None, update=False):
+        """Execute a SPARQL query, see Repository.evalSparqlQuery."""
+        method, url, body, accept = self._sparqlQueryRequest(
+            query, infer=infer, context=context, namedContext=namedContext, bindings=bindings,
+            planner=planner, checkVariables=checkVariables, count=count, accept=accept,
+            analyze=analyze, analysisTechnique=analysisTechnique, analysisTimeout=analysisTimeout,
+            update=update)
+        return await jsonRequest(self, method, url, body, callback=callback, accept=accept)
+
+    async def evalPrologQuery(self, query, infer=False, callback=None, limit=None, count=False, accept=None):
+        """Execute a Prolog query. Returns a {names, values} object."""
+        if accept is None:
+            accept="text/integer" if count else "application/json"
+        return await jsonRequest(self, "POST", self.url,
+                                 urlenc(query=query, infer=infer, queryLn="prolog", limit=limit),
+                                 callback=callback,
+                                 accept=accept)
+
+    async def commit(self):
+        await nullRequest(self, "POST", "/commit")
+
+    async def rollback(self):
+        await nullRequest(self, "POST", "/rollback")
+
+    async def getStatements(self, subj=None, pred=None, obj=None, context=None, infer=False, callback=None,
+                            limit=None, offset=None, accept=None, tripleIDs=False, count=False):
+        """Retrieve all statements matching the given constraints,
+        see Repository.getStatements."""
+        if subj == [] or pred == [] or obj == [] or context == []: return []
+        method, url, body, accept = self._getStatementsRequest(
+            subj, pred, obj, context, infer=infer, limit=limit, offset=offset,
+            accept=accept, tripleIDs=tripleIDs, count=count)
+        return await jsonRequest(self, method, url, body, callback=callback, accept=accept)
+
+    async def addStatement(self, subj, pred, obj, context=None, attributes=None):
+        """Add a single statement to the repository."""
+        args = {
+            'subj': subj,
+            'pred': pred,
+            'obj': obj,
+            'context': context,
+            'attributes': attributes and encode_json(attributes)
+        }
+        await nullRequest(self, "PUT", "/statement?" + urlenc(**args))
+
+    async def deleteMatchingStatements(self, subj=None, pred=None, obj=None, context=None):
+        """Delete all statements matching the constraints from the
+        repository. Context can be None or a single graph name."""
+        await nullRequest(self, "DELETE", "/statements",
+                          urlenc(subj=subj, pred=pred, obj=obj, context=context))
+
+    async def addStatements(self, quads, commitEvery=None):
+        """Add a collection of statements to the repository,
+        see Repository.addStatements."""
+        await nullRequest(self, "POST", "/statements?" +
+                          urlenc(commit=commitEvery),
+                          encode_json(quads), content_type="application/json")
+
+    async def deleteStatements(self, quads):
+        """Delete a collection of statements from the repository."""
+        await nullRequest(self, "POST", "/statements/delete", encode_json(quads),
+                          content_type="application/json")
+
+    async def openSession(self, autocommit=False, lifetime=None, loadinitfile=False):
+        self.oldUrl = self.url
+        self.url = await jsonRequest(self, "POST", "/session?" + urlenc(autoCommit=autocommit,
+            lifetime=lifetime, loadInitFile=loadinitfile))
+        # Pings are sent from a background thread using the blocking backend,
+        # so they do not depend on the event loop being responsive.
+        self._enableSession(lifetime)
+
+    async def closeSession(self):
+        if not self.sessionAlive: return
+        # Notify pingSession() of session close
+        self.sessionAlive.set()
+        self.sessionAlive = None
+        try: await nullRequest(self, "POST", "/session/close")
+        except Exception: pass
+        if hasattr(self, "oldUrl"): self.url = self.oldUrl
+
+    async def getGeneration(self):
+        return await jsonRequest(self, 'GET', '/generation')
+
+    def __del__(self):
+        # We cannot send requests from here, but we can at least stop the
+        # ping thread - the session will then expire on the server.
+        if self.sessionAlive:
+            self.sessionAlive.set()
@@ -0,0 +1,64 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Asynchronous counterparts of :func:`franz.miniclient.request.jsonRequest`
+and :func:`franz.miniclient.request.nullRequest`.
+
+This module requires Python 3.5 or later and the aiohttp package.
+"""
+
+import franz.miniclient.backends.aiohttp as backend
+
+from franz.openrdf.util.http import merge_headers
+from franz.miniclient.request import RequestError, parse_json_response
+
+# Note: this can be mocked in unit tests, be careful when changing the way
+# the import works.
+makeRequest = backend.makeRequest
+
+
+async def jsonRequest(obj, method, url, body=None, content_type="application/x-www-form-urlencoded",
+                      callback=None, accept=None, headers=None):
+    """
+    Create a request that expects a JSON response.
+
+    This is a coroutine, see :func:`franz.miniclient.request.jsonRequest`
+    for a description of all parameters.
+
+    :return: A parsed JSON response or ``None`` if the response was processed by a callback.
+    :rtype: dict|string|int|float|None
+    """
+    if accept is None:
+        accept = "application/json"
+
+    headers = merge_headers(obj.getHeaders(), headers)
+    if callback is None:
+        status, body = await makeRequest(obj, method, url, body, accept, content_type,
+                                         headers=headers)
+        return parse_json_response(status, body, accept)
+    else:
+        def raiseErr(status, message): raise RequestError(status, message)
+        await makeRequest(obj, method, url, body, accept, content_type, callback=callback,
+                          errCallback=raiseErr, headers=headers)
+
+
+async def nullRequest(obj, method, url, body=None, content_type="application/x-www-form-urlencoded",
+                      content_encoding=None):
+    """
+    Create a request that expects an empty response body.
+
+    This is a coroutine, see :func:`franz.miniclient.request.nullRequest`
+    for a description of all parameters.
+    """
+    headers = None
+    if content_encoding is not None:
+        headers = ['Content-Encoding: ' + content_encoding]
+    status, body = await makeRequest(obj, method, url, body, "application/json", content_type,
+                                     headers=merge_headers(obj.getHeaders(), headers))
+    if status < 200 or status > 204:
+        raise RequestError(status, body)
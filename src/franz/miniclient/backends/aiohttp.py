@@ -0,0 +1,247 @@
+###############################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials
+# are made available under the terms of the Eclipse Public License v1.0
+# which accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+###############################################################################
+
+"""
+An aiohttp-based implementation of an asynchronous HTTP backend.
+
+This module requires Python 3.5 or later. Unlike the other backends
+it is not selected automatically - it is used by the asynchronous
+API (see :mod:`franz.miniclient.asyncrequest`).
+
+All requests made from a single event loop share one client session,
+and thus one pool of keep-alive connections, so a single thread can
+have many requests in flight at the same time.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import os
+import ssl
+import weakref
+
+import aiohttp
+from yarl import URL
+
+from franz.openrdf.util.strings import to_native_string
+from franz.openrdf.util.http import normalize_headers
+
+# Public symbols
+__all__ = ['makeRequest', 'closeSessions']
+
+# size of the buffer used to read responses
+BUFFER_SIZE = 4096
+
+# Maximum number of simultaneous connections per event loop.
+# Changes affect only sessions created after the change.
+MAX_CONNECTIONS = 100
+
+# Time (in seconds) after which idle keep-alive connections are closed.
+KEEPALIVE_TIMEOUT = 30
+
+# Maps event loops to client sessions.
+_sessions = weakref.WeakKeyDictionary()
+
+# SSL contexts, indexed by (cainfo, sslcert, verifyhost, verifypeer).
+_ssl_contexts = {}
+
+
+def get_session():
+    """
+    Retrieve or create the client session used by the current event loop.
+
+    :return: A client session with a pool of keep-alive connections.
+    :rtype: aiohttp.ClientSession
+    """
+    loop = asyncio.get_event_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS,
+                                         keepalive_timeout=KEEPALIVE_TIMEOUT)
+        # The other backends do not limit the duration of a request either.
+        session = aiohttp.ClientSession(connector=connector,
+                                        timeout=aiohttp.ClientTimeout(total=None))
+        _sessions[loop] = session
+    return session
+
+
+async def closeSessions():
+    """
+    Close the client session used by the current event loop (if any),
+    along with all its keep-alive connections.
+
+    This should be called before the event loop is closed.
+    """
+    session = _sessions.pop(asyncio.get_event_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def get_ssl_context(obj):
+    """
+    Emulate curl's way of handling SSL.
+
+    :param obj: A service object containing auth and config information.
+    :type obj: franz.miniclient.repository.Service
+    :return: A context object, ``False`` (meaning: do not verify certificates)
+             or ``None`` (default settings).
+    :rtype: ssl.SSLContext|bool|None
+    """
+    key = (obj.cainfo, obj.sslcert, obj.verifyhost, obj.verifypeer)
+    if key == (None, None, None, None):
+        return None
+    if obj.sslcert is None and obj.verifypeer is not None and not obj.verifypeer:
+        return False
+    context = _ssl_contexts.get(key)
+    if context is None:
+        if obj.cainfo is not None and os.path.isdir(obj.cainfo):
+            context = ssl.create_default_context(capath=obj.cainfo)
+        else:
+            context = ssl.create_default_context(cafile=obj.cainfo)
+        if obj.sslcert is not None:
+            # Client certificate
+            context.load_cert_chain(obj.sslcert)
+        if obj.verifyhost is not None and not obj.verifyhost:
+            # Check the certificate, but do not verify that the hostname matches it.
+            context.check_hostname = False
+        if obj.verifypeer is not None and not obj.verifypeer:
+            # Disable certificate validation
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        _ssl_contexts[key] = context
+    return context
+
+
+def get_proxy(obj):
+    """
+    Get the proxy address in the format expected by aiohttp.
+
+    :param obj: A service object containing auth and config information.
+    :type obj: franz.miniclient.repository.Service
+    :return: Proxy URL or ``None``.
+    :rtype: string
+    """
+    if obj.proxy is None:
+        return None
+    if obj.proxy_type != 'http':
+        raise ValueError('Unsupported proxy type for the aiohttp backend: %s' % obj.proxy_type)
+    return 'http://%s:%s' % (obj.proxy_host, obj.proxy_port)
+
+
+async def retrying_request(session, method, url, **kwargs):
+    """
+    Send a request, retrying in case of connection errors.
+
+    Like the requests backend we only retry if the connection could
+    not be established, so the request could not have been processed.
+
+    :return: The response object.
+    :rtype: aiohttp.ClientResponse
+    """
+    # Delay before next retry (in seconds).
+    retry = 0.1
+
+    while True:
+        try:
+            return await session.request(method, url, **kwargs)
+        except aiohttp.ClientConnectorError:
+            # Keep retrying until the delay reaches two seconds,
+            # just like the curl backend does.
+            if retry >= 2.0:
+                raise
+            await asyncio.sleep(retry)
+            # The retry period will grow exponentially.
+            retry *= 2
+
+
+async def makeRequest(obj, method, url, body=None, accept=None, contentType=None, callback=None,
+                      errCallback=None, headers=None):
+    """
+    Send an HTTP request to given URL.
+
+    This is a coroutine, otherwise it works exactly like
+    :func:`franz.miniclient.backends.requests.makeRequest`.
+
+    :param obj: A service object containing auth and config information.
+    :type obj: franz.miniclient.repository.Service
+    :param method: Request method ("GET", "POST", ...).
+    :type method: string
+    :param url: Target address
+    :type url: string
+    :param body: Request body (for PUT/POST requests) or query string, optional.
+    :type body: basestring|file
+    :param accept: Value of the accept header (default: */*)
+    :type accept: string
+    :param contentType: MIME type of the request body, optional.
+    :type contentType: string
+    :param callback: Function that will receive the response data.
+                     It will be called multiple times per request.
+                     The return value should be either None or the number of bytes
+                     received, anything else will cause the request to be aborted.
+    :type callback: (bytestring) -> int
+    :param errCallback: Invoked if the server returned an error.
+                        Used only if `callback` is not `None`.
+    :type errCallback: (int, string) -> None
+    :param headers: Either a dictionary mapping headers to values or
+                    a list of strings that will be included in the request's headers.
+    :type headers: Iterable[string] | dict[string, string] | None
+    :return: Status code and response body, unless callback is specified (in that case None is returned).
+    :rtype: (int, string) | None
+    """
+    if accept is None:
+        accept = "*/*"
+    session = get_session()
+
+    # Get the full url
+    url = to_native_string(url)
+    if not url.startswith("http:") and not url.startswith("https:"):
+        url = to_native_string(obj.url) + url
+
+    method = method.upper()
+    if method in ('PUT', 'POST'):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+    else:
+        data = None
+        if body:
+            url = url + "?" + to_native_string(body)
+
+    # Note that this will create a copy if necessary, so we're not changing the argument
+    headers = normalize_headers(headers)
+    headers['accept'] = accept
+    if contentType:
+        headers['content-type'] = contentType
+    if obj.runAsName:
+        headers['x-masquerade-as-user'] = obj.runAsName
+
+    auth = None
+    if obj.user is not None and obj.password is not None:
+        auth = aiohttp.BasicAuth(to_native_string(obj.user), to_native_string(obj.password))
+
+    # Arguments are already quoted by urlenc, do not let yarl requote them.
+    response = await retrying_request(session, method, URL(url, encoded=True),
+                                      data=data, headers=headers, auth=auth,
+                                      proxy=get_proxy(obj), ssl=get_ssl_context(obj))
+    async with response:
+        if callback is not None:
+            if response.status == 204:
+                callback(await response.read())
+            elif 200 <= response.status < 300:
+                async for chunk in response.content.iter_chunked(BUFFER_SIZE):
+                    callback_result = callback(chunk)
+                    # Simulate curl's behavior
+                    if callback_result is not None and callback_result != len(chunk):
+                        break
+            else:
+                message = to_native_string(await response.read())
+                if errCallback is None:
+                    response.raise_for_status()
+                else:
+                    errCallback(response.status, message)
+        else:
+            # Note: no error callback in this case
+            return response.status, to_native_string(await response.read())
@@ -15,6 +15,7 @@ from __future__ import print_function
 import pycurl
 
 import os
+import re
 import threading
 import time
 import io
@@ -25,9 +26,10 @@ from past.builtins import unicode, basestring
 from future.utils import iteritems
 
 from franz.openrdf.util.strings import to_native_string, to_bytes
+from franz.openrdf.util.http import batch_request_arguments
 
 # Public symbols
-__all__ = ['makeRequest']
+__all__ = ['makeRequest', 'makeRequests', 'configure_pool', 'PoolExhaustedError']
 
 # A simple way of checking if we're on pycurl>=7.19.3
 if hasattr(pycurl, 'NOPROXY'):
@@ -44,8 +46,45 @@ else:
         return value          
     
 
+# Default settings of the curl handle pool, see configure_pool().
+POOL_MAX_IN_USE = None
+POOL_MAX_IDLE = 16
+POOL_IDLE_TIMEOUT = 60.0
+
+# Settings passed to pools created by Pool.instance()
+_pool_settings = {}
+
 curlPool = None
 
+
+class PoolExhaustedError(Exception):
+    """
+    Raised if a curl object cannot be retrieved from the pool,
+    because the maximum number of objects in use for a host has been
+    reached (and waiting is disabled or has timed out).
+    """
+    pass
+
+
+class _Partition(object):
+    """
+    Curl objects and statistics of a single host.
+    """
+    def __init__(self, lock):
+        # Notified when an object for this host is returned to the pool.
+        # Waiters for other hosts are not woken up.
+        self.returned = threading.Condition(lock)
+        # Pairs (curl object, time of return), oldest first.
+        self.idle = []
+        self.in_use = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.evictions = 0
+        self.connects = 0
+
+
 class Pool(object):
     """
     A pool of curl objects.
@@ -54,7 +93,13 @@ class Pool(object):
     pool to avoid the need of creating a fresh object at each request.
 
     A new connection is created only when there are no connections left
-    in the pool.
+    in the pool. Objects are kept separately for each host (curl objects
+    cache connections, so there is no point in reusing an object that
+    talks to a different server).
+
+    The pool can limit the number of objects in use and the number of
+    idle objects, and closes objects that have been idle for too long.
+    See :func:`configure_pool`.
     """
     @staticmethod
     def instance():
@@ -75,42 +120,140 @@ class Pool(object):
         # the first one assigned to curlPool will just
         # lose a reference and be deleted - not a big deal.
         if curlPool is None or curlPool.pid != pid:
-            curlPool = Pool(pycurl.Curl, pid)
+            curlPool = Pool(pycurl.Curl, pid, **_pool_settings)
 
         return curlPool
 
-    def __init__(self, create, pid):
+    def __init__(self, create, pid, max_in_use=POOL_MAX_IN_USE, max_idle=POOL_MAX_IDLE,
+                 idle_timeout=POOL_IDLE_TIMEOUT, wait=True, wait_timeout=None):
         """
         Initialize a pool.
 
         :param create: Function used to create new connections.
         :param pid: PID of the process creating the pool.
+        :param max_in_use: See :func:`configure_pool`.
+        :param max_idle: See :func:`configure_pool`.
+        :param idle_timeout: See :func:`configure_pool`.
+        :param wait: See :func:`configure_pool`.
+        :param wait_timeout: See :func:`configure_pool`.
         """
         self.create = create
         self.pid = pid
         self.lock = threading.Lock()
-        self.pool = []
+        # Maps host keys (see pool_key) to partitions.
+        self.partitions = {}
+        self.configure(max_in_use, max_idle, idle_timeout, wait, wait_timeout)
 
-    def get(self):
+    def configure(self, max_in_use=POOL_MAX_IN_USE, max_idle=POOL_MAX_IDLE,
+                  idle_timeout=POOL_IDLE_TIMEOUT, wait=True, wait_timeout=None):
         """
-        Retrieve a connection from the pool.
+        Change the limits of this pool. See :func:`configure_pool`.
+        """
+        with self.lock:
+            self.max_in_use = max_in_use
+            self.max_idle = max_idle
+            self.idle_timeout = idle_timeout
+            self.wait = wait
+            self.wait_timeout = wait_timeout
+            # The limit might have been raised.
+            for partition in self.partitions.values():
+                partition.returned.notify_all()
+
+    def _partition(self, key):
+        partition = self.partitions.get(key)
+        if partition is None:
+            partition = self.partitions[key] = _Partition(self.lock)
+        return partition
+
+    def _evict_expired(self, now):
+        """
+        Remove objects that have been idle for too long.
+        Must be called with the lock held.
 
-        The result should be returned after use (see :meth:`.put`).
+        :return: A list of curl objects to be closed (outside the lock).
         """
-        self.lock.acquire()
-        try:
-            value = self.pool.pop()
-        except IndexError:
-            value = None
-        finally:
-            self.lock.release()
+        evicted = []
+        if self.idle_timeout is None:
+            return evicted
+        deadline = now - self.idle_timeout
+        for partition in self.partitions.values():
+            idle = partition.idle
+            count = 0
+            while count < len(idle) and idle[count][1] < deadline:
+                count += 1
+            if count:
+                evicted.extend(value for value, _returned in idle[:count])
+                del idle[:count]
+                partition.evictions += count
+        return evicted
+
+    def get(self, key=None, wait=None):
+        """
+        Retrieve a connection from the pool.
 
-        # Create new ones outside the lock
-        return value or self.create()
+        The result should be returned after use (see :meth:`.put`).
 
-    def put(self, value):
+        :param key: Host the connection will be used for (see :func:`pool_key`).
+        :type key: string
+        :param wait: What to do if the in-use limit has been reached.
+                     Overrides the ``wait`` setting of the pool if not ``None``.
+        :type wait: bool
+        :raises PoolExhaustedError: If the limit has been reached and we
+                                    could not (or were not allowed to) wait.
+        """
+        if wait is None:
+            wait = self.wait
+        value = None
+        with self.lock:
+            now = time.time()
+            evicted = self._evict_expired(now)
+            partition = self._partition(key)
+            waiting_since = None
+            try:
+                while self.max_in_use is not None and partition.in_use >= self.max_in_use:
+                    if not wait:
+                        raise PoolExhaustedError(
+                            'All %d connections to %s are in use.' % (self.max_in_use, key))
+                    if waiting_since is None:
+                        waiting_since = now
+                        partition.waits += 1
+                    remaining = None
+                    if self.wait_timeout is not None:
+                        remaining = waiting_since + self.wait_timeout - now
+                        if remaining <= 0:
+                            raise PoolExhaustedError(
+                                'Timed out waiting for one of %d connections to %s.'
+                                % (self.max_in_use, key))
+                    partition.returned.wait(remaining)
+                    now = time.time()
+            finally:
+                if waiting_since is not None:
+                    partition.wait_time += now - waiting_since
+            partition.in_use += 1
+            if partition.idle:
+                value = partition.idle.pop()[0]
+                partition.hits += 1
+            else:
+                partition.misses += 1
+
+        # Close and create objects outside the lock
+        for old in evicted:
+            old.close()
+        if value is None:
+            try:
+                value = self.create()
+            except:
+                self.put(None, key)
+                raise
+        return value
+
+    def put(self, value, key=None):
         """
         Return a connection to the pool.
+
+        :param value: The connection (``None`` to only release the in-use slot).
+        :param key: Key passed to :meth:`.get`.
+        :type key: string
         """
         # We could call value.reset() here before returning the curl object
         # to the pool for pycurl version >= 7.19.0 if the C code for reset
@@ -120,11 +263,109 @@ class Pool(object):
         # dies a quick death.
         # Note that this is fixed in pycurl 7.19.0.1 and patched in the RPM
         # package for pycurl 7.19.0 for CentOS 6.
-        self.lock.acquire()
-        try:
-            self.pool.append(value)
-        finally:
-            self.lock.release()
+        connects = value.getinfo(pycurl.NUM_CONNECTS) if value is not None else 0
+        with self.lock:
+            now = time.time()
+            evicted = self._evict_expired(now)
+            partition = self._partition(key)
+            partition.in_use -= 1
+            partition.connects += connects
+            if value is not None:
+                if self.max_idle is not None and len(partition.idle) >= self.max_idle:
+                    evicted.append(value)
+                    partition.evictions += 1
+                else:
+                    partition.idle.append((value, now))
+            partition.returned.notify()
+        for old in evicted:
+            old.close()
+
+    def stats(self, key=None):
+        """
+        Get usage statistics.
+
+        The result is a dictionary with the following entries:
+
+           - ``in_use``: number of objects currently in use.
+           - ``idle``: number of idle objects in the pool.
+           - ``hits``: number of requests served by a pooled object.
+           - ``misses``: number of requests that had to create a new object.
+           - ``waits``: number of requests that had to wait for an object.
+           - ``wait_time``: total time spent waiting (in seconds).
+           - ``evictions``: number of idle objects that have been closed.
+           - ``connects``: number of connections opened by requests.
+
+        :param key: A host (see :func:`pool_key`). If ``None`` statistics
+                    for all hosts are summed up.
+        :type key: string
+        :rtype: dict
+        """
+        with self.lock:
+            if key is None:
+                partitions = list(self.partitions.values())
+            else:
+                partitions = [self.partitions[key]] if key in self.partitions else []
+            result = dict(in_use=0, idle=0, hits=0, misses=0, waits=0,
+                          wait_time=0.0, evictions=0, connects=0)
+            for partition in partitions:
+                result['in_use'] += partition.in_use
+                result['idle'] += len(partition.idle)
+                for name in ('hits', 'misses', 'waits', 'wait_time', 'evictions', 'connects'):
+                    result[name] += getattr(partition, name)
+            return result
+
+
+def configure_pool(max_in_use=POOL_MAX_IN_USE, max_idle=POOL_MAX_IDLE,
+                   idle_timeout=POOL_IDLE_TIMEOUT, wait=True, wait_timeout=None):
+    """
+    Change the settings of the pool of curl objects used by all requests.
+
+    Each curl object keeps its own keep-alive connection, so these
+    settings also limit the number of connections to each server.
+    All limits apply to each host separately.
+
+    :param max_in_use: Maximum number of requests performed at the same time
+                       (``None`` means no limit).
+    :type max_in_use: int
+    :param max_idle: Maximum number of idle objects kept in the pool,
+                     additional objects (and their connections) are closed
+                     when returned (``None`` means no limit).
+    :type max_idle: int
+    :param idle_timeout: Objects idle for longer than this (in seconds) are
+                         closed (``None`` means never).
+    :type idle_timeout: float
+    :param wait: If ``True`` requests made when ``max_in_use`` has been reached
+                 wait for an object to be returned to the pool, otherwise
+                 :class:`PoolExhaustedError` is raised.
+    :type wait: bool
+    :param wait_timeout: Maximum time to wait (in seconds, ``None`` means forever).
+                         :class:`PoolExhaustedError` is raised on timeout.
+    :type wait_timeout: float
+    """
+    global _pool_settings
+    _pool_settings = dict(max_in_use=max_in_use, max_idle=max_idle,
+                          idle_timeout=idle_timeout, wait=wait,
+                          wait_timeout=wait_timeout)
+    Pool.instance().configure(**_pool_settings)
+
+
+_origin = re.compile(r'^https?://[^/?#]*')
+
+
+def pool_key(obj, url):
+    """
+    Get the key of the pool partition used for a request.
+
+    :param obj: A service object.
+    :type obj: franz.miniclient.repository.Service
+    :param url: Request URL (absolute or relative to the service URL).
+    :type url: string
+    :return: Scheme, host and port of the URL.
+    :rtype: string
+    """
+    url = to_native_string(url)
+    match = _origin.match(url) or _origin.match(to_native_string(obj.url))
+    return match.group(0) if match else None
 
 
 def normalize_headers(headers):
@@ -204,13 +445,16 @@ _proxy_types = {
 }
 
 
-def makeRequest(obj, method, url, body=None, accept=None, contentType=None, callback=None, errCallback=None, headers=None):
+def prepare_request(curl, obj, method, url, body=None, accept=None, contentType=None, callback=None, headers=None):
     """
-    Send a request to the server.
+    Set all options of a curl object, except for the write and header functions.
 
-    See :func:`franz.miniclient.backends.requests.makeRequest` for documentation.
+    See :func:`franz.miniclient.backends.requests.makeRequest` for
+    a description of the arguments.
+
+    :param curl: Curl object to be configured.
+    :type curl: pycurl.Curl
     """
-    curl = Pool.instance().get()
 
     # TODO: Just make this an option
     # Uncomment these 5 lines to see pycurl debug output
@@ -288,43 +532,199 @@ def makeRequest(obj, method, url, body=None, accept=None, contentType=None, call
     if headers is None:
         headers = []
     headers.extend(["Connection: keep-alive", "Accept: " + to_native_string(accept), "Expect:"])
-    if callback: headers.append("Connection: close")
     if contentType: headers.append("Content-Type: " + to_native_string(contentType))
     if obj.runAsName: headers.append("x-masquerade-as-user: " + to_native_string(obj.runAsName))
     curl.setopt(pycurl.HTTPHEADER, headers)
     curl.setopt(pycurl.ENCODING, "")  # which means 'any encoding that curl supports'
 
-    if callback:
-        status = [None]
-        error = []
-
-        # Called by curl for each header line.
-        # The first line will contain the status code and that is
-        # the only part we're interested in.
-        def headerfunc(string):
-            if status[0] is None:
-                # Parse the status code if this is the first line.
-                status[0] = int(unicode(string, 'utf-8').split(" ")[1])
-            # return input length to indicate "no errors".
-            return len(string)
-
-        # Called by curl for each block of data received.
-        # The argument will be a bytestring.
-        def writefunc(string):
-            if status[0] == 200: callback(string)
-            else: error.append(unicode(string, 'utf-8'))
-
-        curl.setopt(pycurl.WRITEFUNCTION, writefunc)
-        curl.setopt(pycurl.HEADERFUNCTION, headerfunc)
-        retrying_perform(curl)
-        if status[0] != 200:
-            errCallback(curl.getinfo(pycurl.RESPONSE_CODE), "".join(error))
-    else:
+
+def makeRequest(obj, method, url, body=None, accept=None, contentType=None, callback=None, errCallback=None, headers=None,
+                raw=False):
+    """
+    Send a request to the server.
+
+    See :func:`franz.miniclient.backends.requests.makeRequest` for documentation.
+    """
+    pool = Pool.instance()
+    key = pool_key(obj, url)
+    curl = pool.get(key)
+    try:
+        prepare_request(curl, obj, method, url, body, accept, contentType, callback, headers)
+        if callback:
+            return perform_streaming(curl, callback, errCallback)
         buf = io.BytesIO()
         curl.setopt(pycurl.WRITEFUNCTION, buf.write)
         retrying_perform(curl)
-        response = to_native_string(buf.getvalue())
-        buf.close()
-        result = (curl.getinfo(pycurl.RESPONSE_CODE), response)
-        Pool.instance().put(curl)
-        return result
+        return curl.getinfo(pycurl.RESPONSE_CODE), buffer_contents(buf, raw)
+    finally:
+        # Curl handles (and the connections they cache) stay usable
+        # after a failed or aborted transfer, so they always go back
+        # to the pool.
+        pool.put(curl, key)
+
+
+def buffer_contents(buf, raw):
+    """
+    Extract a response body from a buffer and release the buffer.
+
+    On Python 3 ``getvalue()`` hands over the buffer's memory instead of
+    copying it, so with ``raw`` set the body is never copied.
+
+    :param buf: Buffer containing the response.
+    :type buf: io.BytesIO
+    :param raw: If ``True`` return bytes, otherwise a native string.
+    :type raw: bool
+    :rtype: bytes|str
+    """
+    body = buf.getvalue()
+    buf.close()
+    return body if raw else to_native_string(body)
+
+
+def perform_streaming(curl, callback, errCallback):
+    """
+    Perform a request, passing the response body to a callback.
+
+    See :func:`makeRequest` for a description of the arguments.
+
+    :param curl: Curl object storing request parameters.
+    :type curl: pycurl.Curl
+    """
+    status = [None]
+    error = []
+
+    # Called by curl for each header line.
+    # The first line will contain the status code and that is
+    # the only part we're interested in.
+    def headerfunc(string):
+        if status[0] is None:
+            # Parse the status code if this is the first line.
+            status[0] = int(unicode(string, 'utf-8').split(" ")[1])
+        # return input length to indicate "no errors".
+        return len(string)
+
+    # Called by curl for each block of data received.
+    # The argument will be a bytestring.
+    # The value returned by callback is passed to curl, so the callback
+    # can abort the transfer (anything other than None or len(string)).
+    def writefunc(string):
+        if status[0] == 200: return callback(string)
+        else: error.append(unicode(string, 'utf-8'))
+
+    curl.setopt(pycurl.WRITEFUNCTION, writefunc)
+    curl.setopt(pycurl.HEADERFUNCTION, headerfunc)
+    try:
+        retrying_perform(curl)
+    finally:
+        # The handle will be reused by requests that do not set a header
+        # function. HEADERFUNCTION cannot be unset, so install a cheap
+        # function that accepts every header instead.
+        curl.setopt(pycurl.HEADERFUNCTION, len)
+    if status[0] != 200:
+        errCallback(curl.getinfo(pycurl.RESPONSE_CODE), "".join(error))
+
+
+# Default maximum number of requests executed at the same time by makeRequests.
+BATCH_CONCURRENCY = 10
+
+_multi = threading.local()
+
+
+def get_multi():
+    """
+    Retrieve or construct the multi handle used by the current thread.
+
+    Connections opened by easy handles attached to a multi handle
+    are kept in the connection cache of that multi handle, so we
+    reuse one handle per thread to keep those connections alive
+    between batches.
+
+    :rtype: pycurl.CurlMulti
+    """
+    pid = os.getpid()
+    if getattr(_multi, 'pid', None) != pid:
+        _multi.handle = pycurl.CurlMulti()
+        _multi.pid = pid
+    return _multi.handle
+
+
+def makeRequests(obj, batch, max_concurrency=None, raw=False):
+    """
+    Send multiple requests to the server concurrently.
+
+    All requests are performed by the calling thread,
+    using a curl multi handle.
+
+    :param obj: A service object containing auth and config information.
+    :type obj: franz.miniclient.repository.Service
+    :param batch: A sequence of argument tuples. Each tuple contains the
+                  ``method``, ``url``, ``body``, ``accept``, ``contentType``
+                  and ``headers`` arguments of :func:`makeRequest` (in that order).
+                  Trailing arguments may be omitted.
+    :type batch: Iterable[tuple]
+    :param max_concurrency: Maximum number of requests in flight
+                            (default: :data:`BATCH_CONCURRENCY`).
+    :type max_concurrency: int
+    :param raw: If ``True`` response bodies are returned as bytes.
+    :type raw: bool
+    :return: A list of (status code, response body) pairs, in the same order as ``batch``.
+    :rtype: list[(int, string)]
+    """
+    pool = Pool.instance()
+    multi = get_multi()
+    limit = max_concurrency or BATCH_CONCURRENCY
+    pending = list(enumerate(batch))
+    pending.reverse()
+    results = [None] * len(pending)
+    # Maps active curl handles to (index, buffer) pairs.
+    active = {}
+    # Curl handles taken from the pool, mapped to pool keys.
+    taken = {}
+    try:
+        while pending or active:
+            while pending and len(active) < limit:
+                index, args = pending[-1]
+                key = pool_key(obj, args[1])
+                try:
+                    # Do not wait for the pool while we are the ones who
+                    # can free some handles by completing our requests.
+                    curl = pool.get(key, wait=None if not active else False)
+                except PoolExhaustedError:
+                    if not active:
+                        raise
+                    break
+                pending.pop()
+                taken[curl] = key
+                prepare_request(curl, obj, **batch_request_arguments(args))
+                buf = io.BytesIO()
+                curl.setopt(pycurl.WRITEFUNCTION, buf.write)
+                active[curl] = (index, buf)
+                multi.add_handle(curl)
+
+            while True:
+                ret, _num_handles = multi.perform()
+                if ret != pycurl.E_CALL_MULTI_PERFORM:
+                    break
+
+            while True:
+                queued, done, failed = multi.info_read()
+                for curl in done:
+                    multi.remove_handle(curl)
+                    index, buf = active.pop(curl)
+                    results[index] = (curl.getinfo(pycurl.RESPONSE_CODE),
+                                      buffer_contents(buf, raw))
+                    pool.put(curl, taken.pop(curl))
+                for curl, code, message in failed:
+                    raise pycurl.error(code, message)
+                if not queued:
+                    break
+
+            if active:
+                multi.select(1.0)
+    finally:
+        # Only reached with active handles if something went wrong.
+        for curl in active:
+            multi.remove_handle(curl)
+        for curl, key in iteritems(taken):
+            pool.put(curl, key)
+    return results
@@ -14,7 +14,9 @@ from __future__ import absolute_import
 
 import atexit
 import contextlib
+import io
 import sys
+from multiprocessing.pool import ThreadPool
 
 import requests
 import requests.packages.urllib3 as urllib3
@@ -24,14 +26,21 @@ from requests.packages.urllib3.util.retry import Retry
 from pkg_resources import parse_version
 
 from franz.openrdf.util.strings import to_native_string
-from franz.openrdf.util.http import normalize_headers
+from franz.openrdf.util.http import batch_request_arguments, normalize_headers
 
 # Public symbols
-__all__ = ['makeRequest']
+__all__ = ['makeRequest', 'makeRequests']
 
 # size of the buffer used to read responses
 BUFFER_SIZE = 4096
 
+# Size of chunks read when a whole response body is needed.
+CONTENT_BUFFER_SIZE = 1024 * 1024
+
+# Default maximum number of requests executed at the same time by makeRequests.
+# This matches the default size of the connection pool used by requests.
+BATCH_CONCURRENCY = 10
+
 # Configure a retry strategy similar to what the curl backend does
 retries = Retry(backoff_factor=0.1,
                 connect=10,   # 10 retries for connection-level errors
@@ -125,7 +134,8 @@ def create_session(obj):
     return session
 
 
-def makeRequest(obj, method, url, body=None, accept=None, contentType=None, callback=None, errCallback=None, headers=None):
+def makeRequest(obj, method, url, body=None, accept=None, contentType=None, callback=None, errCallback=None, headers=None,
+                raw=False):
     """
     Send an HTTP request to given URL.
 
@@ -156,6 +166,10 @@ def makeRequest(obj, method, url, body=None, accept=None, contentType=None, call
     :param headers: Either a dictionary mapping headers to values or
                     a list of strings that will be included in the request's headers.
     :type headers: Iterable[string] | dict[string, string] | None
+    :param raw: If ``True`` the response body is returned as bytes
+                instead of being converted to a native string.
+                Used to avoid copying large responses.
+    :type raw: bool
     :return: Status code and response body, unless callback is specified (in that case None is returned).
     :rtype: (int, string) | None
     """
@@ -215,5 +229,61 @@ def makeRequest(obj, method, url, body=None, accept=None, contentType=None, call
                                     decode_content=True)))
         else:
             # Note: no error callback in this case
-            return response.status_code, to_native_string(response.content)
+            content = read_content(response)
+            return response.status_code, content if raw else to_native_string(content)
+
+
+def read_content(response):
+    """
+    Read the whole (decompressed) body of a streamed response.
+
+    Unlike ``response.content``, which joins a list of chunks,
+    this needs little more memory than the body itself.
+
+    :rtype: bytes
+    """
+    buf = io.BytesIO()
+    for chunk in response.iter_content(CONTENT_BUFFER_SIZE):
+        buf.write(chunk)
+    # Does not copy the buffer on Python 3.
+    body = buf.getvalue()
+    buf.close()
+    return body
+
+
 
+def makeRequests(obj, batch, max_concurrency=None, raw=False):
+    """
+    Send multiple requests to the server concurrently.
+
+    requests does not support non-blocking I/O, so the requests
+    are distributed over a pool of threads.
+
+    :param obj: A service object containing auth and config information.
+    :type obj: franz.miniclient.repository.Service
+    :param batch: A sequence of argument tuples. Each tuple contains the
+                  ``method``, ``url``, ``body``, ``accept``, ``contentType``
+                  and ``headers`` arguments of :func:`makeRequest` (in that order).
+                  Trailing arguments may be omitted.
+    :type batch: Iterable[tuple]
+    :param max_concurrency: Maximum number of requests in flight
+                            (default: :data:`BATCH_CONCURRENCY`).
+    :type max_concurrency: int
+    :param raw: If ``True`` response bodies are returned as bytes.
+    :type raw: bool
+    :return: A list of (status code, response body) pairs, in the same order as ``batch``.
+    :rtype: list[(int, string)]
+    """
+    batch = list(batch)
+    if len(batch) < 2:
+        return [makeRequest(obj, raw=raw, **batch_request_arguments(args)) for args in batch]
+    # Create the session here, so threads will not race to do that.
+    if obj.session is None:
+        obj.session = create_session(obj)
+        atexit.register(obj.session.close)
+    pool = ThreadPool(min(len(batch), max_concurrency or BATCH_CONCURRENCY))
+    try:
+        return pool.map(lambda args: makeRequest(obj, raw=raw, **batch_request_arguments(args)), batch)
+    finally:
+        pool.close()
+        pool.join()
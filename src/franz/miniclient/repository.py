@@ -32,8 +32,9 @@ from six.moves.urllib.parse import quote, urlparse
 
 from ..openrdf.util.contexts import wrap_context
 from ..openrdf.util.strings import to_native_string
-from .request import (RequestError, decode, deserialize, encode, jsonRequest,
-                      nullRequest, serialize, urlenc)
+from .request import (RequestError, decode_chunks, deserialize, encode,
+                      jsonRequest, jsonRequests, nullRequest, serialize, urlenc)
+from .streaming import JsonArrayReader
 
 
 def _split_proxy(proxy):
@@ -99,7 +100,7 @@ class Service(object):
         if values:
             result['x-repl-settings'] = ' '.join('%s=%s' % value for value in values)
         if self.user_attributes:
-            result['x-user-attributes'] = encode_json(self.user_attributes)
+            result['x-user-attributes'] = encode_json(self.user_attributes, ensure_ascii=True)
         return result or None
 
     def _instance_from_url(self, subclass, url=None):
@@ -338,28 +339,55 @@ class Repository(Service):
 
     def evalSparqlQuery(self, query, infer=False, context=None, namedContext=None, callback=None,
                         bindings=None, planner=None, checkVariables=None, count=False, accept=None, analyze=False,
-                        analysisTechnique=None, analysisTimeout=None, update=False):
+                        analysisTechnique=None, analysisTimeout=None, update=False,
+                        limit=None, offset=None):
         """Execute a SPARQL query. Context can be None or a list of
         contexts -- strings in "http://foo.com" form or "null" for the
         default context. Return type depends on the query type. ASK
         gives a boolean, SELECT a {names, values} object containing
         lists of lists of terms. CONSTRUCT and DESCRIBE return a list
         of lists representing statements. Callback WILL NOT work on
-        ASK queries."""
+        ASK queries. Limit and offset are applied by the server on
+        top of any LIMIT and OFFSET in the query."""
+        method, url, body, accept = self._sparqlQueryRequest(
+            query, infer=infer, context=context, namedContext=namedContext, bindings=bindings,
+            planner=planner, checkVariables=checkVariables, count=count, accept=accept,
+            analyze=analyze, analysisTechnique=analysisTechnique, analysisTimeout=analysisTimeout,
+            update=update, limit=limit, offset=offset)
+        return jsonRequest(self, method, url, body, callback=callback, accept=accept)
+
+    def _sparqlQueryRequest(self, query, infer=False, context=None, namedContext=None,
+                            bindings=None, planner=None, checkVariables=None, count=False, accept=None,
+                            analyze=False, analysisTechnique=None, analysisTimeout=None, update=False,
+                            limit=None, offset=None):
+        """Compute the method, URL, query string and accept header of
+        the request sent by evalSparqlQuery."""
         if accept is None:
             accept="text/integer" if count else "application/json"
         if analyze:
             accept="text/plain"
         if bindings is not None:
             bindings = "".join(["&$" + quote(a) + "=" + quote(b.encode("utf-8")) for a, b in list(bindings.items())])
-        return jsonRequest(self, "POST" if update else "GET", self.url,
-                   urlenc(query=query, infer=infer, context=context, namedContext=namedContext,
-                       planner=planner, checkVariables=checkVariables,
-                       analyzeIndicesUsed=analyze, queryAnalysisTechnique=analysisTechnique,
-                       queryAnalysisTimeout=analysisTimeout,
-                       returnQueryMetadata=True) + (bindings or ""),
-                       callback=callback,
-                       accept=accept)
+        body = urlenc(query=query, infer=infer, context=context, namedContext=namedContext,
+                      planner=planner, checkVariables=checkVariables,
+                      analyzeIndicesUsed=analyze, queryAnalysisTechnique=analysisTechnique,
+                      queryAnalysisTimeout=analysisTimeout,
+                      limit=limit, offset=offset,
+                      returnQueryMetadata=True) + (bindings or "")
+        return "POST" if update else "GET", self.url, body, accept
+
+    def evalSparqlQueries(self, queries, maxConcurrency=None):
+        """Execute multiple SPARQL queries concurrently. Each element
+        of queries is either a query string or a dictionary of keyword
+        arguments accepted by evalSparqlQuery (callback is not
+        supported). Returns a list of results, in the same order as
+        the queries."""
+        requests = []
+        for query in queries:
+            if isinstance(query, basestring):
+                query = {'query': query}
+            requests.append(self._sparqlQueryRequest(**query))
+        return jsonRequests(self, requests, max_concurrency=maxConcurrency)
 
     def evalPrologQuery(self, query, infer=False, callback=None, limit=None, count=False, accept=None):
         """Execute a Prolog query. Returns a {names, values} object."""
@@ -421,6 +449,15 @@ class Repository(Service):
         Context can be None or a list of contexts, as in
         evalSparqlQuery."""
         if subj == [] or pred == [] or obj == [] or context == []: return []
+        method, url, body, accept = self._getStatementsRequest(
+            subj, pred, obj, context, infer=infer, limit=limit, offset=offset,
+            accept=accept, tripleIDs=tripleIDs, count=count)
+        return jsonRequest(self, method, url, body, callback=callback, accept=accept)
+
+    def _getStatementsRequest(self, subj=None, pred=None, obj=None, context=None, infer=False,
+                              limit=None, offset=None, accept=None, tripleIDs=False, count=False):
+        """Compute the method, URL, query string and accept header of
+        the request sent by getStatements."""
         subjEnd, predEnd, objEnd = None, None, None
         if isinstance(subj, tuple): subj, subjEnd = subj
         if isinstance(pred, tuple): pred, predEnd = pred
@@ -430,11 +467,23 @@ class Repository(Service):
             accept = "application/json"
             if count: accept = "text/integer"
             elif tripleIDs: accept = "application/x-quints+json"
-        return jsonRequest(self, "GET", "/statements",
-            urlenc(subj=subj, subjEnd=subjEnd, pred=pred, predEnd=predEnd,
-                obj=obj, objEnd=objEnd, context=context, infer=infer,
-                limit=limit, offset=offset),
-            callback=callback, accept=accept)
+        body = urlenc(subj=subj, subjEnd=subjEnd, pred=pred, predEnd=predEnd,
+                      obj=obj, objEnd=objEnd, context=context, infer=infer,
+                      limit=limit, offset=offset)
+        return "GET", "/statements", body, accept
+
+    def getStatementsBatch(self, patterns, maxConcurrency=None):
+        """Retrieve statements matching multiple sets of constraints
+        concurrently. Each element of patterns is a dictionary of
+        keyword arguments accepted by getStatements (callback is not
+        supported). Returns a list of results, in the same order as
+        the patterns."""
+        results = [[] if [] in (p.get('subj'), p.get('pred'), p.get('obj'), p.get('context')) else None
+                   for p in patterns]
+        requests = [self._getStatementsRequest(**p)
+                    for p, result in zip(patterns, results) if result is None]
+        responses = iter(jsonRequests(self, requests, max_concurrency=maxConcurrency))
+        return [next(responses) if result is None else result for result in results]
 
     def getStatementsById(self, ids, returnIDs=True, accept=None, callback=None):
         if accept is None and returnIDs:
@@ -464,10 +513,25 @@ class Repository(Service):
         should be an array of or five four-element arrays, where the fourth
         element, the graph name, may be None. The fifth element, if present,
         must be a string with a JSON-encoded dictionary of attribute values.
+
+        Quads can also be an iterator (e.g. a generator). In that case
+        the request body is encoded while it is being sent (using chunked
+        transfer encoding), so the input is never held in memory at once.
         """
-        nullRequest(self, "POST", "/statements?" +
-                    urlenc(commit=commitEvery),
-                    encode_json(quads), content_type="application/json")
+        if isinstance(quads, (list, tuple)):
+            body = encode_json(quads)
+        else:
+            body = JsonArrayReader(quads)
+        try:
+            nullRequest(self, "POST", "/statements?" +
+                        urlenc(commit=commitEvery),
+                        body, content_type="application/json")
+        except Exception:
+            # Errors raised while reading the input are more useful
+            # than whatever the backend made of them.
+            if not isinstance(body, basestring):
+                body.reraise()
+            raise
 
     def loadData(self, data, rdf_format, base_uri=None, context=None,
                  commit_every=None, content_encoding=None, attributes=None,
@@ -895,9 +959,13 @@ class Repository(Service):
 
     def callStoredProc(self, function, module, *args):
         encoded = encode(serialize(args))
-        return deserialize(decode(jsonRequest(self, "POST", "/custom/"+function,
+        # Collect the encoded response as received, without
+        # converting it to a string.
+        chunks = []
+        jsonRequest(self, "POST", "/custom/"+function,
             body=urlenc(spargstr=encoded), accept="text/plain",
-            headers=["x-scripts: " + module])))
+            headers=["x-scripts: " + module], callback=chunks.append)
+        return deserialize(b''.join(decode_chunks(chunks)))
 
     def getSpinFunction(self, uri):
         """
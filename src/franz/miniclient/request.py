@@ -14,7 +14,9 @@ from future.utils import iteritems, python_2_unicode_compatible, bchr
 from past.builtins import unicode
 from past.builtins import str as old_str
 from future.utils import native_str
-import os, re, sys
+import array, base64, os, re, sys
+
+from six import binary_type
 
 # Select the backend (curl or requests).
 if os.environ.get('AG_FORCE_REQUESTS_BACKEND'):
@@ -27,7 +29,7 @@ else:
 
 from franz.openrdf.util.strings import to_native_string
 from franz.openrdf.util.http import merge_headers
-from franz.miniclient.agjson import decode_json, JsonDecodeError
+from franz.miniclient.agjson import decode_json, prefers_bytes, JsonDecodeError
 
 if sys.version_info[0] > 2:
     from urllib.parse import quote
@@ -39,6 +41,7 @@ else:
 # Note: this is mocked in some unit tests, be careful when changing the way
 # the import works.
 makeRequest = backend.makeRequest
+makeRequests = backend.makeRequests
 
 
 def jsonRequest(obj, method, url, body=None, content_type="application/x-www-form-urlencoded",
@@ -88,20 +91,64 @@ def jsonRequest(obj, method, url, body=None, content_type="application/x-www-for
     headers = merge_headers(obj.getHeaders(), headers)
     if callback is None:
         status, body = makeRequest(obj, method, url, body, accept, content_type,
-                                   headers=headers)
-        if status == 204:
-            body = decode_json("{}")
-            return body
-        elif status == 200:
-            if accept in ('application/json', 'text/integer', "application/x-quints+json"):
-                body = decode_json(body)
-            return body
-        else: raise RequestError(status, body)
+                                   headers=headers, raw=prefers_bytes())
+        return parse_json_response(status, body, accept)
     else:
         def raiseErr(status, message): raise RequestError(status, message)
         makeRequest(obj, method, url, body, accept, content_type, callback=callback, errCallback=raiseErr, headers=headers)
 
 
+def jsonRequests(obj, requests, content_type="application/x-www-form-urlencoded", max_concurrency=None):
+    """
+    Send multiple requests that expect JSON responses concurrently.
+
+    Raise an exception if any of the returned statuses is not in the 2XX range.
+
+    :param obj: Service object with connection information (e.g. credentials).
+    :type obj: franz.openrdf.miniclient.repository.Service
+    :param requests: A sequence of (method, url, body, accept) tuples.
+                     See :func:`jsonRequest` for a description of these values.
+    :type requests: Iterable[(string, string, string, string)]
+    :param content_type: MIME type of request bodies, optional.
+    :type content_type: string
+    :param max_concurrency: Maximum number of requests sent at the same time
+                            (default: chosen by the backend).
+    :type max_concurrency: int
+    :return: A list of parsed responses, in the same order as ``requests``.
+    :rtype: list
+    """
+    headers = obj.getHeaders()
+    batch = []
+    for method, url, body, accept in requests:
+        batch.append((method, url, body, accept or "application/json", content_type, headers))
+    responses = makeRequests(obj, batch, max_concurrency, raw=prefers_bytes())
+    return [parse_json_response(status, body, args[3])
+            for (status, body), args in zip(responses, batch)]
+
+
+def parse_json_response(status, body, accept):
+    """
+    Process the response to a request made by :func:`jsonRequest`.
+
+    :param status: HTTP status code.
+    :type status: int
+    :param body: Response body. JSON is parsed directly from bytes,
+                 without converting the whole body to a string first.
+    :type body: string|bytes
+    :param accept: MIME type requested by the client.
+    :type accept: string
+    :return: The parsed response.
+    :rtype: dict|string|int|float
+    """
+    if status == 204:
+        return decode_json("{}")
+    elif status == 200:
+        if accept in ('application/json', 'text/integer', "application/x-quints+json"):
+            return decode_json(body)
+        return to_native_string(body)
+    else: raise RequestError(status, to_native_string(body))
+
+
 def nullRequest(obj, method, url, body=None, content_type="application/x-www-form-urlencoded", content_encoding=None):
     """
     Create a request that expects an empty response body.
@@ -210,160 +257,273 @@ class SerialConstants(object):
     SO_NEG_INTEGER = 11
     SO_BYTEVECTOR = 15
 
-def serialize(obj):
-    def serialize_int(i):
-        # make sure i is non negative
-        i = abs(i)
-        def int_bytes(i):
-            rest = True
-            while rest:
-                lower = i & 0x7f
-                rest = i >> 7
-                yield lower | (0x80 if rest else 0)
-                i = rest
-
-        return ibytes(int_bytes(i))
 
+def _write_int(buf, i):
+    """
+    Append a non-negative integer to a bytearray, 7 bits per byte
+    (least significant first, the high bit marks continuation).
+    """
+    while i > 0x7f:
+        buf.append((i & 0x7f) | 0x80)
+        i >>= 7
+    buf.append(i)
+
+
+def _serialize_into(obj, buf):
     if obj is None:
-        return bchr(SerialConstants.SO_NULL)
+        buf.append(SerialConstants.SO_NULL)
+    elif isinstance(obj, unicode):
+        buf.append(SerialConstants.SO_STRING)
+        _write_int(buf, len(obj))
+        buf += obj.encode('utf-8')
+    elif isinstance(obj, int):
+        buf.append(SerialConstants.SO_POS_INTEGER if obj >= 0 else SerialConstants.SO_NEG_INTEGER)
+        _write_int(buf, abs(obj))
+    elif getattr(obj, 'typecode', None) == 'b':
+        # Byte vector (array.array('b'))
+        buf.append(SerialConstants.SO_BYTEVECTOR)
+        _write_int(buf, len(obj))
+        buf += obj.tobytes() if hasattr(obj, 'tobytes') else obj.tostring()
+    elif isinstance(obj, native_str):
+        # Python 2 byte string: iterating would never end.
+        raise TypeError("cannot serialize object of type %s" % type(obj))
+    else:
+        try:
+            length = len(obj)
+            items = iter(obj)
+        except TypeError:
+            raise TypeError("cannot serialize object of type %s" % type(obj))
+        buf.append(SerialConstants.SO_VECTOR)
+        _write_int(buf, length)
+        for elem in items:
+            _serialize_into(elem, buf)
 
-    if isinstance(obj, unicode):
-        return b''.join([bchr(SerialConstants.SO_STRING), serialize_int(len(obj)),
-            bytes(obj, 'utf-8')])
 
-    if isinstance(obj, int):
-        return b''.join([bchr(SerialConstants.SO_POS_INTEGER) if obj >= 0 else
-            bchr(SerialConstants.SO_NEG_INTEGER), serialize_int(obj)])
+def serialize(obj):
+    """
+    Convert a value to the binary format used by stored procedures.
 
-    try:
-        # Byte vector
-        if obj.typecode == b'b':
-            return b''.join([bchr(SerialConstants.SO_BYTEVECTOR),
-                serialize_int(len(obj)), obj.tostring()])
-    except:
-        pass
+    Supported values are ``None``, strings, integers, byte vectors
+    (``array.array('b')``) and sequences of supported values.
 
-    try:
-        iobj = iter(obj)
-        return b''.join([bchr(SerialConstants.SO_VECTOR),
-            serialize_int(len(obj)),
-            b''.join([serialize(elem) for elem in iobj])])
-    except:
-        pass
+    :rtype: bytes
+    """
+    buf = bytearray()
+    _serialize_into(obj, buf)
+    return binary_type(buf)
 
-    raise TypeError("cannot serialize object of type %s" % type(obj))
 
-def deserialize(string):
-    def posInteger(chars):
-        result = shift = 0
+def _read_int(data, pos):
+    """
+    Read an integer written by :func:`_write_int`.
 
-        # Set value to get into the loop the first time
-        value = 0x80
-        while value & 0x80:
-            value = next(chars)
-            result += ((value & 0x7f) << shift)
-            shift += 7
+    :return: The integer and the position after it.
+    """
+    result = shift = 0
+    while True:
+        value = data[pos]
+        pos += 1
+        result += (value & 0x7f) << shift
+        if not value & 0x80:
+            return result, pos
+        shift += 7
 
-        return result
 
-    if isinstance(string, old_str):
-        string = bytes(string)
-    chars = iter(string)
-    value = next(chars)
+def _deserialize_from(data, pos):
+    value = data[pos]
+    pos += 1
 
     if value == SerialConstants.SO_BYTEVECTOR:
-        length = posInteger(chars)
-        import array
-        return array.array(b'b', [ord(next(chars)) for i in range(length)])
+        length, pos = _read_int(data, pos)
+        result = array.array(str('b'))
+        chunk = binary_type(data[pos:pos + length])
+        if hasattr(result, 'frombytes'):
+            result.frombytes(chunk)
+        else:
+            result.fromstring(chunk)
+        return result, pos + length
 
     if (value == SerialConstants.SO_VECTOR or
         value == SerialConstants.SO_LIST):
-        length = posInteger(chars)
-        return [deserialize(chars) for i in range(length)]
+        length, pos = _read_int(data, pos)
+        result = []
+        for _ in range(length):
+            item, pos = _deserialize_from(data, pos)
+            result.append(item)
+        return result, pos
 
     if value == SerialConstants.SO_STRING:
-        length = posInteger(chars)
-        return unicode(ibytes(islice(chars, 0, length)), 'utf-8')
+        # The length is in characters, not bytes.
+        length, pos = _read_int(data, pos)
+        try:
+            result = unicode(data[pos:pos + length], 'utf-8')
+            if len(result) == length:
+                return result, pos + length
+        except UnicodeDecodeError:
+            pass
+        end = pos
+        for _ in range(length):
+            end += 1
+            while end < len(data) and 0x80 <= data[end] < 0xc0:
+                end += 1
+        return unicode(data[pos:end], 'utf-8'), end
 
     if value == SerialConstants.SO_POS_INTEGER:
-        return posInteger(chars)
+        return _read_int(data, pos)
 
     if value == SerialConstants.SO_NEG_INTEGER:
-        return - posInteger(chars)
-
-    if value == SerialConstants.SO_NULL:
-        return None
+        result, pos = _read_int(data, pos)
+        return -result, pos
 
-    if value == SerialConstants.SO_END_OF_ITEMS:
-        return None
+    if value == SerialConstants.SO_NULL or value == SerialConstants.SO_END_OF_ITEMS:
+        return None, pos
 
     raise ValueError("bad code found by deserializer: %d" % value)
 
-def encode(string):
-    def convert(string):
-        codes = encode.codes
-        state = rem = 0
 
-        for byte in bytes(string):
-            if state == 0:
-                yield codes[byte & 0x3f]
-                rem = (byte >> 6) & 0x3
-                state = 1
-            elif state == 1:
-                yield codes[((byte & 0xf) << 2) | rem]
-                rem = (byte >> 4) & 0xf
-                state = 2
-            else:
-                yield codes[((byte & 0x3) << 4) | rem]
-                yield codes[((byte >> 2) & 0x3f)]
-                state = 0
+def deserialize(string):
+    """
+    Convert the binary format used by stored procedures to a value
+    (see :func:`serialize`).
+
+    :param string: Serialized data.
+    :type string: bytes|bytearray|memoryview
+    """
+    # Indexing must return integers, which is not the case
+    # for byte strings or memoryviews on Python 2.
+    if sys.version_info[0] > 2:
+        data = memoryview(string)
+    else:
+        data = bytearray(string)
+    try:
+        return _deserialize_from(data, 0)[0]
+    except IndexError:
+        raise ValueError("truncated data found by deserializer")
+
+
+# Stored procedure arguments and results are sent as text. Each group of
+# 3 bytes is encoded as 4 characters, taking 6 bits at a time from the
+# least significant bits of each byte. That is the same as Base64 applied
+# to bytes with reversed bit order, with each 6-bit value also reversed.
+# Doing it that way lets the C implementations of translate() and base64
+# process whole buffers.
+
+ENCODING_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789*+"
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+# Input is encoded and decoded in slices of this many bytes / characters.
+ENCODING_CHUNK_SIZE = 3 * 65536
+
+
+def _reverse_bits(value, width):
+    result = 0
+    for _ in range(width):
+        result = (result << 1) | (value & 1)
+        value >>= 1
+    return result
+
+
+def _make_tables():
+    reverse = bytearray(_reverse_bits(i, 8) for i in range(256))
+    to_ag = bytearray(range(256))
+    # Characters outside of the alphabet are decoded as zeros.
+    from_ag = bytearray(_BASE64_ALPHABET[0:1] * 256)
+    base64_codes = bytearray(_BASE64_ALPHABET)
+    ag_codes = bytearray(ENCODING_ALPHABET)
+    for value in range(64):
+        reversed_value = _reverse_bits(value, 6)
+        to_ag[base64_codes[value]] = ag_codes[reversed_value]
+        from_ag[ag_codes[reversed_value]] = base64_codes[value]
+    return binary_type(reverse), binary_type(to_ag), binary_type(from_ag)
+
+
+_REVERSE_BITS, _TO_AG_ALPHABET, _FROM_AG_ALPHABET = _make_tables()
+
 
-        if state:
-            yield codes[rem]
+def _encode_block(data):
+    return base64.b64encode(data.translate(_REVERSE_BITS)).rstrip(b'=').translate(_TO_AG_ALPHABET)
 
-    return ibytes(convert(string))
 
+def _decode_block(text):
+    text = text.translate(_FROM_AG_ALPHABET)
+    extra = len(text) % 4
+    if extra == 1:
+        # A single character does not make a byte.
+        text = text[:-1]
+    elif extra:
+        text += b'=' * (4 - extra)
+    return base64.b64decode(text).translate(_REVERSE_BITS)
 
-encode.codes = bytes(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789*+")
+
+def encode_chunks(chunks):
+    """
+    Encode a sequence of byte strings (see :func:`encode`),
+    yielding the encoded text in pieces.
+
+    :param chunks: Data to encode, split into pieces of any size.
+    :type chunks: Iterable[bytes]
+    :rtype: Iterator[bytes]
+    """
+    rest = b''
+    for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+        start = 0
+        end = len(chunk) - len(chunk) % 3
+        while start < end:
+            stop = min(start + ENCODING_CHUNK_SIZE, end)
+            yield _encode_block(chunk[start:stop])
+            start = stop
+        rest = chunk[end:]
+    if rest:
+        yield _encode_block(rest)
+
+
+def decode_chunks(chunks):
+    """
+    Decode a sequence of text pieces produced by :func:`encode`,
+    yielding the data in pieces.
+
+    :param chunks: Encoded text (ASCII bytes or strings), split into pieces of any size.
+    :type chunks: Iterable[bytes|string]
+    :rtype: Iterator[bytes]
+    """
+    rest = b''
+    size = ENCODING_CHUNK_SIZE // 3 * 4
+    for chunk in chunks:
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode('utf-8')
+        if rest:
+            chunk = rest + chunk
+        start = 0
+        end = len(chunk) - len(chunk) % 4
+        while start < end:
+            stop = min(start + size, end)
+            yield _decode_block(chunk[start:stop])
+            start = stop
+        rest = chunk[end:]
+    if rest:
+        yield _decode_block(rest)
+
+
+def encode(string):
+    """
+    Encode data as text for a stored procedure call.
+
+    :param string: Data to encode.
+    :type string: bytes
+    :rtype: bytes
+    """
+    return b''.join(encode_chunks([binary_type(string)]))
 
 
 def decode(string):
-    def convert(string):
-        codes = decode.codes
-        state = rem = 0
+    """
+    Decode text produced by :func:`encode`.
 
-        if isinstance(string, unicode):
-            string = bytes(string, 'utf-8')
-        else:
-            string = bytes(string)
-
-        for byte in string:
-            byte = codes[byte]
-
-            if state == 0:
-                rem = byte
-                state = 1
-            elif state == 1:
-                yield rem | ((byte & 0x3) << 6)
-                rem = byte >> 2
-                state = 2
-            elif state == 2:
-                yield rem | ((byte & 0xf) << 4)
-                rem = byte >> 4
-                state = 3
-            else:
-                yield rem | (byte << 2)
-                state = 0
-
-    return ibytes(convert(string))
-
-decode.codes = [
-     0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,
-     0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,  0,
-     0,  0,  0,  0,  0,  0,  0,  0,  0,  0, 62, 63,  0,  0,  0,  0,
-    52, 53, 54, 55, 56, 57, 58, 59, 60, 61,  0,  0,  0,  0,  0,  0,
-     0,  0,  1,  2,  3,  4,  5,  6,  7,  8,  9, 10, 11, 12, 13, 14,
-    15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25,  0,  0,  0,  0,  0,
-     0, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40,
-    41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51]
+    :param string: Encoded text.
+    :type string: bytes|string
+    :rtype: bytes
+    """
+    return b''.join(decode_chunks([string]))
 
@@ -0,0 +1,434 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Tools for processing large responses incrementally.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import codecs
+import re
+import sys
+import threading
+from itertools import islice
+
+import six
+from future.builtins import object
+from six.moves import queue
+
+from .agjson import JsonDecodeError, decode_json, decode_json_prefix, encode_json
+
+# Default number of response chunks buffered by a ResponseStream.
+MAX_BUFFERED_CHUNKS = 16
+
+# Default number of items encoded at once by a JsonArrayReader.
+ENCODE_BATCH_SIZE = 1000
+
+# Marks the end of a response in the chunk queue.
+_END = object()
+
+
+class ResponseStream(object):
+    """
+    An iterator over the chunks of a response body.
+
+    The request is performed by a background thread, which passes the
+    chunks to the consumer through a bounded queue. If the consumer
+    falls behind the transfer is paused, so memory usage does not depend
+    on the size of the response.
+
+    Closing the stream before the response has been consumed aborts
+    the transfer.
+    """
+    def __init__(self, request, max_chunks=MAX_BUFFERED_CHUNKS):
+        """
+        Start a request.
+
+        :param request: A function that performs the request. It will be called
+                        (from a background thread) with a single argument - the
+                        callback that should receive the response chunks.
+        :type request: ((bytes) -> int) -> None
+        :param max_chunks: Maximum number of chunks that can be buffered.
+        :type max_chunks: int
+        """
+        self._queue = queue.Queue(max_chunks)
+        self._closed = False
+        self._done = False
+        self._thread = threading.Thread(target=self._run, args=(request,))
+        # Do not keep Python alive on shutdown.
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, request):
+        try:
+            request(self._callback)
+        except Exception as e:
+            self._put(e)
+        else:
+            self._put(_END)
+
+    def _callback(self, chunk):
+        if not self._put(chunk):
+            # Returning anything other than None or len(chunk) aborts the transfer.
+            return 0
+
+    def _put(self, item):
+        """
+        Add an item to the queue, unless the stream is closed.
+
+        :return: ``False`` if the stream is closed.
+        """
+        while not self._closed:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Return the next chunk of the response, waiting for it if necessary.
+
+        :return: Response data.
+        :rtype: bytes
+        :raises StopIteration: If the whole response has been consumed.
+        """
+        if self._done:
+            raise StopIteration()
+        item = self._queue.get()
+        if item is _END:
+            self._done = True
+            raise StopIteration()
+        if isinstance(item, Exception):
+            self._done = True
+            raise item
+        return item
+
+    def close(self):
+        """
+        Stop processing the response.
+        """
+        self._closed = True
+        self._done = True
+
+
+def paged_request(fetch, page_size, offset=0, limit=None):
+    """
+    Create a request function for :class:`ResponseStream` that retrieves
+    a result in pages, using a separate request for each page.
+
+    Each page is passed to the stream as a single chunk, so the
+    ``max_chunks`` parameter of the stream determines how many pages
+    can be fetched ahead of the consumer.
+
+    :param fetch: A function that retrieves up to ``count`` items,
+                  starting at ``offset``. A page shorter than requested
+                  marks the end of the result.
+    :type fetch: (int, int) -> list
+    :param page_size: Number of items requested at once.
+    :type page_size: int
+    :param offset: Number of items to skip.
+    :type offset: int
+    :param limit: Maximum number of items to retrieve (``None`` means no limit).
+    :type limit: int
+    :rtype: ((list) -> int) -> None
+    """
+    if page_size <= 0:
+        raise ValueError('page_size must be positive.')
+
+    def request(callback):
+        position = offset or 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            count = page_size if remaining is None else min(page_size, remaining)
+            page = fetch(position, count)
+            if page and callback(page) == 0:
+                # Stream closed
+                return
+            if len(page) < count:
+                return
+            position += count
+            if remaining is not None:
+                remaining -= count
+    return request
+
+
+# States of the SelectResponseParser
+_START, _KEY_OR_END, _KEY, _COLON, _VALUE, _SEPARATOR, \
+    _ROWS_START, _ROW_OR_END, _ROW, _ROW_SEPARATOR, _DONE = range(11)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class SelectResponseParser(object):
+    """
+    An incremental parser for SELECT query results in the AllegroGraph
+    JSON format (``{"names": [...], "values": [[...], ...], ...}``).
+
+    Data is passed to :meth:`feed` in arbitrarily sized chunks,
+    each call returns the rows that have been completed by that chunk.
+    Only the incomplete part of the current row is retained between calls.
+    """
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._text = ''
+        self._pos = 0
+        self._state = _START
+        self._key = None
+        #: List of variable names (``None`` until received).
+        self.names = None
+        #: Other top-level values of the response (e.g. query metadata).
+        self.fields = {}
+
+    @property
+    def finished(self):
+        """
+        ``True`` if the whole response has been parsed.
+        """
+        return self._state == _DONE
+
+    def feed(self, data, final=False):
+        """
+        Parse a chunk of the response.
+
+        :param data: Response data.
+        :type data: bytes
+        :param final: Must be ``True`` for the last chunk.
+        :type final: bool
+        :return: Rows completed by the data, each row is a list of
+                 strings in N-Triples format.
+        :rtype: list[list[string]]
+        :raises JsonDecodeError: If the data is not valid.
+        """
+        text = self._decoder.decode(data, final)
+        if self._pos:
+            self._text = self._text[self._pos:] + text
+            self._pos = 0
+        else:
+            self._text += text
+        rows = []
+        self._parse(rows, final)
+        if final and self._state != _DONE:
+            if self._state == _START and not self._text.strip():
+                # Empty response (e.g. 204)
+                self.names = self.names or []
+                self._state = _DONE
+            else:
+                raise JsonDecodeError('Incomplete query result.')
+        return rows
+
+    def _expect(self, char):
+        text = self._text
+        if text[self._pos] != char:
+            raise JsonDecodeError("Expected '%s' at position %d, got '%s'." % (char, self._pos, text[self._pos]))
+        self._pos += 1
+
+    def _decode(self, final):
+        """
+        Decode a JSON value at the current position.
+
+        :return: A pair (value, True) or (None, False) if more data is needed.
+        """
+        text = self._text
+        try:
+            value, end = decode_json_prefix(text, self._pos)
+        except JsonDecodeError:
+            if final:
+                raise
+            return None, False
+        # A number at the end of the buffer might be incomplete.
+        if end == len(text) and not final and text[end - 1] not in ']}"el':
+            return None, False
+        self._pos = end
+        return value, True
+
+    def _decode_rows(self, rows):
+        """
+        Decode all complete rows in the buffer (except the last one)
+        with a single call to the JSON parser.
+
+        This only works if the rows are separated by ``],`` and that
+        string does not occur in the last row, otherwise the text passed
+        to the parser is not valid and we fall back to decoding rows
+        one by one.
+
+        :return: ``True`` if any rows have been decoded.
+        """
+        text = self._text
+        end = text.rfind('],', self._pos)
+        if end < 0:
+            return False
+        try:
+            batch = decode_json('[' + text[self._pos:end + 1] + ']')
+        except JsonDecodeError:
+            return False
+        rows.extend(batch)
+        self._pos = end + 2
+        self._state = _ROW
+        return True
+
+    def _parse(self, rows, final):
+        text = self._text
+        size = len(text)
+        while True:
+            self._pos = _WHITESPACE.match(text, self._pos).end()
+            if self._pos >= size:
+                return
+            state = self._state
+            if state == _ROW or state == _ROW_OR_END:
+                if state == _ROW_OR_END and text[self._pos] == ']':
+                    self._pos += 1
+                    self._state = _SEPARATOR
+                    continue
+                if self._decode_rows(rows):
+                    continue
+                row, ok = self._decode(final)
+                if not ok:
+                    return
+                rows.append(row)
+                self._state = _ROW_SEPARATOR
+            elif state == _ROW_SEPARATOR:
+                if text[self._pos] == ']':
+                    self._state = _SEPARATOR
+                else:
+                    self._expect(',')
+                    self._state = _ROW
+                    continue
+                self._pos += 1
+            elif state == _START:
+                self._expect('{')
+                self._state = _KEY_OR_END
+            elif state == _KEY or state == _KEY_OR_END:
+                if state == _KEY_OR_END and text[self._pos] == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                key, ok = self._decode(final)
+                if not ok:
+                    return
+                self._key = key
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(':')
+                self._state = _ROWS_START if self._key == 'values' else _VALUE
+            elif state == _ROWS_START:
+                self._expect('[')
+                self._state = _ROW_OR_END
+            elif state == _VALUE:
+                value, ok = self._decode(final)
+                if not ok:
+                    return
+                if self._key == 'names':
+                    self.names = value
+                else:
+                    self.fields[self._key] = value
+                self._state = _SEPARATOR
+            elif state == _SEPARATOR:
+                if text[self._pos] == '}':
+                    self._pos += 1
+                    self._state = _DONE
+                else:
+                    self._expect(',')
+                    self._state = _KEY
+            else:
+                raise JsonDecodeError('Unexpected data after the end of the query result.')
+
+
+class JsonArrayReader(object):
+    """
+    A file-like object that reads a JSON array encoded from an iterable.
+
+    Elements are taken from the iterable and encoded only when data is
+    requested, so a request body can be produced while it is being sent.
+    The iterable can only be read once.
+
+    An exception raised by the iterable is stored in :attr:`error`,
+    since HTTP backends might replace it with their own errors (use
+    :meth:`reraise` to raise it again).
+    """
+    def __init__(self, items, batch_size=ENCODE_BATCH_SIZE):
+        """
+        :param items: JSON-serializable values.
+        :type items: Iterable
+        :param batch_size: Number of items encoded at once.
+        :type batch_size: int
+        """
+        self._items = iter(items)
+        self._batch_size = batch_size
+        self._buffer = b''
+        self._started = False
+        self._finished = False
+        #: Result of ``sys.exc_info()`` if the iterable raised an exception.
+        self.error = None
+
+    def _next_piece(self):
+        """
+        Encode the next batch of items.
+
+        :return: Encoded data or ``None`` if there is nothing left.
+        :rtype: bytes
+        """
+        if self._finished:
+            return None
+        try:
+            batch = list(islice(self._items, self._batch_size))
+        except Exception:
+            self.error = sys.exc_info()
+            raise
+        # Skip the brackets, each piece is a part of a larger array.
+        text = encode_json(batch)[1:-1]
+        if not batch:
+            self._finished = True
+            piece = ']' if self._started else '[]'
+        elif self._started:
+            piece = ',' + text
+        else:
+            piece = '[' + text
+        self._started = True
+        return piece.encode('utf-8')
+
+    def read(self, size=-1):
+        """
+        Read up to ``size`` bytes (everything if ``size`` is negative).
+
+        :rtype: bytes
+        """
+        pieces = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            piece = self._next_piece()
+            if piece is None:
+                break
+            pieces.append(piece)
+            length += len(piece)
+        data = b''.join(pieces)
+        if size < 0:
+            self._buffer = b''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+    def __iter__(self):
+        if self._buffer:
+            yield self.read(len(self._buffer))
+        while True:
+            piece = self._next_piece()
+            if piece is None:
+                return
+            yield piece
+
+    def reraise(self):
+        """
+        Raise the exception stored in :attr:`error` (if any).
+        """
+        if self.error is not None:
+            six.reraise(*self.error)
@@ -138,3 +138,17 @@ def test_stored_proc_args():
     assert serial == decode(enc)
     assert orig == deserialize(serial)
 
+
+def test_stored_proc_codec():
+    import array
+    from .request import encode_chunks, decode_chunks
+    data = bytes(bytearray(range(256))) * 3 + b'xy'
+    enc = encode(data)
+    # 3 bytes per 4 characters, least significant bits first.
+    eq(encode(b'\x01\x02\x03'), b'BIwA')
+    eq(len(enc), 1027)
+    eq(decode(enc), data)
+    eq(b''.join(encode_chunks([data[:100], data[100:101], data[101:]])), enc)
+    eq(b''.join(decode_chunks([enc[:5], enc[5:6], enc[6:].decode('ascii')])), data)
+    orig = [None, -300, 2 ** 70, "café ☺", array.array(str('b'), [-128, 0, 127])]
+    eq(deserialize(decode(encode(serialize(orig)))), orig)
@@ -12,9 +12,10 @@ from __future__ import unicode_literals
 
 from .literal import Literal
 from .statement import Statement
-from .value import Value, URI, BNode
+from .value import Value, URI, BNode, uri_intern_stats
 from .valuefactory import ValueFactory
-from .utils import parse_term
+from .utils import configure_term_cache, parse_term, term_cache_stats
 
 __all__ = ['BNode', 'Literal', 'Statement', 'URI',
-    'Value', 'ValueFactory', 'parse_term']
+    'Value', 'ValueFactory', 'configure_term_cache', 'parse_term',
+    'term_cache_stats', 'uri_intern_stats']
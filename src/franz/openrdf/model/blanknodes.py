@@ -0,0 +1,183 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Allocation of blank node ids (see :meth:`.ValueFactory.createBNode`).
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+
+from future.builtins import object
+
+# Default number of ids requested when the first block is fetched.
+BLANK_NODE_AMOUNT = 10
+
+# Upper limit of the number of ids requested at once.
+BLANK_NODE_MAX_AMOUNT = 10000
+
+# A block used up in less than this many seconds makes the next one
+# twice as large, a block that lasts longer than BLANK_NODE_SLOW_REFILL
+# makes it half as large.
+BLANK_NODE_FAST_REFILL = 1.0
+BLANK_NODE_SLOW_REFILL = 60.0
+
+
+class BlankNodeAllocator(object):
+    """
+    A thread-safe pool of blank node ids reserved on the server.
+
+    Ids are requested in blocks. The size of a block adapts to demand:
+    it doubles (up to ``max_amount``) each time a block is used up within
+    :data:`BLANK_NODE_FAST_REFILL` seconds and shrinks again when ids are
+    rarely needed. When half of the current block has been handed out,
+    the next block is fetched by a background thread, so callers
+    usually do not wait for the server.
+    """
+    def __init__(self, fetch, amount=BLANK_NODE_AMOUNT, max_amount=BLANK_NODE_MAX_AMOUNT, prefetch=True):
+        """
+        :param fetch: Function that reserves a number of ids on the
+                      server and returns them (with the leading ``_:``).
+        :type fetch: (int) -> list[string]
+        :param amount: Size of the first block.
+        :type amount: int
+        :param max_amount: Maximum size of a block.
+        :type max_amount: int
+        :param prefetch: If ``False`` blocks are only fetched when
+                         the current one is empty.
+        :type prefetch: bool
+        """
+        self.fetch = fetch
+        self.initial_amount = max(int(amount), 1)
+        self.amount = self.initial_amount
+        self.max_amount = max(int(max_amount), self.initial_amount)
+        self.prefetch = prefetch
+        #: Ids of the current block, handed out from the end.
+        self.ids = []
+        self._next_ids = None
+        self._fetching = False
+        self._block_started = None
+        self._condition = threading.Condition(threading.Lock())
+        self.requests = 0
+        self.fetched = 0
+        self.allocated = 0
+        self.prefetches = 0
+        self.waits = 0
+        self.errors = 0
+
+    def allocate(self):
+        """
+        Get an unused blank node id.
+
+        :return: The id, without the leading ``_:``.
+        :rtype: string
+        """
+        with self._condition:
+            while not self.ids:
+                if self._next_ids:
+                    self._start_block(self._next_ids)
+                    self._next_ids = None
+                elif self._fetching:
+                    # Another thread is fetching, wait for its result.
+                    self.waits += 1
+                    self._condition.wait()
+                else:
+                    self._fetch_block()
+            node_id = self.ids.pop()
+            self.allocated += 1
+            if (self.prefetch and not self._fetching and self._next_ids is None and
+                    len(self.ids) <= self.amount // 2):
+                self._fetching = True
+                self.prefetches += 1
+                thread = threading.Thread(target=self._prefetch, args=(self._next_amount(),),
+                                          name='blank-node-prefetch')
+                thread.daemon = True
+                thread.start()
+        return node_id[2:]
+
+    def _next_amount(self):
+        """
+        Adjust the block size to the rate at which ids are used.
+        """
+        if self._block_started is not None:
+            elapsed = time.time() - self._block_started
+            if elapsed < BLANK_NODE_FAST_REFILL:
+                self.amount = min(self.amount * 2, self.max_amount)
+            elif elapsed > BLANK_NODE_SLOW_REFILL:
+                self.amount = max(self.amount // 2, self.initial_amount)
+        return self.amount
+
+    def _start_block(self, ids):
+        self.ids = ids
+        self._block_started = time.time()
+
+    def _fetch_block(self):
+        """
+        Fetch a block while the caller waits. Must be called with the lock held,
+        which is released during the request.
+        """
+        amount = self._next_amount()
+        self._fetching = True
+        self._condition.release()
+        try:
+            ids = self.fetch(amount)
+        finally:
+            self._condition.acquire()
+            self._fetching = False
+            self._condition.notify_all()
+        self.requests += 1
+        if not ids:
+            raise ValueError('No blank node ids received from the server.')
+        self.fetched += len(ids)
+        self._start_block(list(ids))
+
+    def _prefetch(self, amount):
+        ids = None
+        try:
+            ids = list(self.fetch(amount))
+        except Exception:
+            # The next synchronous request will report the problem.
+            pass
+        with self._condition:
+            self._fetching = False
+            if not ids:
+                self.errors += 1
+            else:
+                self.requests += 1
+                self.fetched += len(ids)
+                if self.ids:
+                    self._next_ids = ids
+                else:
+                    self._start_block(ids)
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Get usage statistics.
+
+        The result is a dictionary with the following entries:
+
+           - ``allocated``: number of ids handed out.
+           - ``available``: number of ids reserved but not handed out yet.
+           - ``requests``: number of requests sent to the server.
+           - ``fetched``: number of ids received from the server.
+           - ``prefetches``: number of requests made in the background.
+           - ``waits``: number of times a caller waited for a block
+             fetched by another thread.
+           - ``errors``: number of failed background requests.
+           - ``block_size``: current size of a block.
+
+        :rtype: dict
+        """
+        with self._condition:
+            return dict(allocated=self.allocated,
+                        available=len(self.ids) + len(self._next_ids or ()),
+                        requests=self.requests, fetched=self.fetched,
+                        prefetches=self.prefetches, waits=self.waits,
+                        errors=self.errors, block_size=self.amount)
@@ -87,47 +87,71 @@ def datatype_from_python(value, datatype):
     return unicode(value), datatype
 
 
+# Common datatypes, used to avoid creating URI objects when parsing literals.
+_XSD_DATATYPES = dict((value.uri, value) for value in vars(XMLSchema).values()
+                      if isinstance(value, URI))
+
+
 class Literal(Value):
     """
     Implementation of the Literal class.
     """
-    
+    # Datatypes other than the XSD types are stored as strings
+    # and converted to URI objects on first access (see getDatatype).
+    # N-Triples text is cached in _ntriples until the literal is modified.
+    __slots__ = ('_label', '_datatype', '_language', '_ntriples')
+
     def __init__(self, label, datatype=None, language=None):
-        Value.__init__(self)
-        
-        # Uses the properties to set the real values
-        self.label, self.datatype = datatype_from_python(label, datatype)
-        self.language = language
+        if not isinstance(label, unicode):
+            label, datatype = datatype_from_python(label, datatype)
+        self._label = label
+        self.setDatatype(datatype)
+        self._language = language.lower() if language else None
+        self._ntriples = None
 
     def getDatatype(self):
         """The URI representing the datatype for this literal, if there is one""" 
-        return self._datatype
+        datatype = self._datatype
+        if isinstance(datatype, unicode):
+            datatype = self._datatype = URI(datatype)
+        return datatype
     
     def setDatatype(self, datatype):
         """Sets the datatype of the value"""
-        if isinstance(datatype, bytes):
-            datatype = unicode(datatype, "utf-8")
-        if isinstance(datatype, unicode):
+        if datatype is None or isinstance(datatype, URI):
+            if datatype is not None and datatype.uri is None:
+                datatype = None
+        elif isinstance(datatype, (bytes, unicode)):
+            if isinstance(datatype, bytes):
+                datatype = unicode(datatype, "utf-8")
             if datatype[0] == '<':
                 datatype = datatype[1:-1]
+            datatype = _XSD_DATATYPES.get(datatype, datatype)
+        else:
             datatype = URI(datatype)
-        elif datatype is not None:
-            if not isinstance(datatype, URI):
-                datatype = URI(datatype)
-            elif datatype.uri is None:
-                datatype = None
 
-        self._datatype = datatype # pylint: disable-msg=W0201
+        self._datatype = datatype
+        self._ntriples = None
 
     datatype = property(getDatatype, setDatatype)
 
+    def _datatype_uri(self):
+        """
+        Return the datatype as a string, without creating a URI object.
+        """
+        datatype = self._datatype
+        if datatype is None or isinstance(datatype, unicode):
+            return datatype
+        return datatype.uri
+
     def getLanguage(self):
         """The language for this Literal"""
         return self._language
     
     def setLanguage(self, language):
         """Set the language for this Literal"""
-        self._language = language.lower() if language else None # pylint: disable-msg=W0201
+        self._language = language.lower() if language else None
+        self._ntriples = None
 
     language = property(getLanguage, setLanguage)
 
@@ -137,7 +161,8 @@ class Literal(Value):
     
     def setLabel(self, label):
         """Set the label for this Literal"""
-        self._label = label # pylint: disable-msg=W0201
+        self._label = label
+        self._ntriples = None
     
     def getValue(self):
         """The label/value"""
@@ -146,7 +171,7 @@ class Literal(Value):
     label = property(getLabel, setLabel)
 
     def get_cmp_key(self):
-        return LITERAL_CMP_KEY, self.label, self.datatype, self.language
+        return LITERAL_CMP_KEY, self._label, self._datatype_uri(), self._language
     
     def intValue(self):
         """Convert to int"""
@@ -206,17 +231,19 @@ class Literal(Value):
         """
         Return an NTriples representation for this Literal.
         """
-        sb = []
-        sb.append('"')
-        sb.append(strings.encode_ntriple_string(self.getLabel()))
-        sb.append('"')
-        if self.language:
-            sb.append('@')
-            sb.append(self.language)
-        if self.datatype:
-            sb.append("^^")
-            sb.append(self.datatype.toNTriples())
-        return ''.join(sb)
+        result = self._ntriples
+        if result is None:
+            result = '"' + strings.encode_ntriple_string(self._label) + '"'
+            if self._language:
+                result += '@' + self._language
+            datatype = self._datatype
+            if datatype:
+                if isinstance(datatype, URI):
+                    result += '^^' + datatype.toNTriples()
+                else:
+                    result += '^^' + strings.encode_ntriple_uri(datatype)
+            self._ntriples = result
+        return result
 
     def to_json_ld(self):
         """ Converts to an object to be used as a JSON-LD value. """
@@ -226,10 +253,11 @@ class Literal(Value):
                 ('@language', self.language)
             ])
 
-        if self.datatype is None or self.datatype == XMLSchema.STRING:
+        datatype = self._datatype_uri()
+        if datatype is None or datatype == XMLSchema.STRING.uri:
             return self.label
 
-        if self.datatype == XMLSchema.INTEGER:
+        if datatype == XMLSchema.INTEGER.uri:
             return int(self.label)
 
         return OrderedDict([
@@ -246,7 +274,7 @@ class Literal(Value):
         Slightly silly implementation because we implement a conversion table
         and then don't use the conversion functions.     
         """
-        return XSDToPython[getattr(self.datatype, "uri", None)](self)
+        return XSDToPython[self._datatype_uri()](self)
 
 
 XSDToPython = defaultdict(lambda: Literal.getValue, [
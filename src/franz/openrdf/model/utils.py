@@ -7,21 +7,83 @@
 from franz.openrdf.model.value import URI, BNode
 from franz.openrdf.model.literal import Literal
 from franz.openrdf.util import strings
+from franz.openrdf.util.cache import LRUCache
+
+# Default maximum number of terms kept in the term cache.
+TERM_CACHE_SIZE = 10000
+
+# Terms longer than this (in characters) are not cached.
+TERM_CACHE_MAX_LENGTH = 256
+
+# Maps N-Triples strings of URIs and blank nodes to parsed terms,
+# shared by all connections.
+_term_cache = LRUCache(TERM_CACHE_SIZE)
+_term_cache_max_length = TERM_CACHE_MAX_LENGTH
+
+
+def configure_term_cache(size=TERM_CACHE_SIZE, max_length=TERM_CACHE_MAX_LENGTH):
+    """
+    Change the settings of the cache used by :func:`parse_term`.
+
+    Query results and statements often contain the same terms
+    (predicates, types, ...) many times. Parsed URIs and blank nodes
+    are kept in a process-wide cache, so that each such term is parsed
+    only once and all results share a single object. Literals are not
+    cached, since they can be modified (e.g. with :meth:`.Literal.setLabel`).
+
+    :param size: Maximum number of cached terms (0 disables the cache).
+    :type size: int
+    :param max_length: Terms longer than this (in characters) are never cached.
+    :type max_length: int
+    """
+    global _term_cache_max_length
+    _term_cache.resize(size)
+    _term_cache_max_length = max_length
+
+
+def term_cache_stats():
+    """
+    Get usage statistics of the term cache.
+
+    :return: A dictionary with the number of cached terms (``size``),
+             the limit (``maxsize``) and counts of ``hits``, ``misses``
+             and ``evictions``.
+    :rtype: dict
+    """
+    return _term_cache.stats()
 
 
 def parse_term(string_term):
     """
     Given a string representing a term in ntriples format, return
     a URI, Literal, or BNode.
+
+    URIs and blank nodes are cached (see :func:`configure_term_cache`).
     """
     if not string_term:
         return string_term
 
-    if string_term.startswith('<'):
+    if (string_term[0] not in '<_' or _term_cache.maxsize <= 0 or
+            len(string_term) > _term_cache_max_length):
+        return _parse_term(string_term)
+    term = _term_cache.get(string_term)
+    if term is None:
+        term = _parse_term(string_term)
+        if term is not None:
+            _term_cache.put(string_term, term)
+    return term
+
+
+def _parse_term(string_term):
+    """
+    Parse a non-empty term without using the cache.
+    """
+    first = string_term[0]
+    if first == '<':
         return URI(strings.uriref(string_term))
-    elif string_term.startswith('"'):
+    elif first == '"':
         return Literal(*strings.literal(string_term))
-    elif string_term.startswith('_'):
+    elif first == '_':
         return BNode(strings.nodeid(string_term))
     elif string_term.startswith('default-graph'):
         return None
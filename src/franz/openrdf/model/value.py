@@ -23,12 +23,33 @@ import six
 from ..util import uris, strings
 
 
+# Number of canonical URIs found in / added to the intern table
+# (updated without locking, so approximate under concurrency).
+_intern_hits = 0
+_intern_misses = 0
+
 # Keys used to establish ordering between different types of terms
 LITERAL_CMP_KEY = 1
 URI_CMP_KEY = 2
 BNODE_CMP_KEY = 3
 
 
+def uri_intern_stats():
+    """
+    Get usage statistics of the table of canonical URIs.
+
+    Canonical URI objects (the default, see :meth:`.RepositoryConnection.createURI`)
+    are interned, so that creating the same URI again returns
+    the existing object instead of allocating a new one.
+
+    :return: A dictionary with the number of interned URIs (``size``),
+             the number of constructions that found an existing URI (``hits``)
+             and the number of new URIs added to the table (``misses``).
+    :rtype: dict
+    """
+    return dict(size=len(URI._instances), hits=_intern_hits, misses=_intern_misses)
+
+
 @python_2_unicode_compatible
 class Value(object):
     """
@@ -91,44 +112,42 @@ class URI(Resource):
     """
     Lightweight implementation of the class 'URI'.
     """
-    __slots__ = ('_uri', '_is_canonical')
+    __slots__ = ('_uri', '_is_canonical', '_ntriples')
 
     _instances = weakref.WeakValueDictionary()
 
     def __new__(cls, uri=None, namespace=None, localname=None, canonical=True):
+        global _intern_hits, _intern_misses
         if isinstance(uri, URI):
             if not canonical or uri._is_canonical:
                 return uri
-            uri = uri.uri
-        elif uri is None and namespace is not None:
-            uri = namespace + (localname or '')
-
-        if uri is None:
-            raise ValueError('Either URI or namespace is required.')
+            uri = uri._uri
+        else:
+            if uri is None:
+                if namespace is None:
+                    raise ValueError('Either URI or namespace is required.')
+                uri = namespace + (localname or '')
+            if uri and uri[0] == '<' and uri[-1] == '>':
+                # be kind and trim the uri:
+                uri = uri[1:-1]
 
         if canonical:
             result = URI._instances.get(uri)
             if result is not None:
+                _intern_hits += 1
                 return result
+            _intern_misses += 1
 
+        # All initialization is done here, so that interned
+        # instances are returned without running __init__ again.
         result = super(URI, cls).__new__(cls)
+        result._uri = uri
+        result._is_canonical = canonical
+        result._ntriples = None
         if canonical:
             URI._instances[uri] = result
         return result
 
-    def __init__(self, uri=None, namespace=None, localname=None, canonical=False):
-        if isinstance(uri, URI):
-            uri = uri.uri
-
-        if uri is None and namespace is not None:
-            uri = namespace + (localname or '')
-
-        if uri and uri[0] == '<' and uri[len(uri) - 1] == '>':
-            # be kind and trim the uri:
-            uri = uri[1:-1]
-        self._uri = uri
-        self._is_canonical = canonical
-
     def get_cmp_key(self):
         return URI_CMP_KEY, self.uri
     
@@ -171,7 +190,11 @@ class URI(Resource):
         Return an NTriples representation of a resource, in this case, wrap
         it in angle brackets.
         """
-        return strings.encode_ntriple_uri(self.uri)
+        # URIs are immutable, so the result can be cached.
+        result = self._ntriples
+        if result is None:
+            result = self._ntriples = strings.encode_ntriple_uri(self._uri)
+        return result
 
     def to_json_ld_key(self):
         """ Converts to a string to be used as a JSON-LD key. """
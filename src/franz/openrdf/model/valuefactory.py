@@ -13,6 +13,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from builtins import object
 
+from .blanknodes import BlankNodeAllocator, BLANK_NODE_AMOUNT, BLANK_NODE_MAX_AMOUNT
 from .value import Value, BNode, URI
 from .literal import Literal, CompoundLiteral, RangeLiteral, GeoCoordinate
 from .statement import Statement
@@ -21,16 +22,43 @@ class ValueFactory(object):
     """
     A factory for creating URIs, blank nodes, literals and statements.
     """
-    BLANK_NODE_AMOUNT = 10    
+    # Initial and maximum number of blank node ids fetched in a single request.
+    BLANK_NODE_AMOUNT = BLANK_NODE_AMOUNT
+    BLANK_NODE_MAX_AMOUNT = BLANK_NODE_MAX_AMOUNT
+
     def __init__(self, store):
         self.store = store
-        self.unusedBNodeIds = []
-        
+        self.blankNodeAllocator = BlankNodeAllocator(
+            self._fetchBlankNodes, amount=self.BLANK_NODE_AMOUNT, max_amount=self.BLANK_NODE_MAX_AMOUNT)
+
+    def _fetchBlankNodes(self, amount):
+        return self.store.mini_repository.getBlankNodes(amount=amount)
+
+    @property
+    def unusedBNodeIds(self):
+        """
+        Blank node ids (with the leading ``_:``) of the current block
+        that have not been used yet.
+        """
+        return self.blankNodeAllocator.ids
+
     def getUnusedBNodeId(self):
-        if not self.unusedBNodeIds:
-            ## retrieve a set of bnode ids (they include leading '_:', which we strip off later:
-            self.unusedBNodeIds = self.store.mini_repository.getBlankNodes(amount=ValueFactory.BLANK_NODE_AMOUNT)
-        return self.unusedBNodeIds.pop()[2:] ## strip off leading '_:'
+        """
+        Get an unused blank node id (without the leading ``_:``).
+        Ids are reserved on the server in blocks (see
+        :class:`~franz.openrdf.model.blanknodes.BlankNodeAllocator`).
+        This method is thread-safe.
+        """
+        return self.blankNodeAllocator.allocate()
+
+    def getBlankNodeStats(self):
+        """
+        Get statistics of blank node id allocation, see
+        :meth:`.BlankNodeAllocator.stats`.
+
+        :rtype: dict
+        """
+        return self.blankNodeAllocator.stats()
 
     def createBNode(self, nodeID=None):
         """
@@ -0,0 +1,93 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Query objects returned by
+:class:`~franz.openrdf.repository.asyncrepositoryconnection.AsyncRepositoryConnection`.
+
+The ``evaluate`` methods of these classes are coroutines.
+This module requires Python 3.5 or later.
+"""
+
+from .query import BooleanQuery, GraphQuery, TupleQuery, UpdateQuery
+from .queryresult import GraphQueryResult, TupleQueryResult
+
+# Note: evaluate_generic_query() calls the mini-repository of the connection,
+# which for asynchronous connections returns an awaitable instead of a result.
+
+
+class AsyncTupleQuery(TupleQuery):
+    """
+    A query that returns tuples (i.e. sets of variable bindings).
+    """
+    async def evaluate(self, count=False):
+        """
+        Execute the embedded query against the RDF store.
+
+        :param count: If ``True`` return the number of result rows
+                      instead of the usual iterator.
+        :type count: bool
+        :return: Either an iterator over results or
+                 an integer (the number of results, if ``count`` is used).
+        :rtype: TupleQueryResult|int
+        """
+        response = await self.evaluate_generic_query(count=count)
+        if count:
+            return response
+        return TupleQueryResult(response['names'], response['values'], response.get('queryInfo'))
+
+    async def analyze(self, analysisTechnique=None, analysisTimeout=None):
+        """
+        Analyze the query, see :meth:`TupleQuery.analyze`.
+
+        :return: Analysis result as a dictionary.
+        :rtype: dict
+        """
+        return await self.evaluate_generic_query(analyze=True, analysisTechnique=analysisTechnique,
+                                                 analysisTimeout=analysisTimeout)
+
+
+class AsyncUpdateQuery(UpdateQuery):
+    """
+    An update query.
+    """
+    async def evaluate(self):
+        """
+        Execute the embedded update against the RDF store.
+
+        :return: ``True`` if the query changed the store, ``False`` otherwise.
+        :rtype: bool
+        """
+        return await self.evaluate_generic_query(update=True)
+
+
+class AsyncGraphQuery(GraphQuery):
+    """
+    A query that returns statements (see :class:`Statement`).
+    """
+    async def evaluate(self):
+        """
+        Execute the embedded query against the RDF store.
+
+        :return: An iterator over statements.
+        :rtype: GraphQueryResult
+        """
+        return GraphQueryResult(await self.evaluate_generic_query())
+
+
+class AsyncBooleanQuery(BooleanQuery):
+    """
+    A query that returns a boolean.
+    """
+    async def evaluate(self):
+        """
+        Execute the embedded query against the RDF store.
+
+        :return: A boolean.
+        :rtype: bool
+        """
+        return await self.evaluate_generic_query()
@@ -0,0 +1,124 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Duplicate filters working on statements in N-Triples format
+(see :meth:`.RepositoryResult.enableDuplicateFilter`).
+"""
+
+from __future__ import absolute_import, unicode_literals, division
+
+import hashlib
+import math
+import struct
+
+from future.builtins import object, range
+
+# Default expected number of statements for Bloom filters,
+# used when the size of a result is not known.
+BLOOM_FILTER_CAPACITY = 1000000
+
+# Default false positive rate of Bloom filters.
+BLOOM_FILTER_ERROR_RATE = 0.001
+
+if hasattr(hashlib, 'blake2b'):
+    def _digest(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+else:
+    def _digest(data):
+        return hashlib.md5(data).digest()
+
+
+def statement_digest(string_tuple):
+    """
+    Compute a 16 byte digest of the subject, predicate, object and
+    context of a statement. Triple IDs are ignored.
+
+    :param string_tuple: Statement components in N-Triples format
+                         (the context may be ``None`` or missing).
+    :type string_tuple: tuple[string]
+    :rtype: bytes
+    """
+    # Newlines are always escaped in N-Triples terms.
+    return _digest('\n'.join([term or '' for term in string_tuple[:4]]).encode('utf-8'))
+
+
+class DigestFilter(object):
+    """
+    Remembers digests of all statements seen so far.
+
+    Each distinct statement takes about 100 bytes (on 64-bit CPython),
+    regardless of the size of its terms. Different statements
+    could in theory have the same 128-bit digest, but the probability
+    of that is negligible.
+    """
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, string_tuple):
+        """
+        Record a statement.
+
+        :return: ``True`` if the statement has not been seen before.
+        :rtype: bool
+        """
+        digest = statement_digest(string_tuple)
+        if digest in self._seen:
+            return False
+        self._seen.add(digest)
+        return True
+
+    def __len__(self):
+        return len(self._seen)
+
+
+class BloomFilter(object):
+    """
+    A probabilistic filter with memory usage fixed at creation time.
+
+    As long as the number of distinct statements does not exceed
+    ``capacity``, a statement is wrongly reported as already seen with
+    probability at most ``error_rate``. The filter takes about
+    ``-1.44 * log2(error_rate) * capacity`` bits, i.e. 1.8 bytes per
+    statement for a rate of 0.1%. Above the capacity the memory usage
+    stays the same, but the error rate grows.
+    """
+    def __init__(self, capacity=BLOOM_FILTER_CAPACITY, error_rate=BLOOM_FILTER_ERROR_RATE):
+        """
+        :param capacity: Expected number of distinct statements.
+        :type capacity: int
+        :param error_rate: False positive rate at full capacity (between 0 and 1).
+        :type error_rate: float
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1.')
+        capacity = max(int(capacity), 1)
+        log2 = math.log(2)
+        self.size = max(int(math.ceil(-capacity * math.log(error_rate) / (log2 * log2))), 8)
+        self.hash_count = max(int(round(self.size / capacity * log2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, string_tuple):
+        """
+        Record a statement.
+
+        :return: ``True`` if the statement has (probably) not been seen before.
+        :rtype: bool
+        """
+        # Derive all bit positions from two 64-bit hashes.
+        h1, h2 = struct.unpack('<QQ', statement_digest(string_tuple))
+        bits = self._bits
+        size = self.size
+        new = False
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % size
+            byte = bits[position >> 3]
+            mask = 1 << (position & 7)
+            if not byte & mask:
+                bits[position >> 3] = byte | mask
+                new = True
+        return new
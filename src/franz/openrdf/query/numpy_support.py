@@ -0,0 +1,272 @@
+"""
+Conversion of query results to NumPy arrays, one array per variable.
+
+Values are decoded directly from the N-Triples strings sent by the server,
+without creating a term object for each cell.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from collections import OrderedDict
+
+import iso8601
+import numpy
+from future.builtins import object
+
+from franz.openrdf.model import Literal, parse_term
+from franz.openrdf.util import strings
+from franz.openrdf.vocabulary.xmlschema import XMLSchema
+
+# Kinds of cells
+_URI = 'uri'
+_BNODE = 'bnode'
+_STRING = 'string'
+_INT = 'int'
+_FLOAT = 'float'
+_BOOL = 'bool'
+_DATETIME = 'datetime'
+_DATE = 'date'
+_OTHER = 'other'
+
+_DATATYPE_KINDS = dict(
+    [(t.uri, _INT) for t in (
+        XMLSchema.INT, XMLSchema.INTEGER, XMLSchema.LONG, XMLSchema.SHORT, XMLSchema.BYTE,
+        XMLSchema.NON_POSITIVE_INTEGER, XMLSchema.NEGATIVE_INTEGER,
+        XMLSchema.NON_NEGATIVE_INTEGER, XMLSchema.POSITIVE_INTEGER,
+        XMLSchema.UNSIGNED_LONG, XMLSchema.UNSIGNED_INT,
+        XMLSchema.UNSIGNED_SHORT, XMLSchema.UNSIGNED_BYTE)] +
+    [(t.uri, _FLOAT) for t in (XMLSchema.FLOAT, XMLSchema.DOUBLE, XMLSchema.DECIMAL)] +
+    [(XMLSchema.BOOLEAN.uri, _BOOL),
+     (XMLSchema.DATETIME.uri, _DATETIME),
+     (XMLSchema.DATE.uri, _DATE),
+     (XMLSchema.STRING.uri, _STRING)])
+
+_NUMERIC = frozenset([_INT, _FLOAT])
+_RESOURCES = frozenset([_URI, _BNODE])
+
+
+class Categorical(object):
+    """
+    A dictionary-encoded column, used for URIs and blank nodes.
+
+    Each distinct value is stored once in :attr:`categories`,
+    :attr:`codes` contains an index into that array for each row
+    (-1 for unbound values). URIs are represented by plain strings
+    (without angle brackets), blank nodes by strings in N-Triples
+    format (``_:id``).
+    """
+    __slots__ = ('codes', 'categories')
+
+    def __init__(self, codes, categories):
+        #: Category index of each row (int32 array).
+        self.codes = codes
+        #: Distinct values (object array of strings).
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        return self.categories[code] if code >= 0 else None
+
+    def __array__(self, dtype=None):
+        # The extra element at the end is selected by code -1.
+        values = numpy.empty(len(self.categories) + 1, dtype=object)
+        values[:-1] = self.categories
+        values[-1] = None
+        result = values[self.codes]
+        return result if dtype is None else result.astype(dtype)
+
+    def __repr__(self):
+        return 'Categorical(%d rows, %d categories)' % (len(self.codes), len(self.categories))
+
+
+def _term_to_python(term):
+    if term is None:
+        return None
+    if isinstance(term, Literal):
+        return term.toPython()
+    return str(term)
+
+
+def _object_column(cells):
+    """
+    Convert cells one by one. Used when no typed representation applies.
+    """
+    def convert(cell):
+        if isinstance(cell, list):
+            return [convert(elt) for elt in cell]
+        return _term_to_python(parse_term(cell))
+    result = numpy.empty(len(cells), dtype=object)
+    result[:] = [convert(cell) for cell in cells]
+    return result
+
+
+def _strip_timezone(value, is_date):
+    """
+    Convert a lexical xsd:dateTime or xsd:date value to a form understood
+    by numpy (without a timezone). Times are converted to UTC.
+    """
+    if value is None:
+        return None
+    if value.endswith('Z'):
+        return value[:-1]
+    if len(value) > 6 and value[-6] in '+-' and value[-3] == ':':
+        if is_date:
+            return value[:-6]
+        parsed = iso8601.parse_date(value)
+        return parsed.astimezone(iso8601.UTC).replace(tzinfo=None).isoformat()
+    return value
+
+
+def _categorical(cells):
+    mapping = {}
+    codes = numpy.fromiter(
+        (-1 if cell is None else mapping.setdefault(cell, len(mapping)) for cell in cells),
+        dtype=numpy.int32, count=len(cells))
+    categories = numpy.empty(len(mapping), dtype=object)
+    for cell, code in mapping.items():
+        categories[code] = strings.uriref(cell) if cell[0] == '<' else cell
+    return Categorical(codes, categories)
+
+
+def _typed_column(kind, values, missing):
+    """
+    Convert lexical values (``None`` if unbound) of a single kind to an array.
+
+    :return: An array or ``None`` if there is no typed representation.
+    """
+    count = len(values)
+    if kind == _INT and not missing:
+        return numpy.fromiter((int(value) for value in values), dtype=numpy.int64, count=count)
+    if kind == _INT or kind == _FLOAT:
+        nan = float('nan')
+        return numpy.fromiter((nan if value is None else float(value) for value in values),
+                              dtype=numpy.float64, count=count)
+    if kind == _BOOL:
+        flags = [None if value is None else value in ('true', '1') for value in values]
+        return numpy.array(flags, dtype=object if missing else bool)
+    if kind == _DATETIME:
+        return numpy.array([_strip_timezone(value, False) for value in values],
+                           dtype='datetime64[us]')
+    if kind == _DATE:
+        return numpy.array([_strip_timezone(value, True) for value in values],
+                           dtype='datetime64[D]')
+    if kind == _STRING:
+        # Decode each distinct value once.
+        decoded = dict((value, strings.ntriples_unescape(value)) for value in set(values))
+        result = numpy.empty(count, dtype=object)
+        result[:] = [decoded[value] for value in values]
+        return result
+    return None
+
+
+def _classify(cells):
+    """
+    Determine the kinds of all cells and extract lexical values of literals.
+
+    :return: A pair (set of kinds, list of lexical values).
+    """
+    kinds = set()
+    values = []
+    append = values.append
+    for cell in cells:
+        if cell is None:
+            append(None)
+            continue
+        first = cell[0]
+        if first == '"':
+            end = cell.rfind('"')
+            if end == len(cell) - 1 or cell[end + 1] == '@':
+                kinds.add(_STRING)
+            else:
+                kinds.add(_DATATYPE_KINDS.get(cell[end + 4:-1], _OTHER))
+            append(cell[1:end])
+        else:
+            if first == '<':
+                kinds.add(_URI)
+            elif first == '_':
+                kinds.add(_BNODE)
+            else:
+                kinds.add(_OTHER)
+            append(cell)
+    return kinds, values
+
+
+def decode_column(cells):
+    """
+    Convert a list of terms in N-Triples format (``None`` for unbound
+    values) to an array.
+
+    The type of the result depends on the terms:
+
+       - Integers: int64 (float64 if some values are unbound).
+       - Other numbers (including decimals): float64.
+       - Booleans: bool (object if some values are unbound).
+       - xsd:dateTime: datetime64[us] (in UTC if there is a timezone).
+       - xsd:date: datetime64[D].
+       - URIs and blank nodes: :class:`Categorical`.
+       - Plain and language tagged strings: object array of strings.
+
+    Unbound values are NaN or NaT in numeric and date columns.
+    Any other column (e.g. with values of different types)
+    is converted to an object array of Python values
+    (see :meth:`.Literal.toPython`).
+
+    :param cells: Terms in N-Triples format.
+    :type cells: list[string]
+    :rtype: numpy.ndarray|Categorical
+    """
+    present = [cell for cell in cells if cell is not None]
+    missing = len(present) < len(cells)
+    if not present:
+        result = numpy.empty(len(cells), dtype=object)
+        result.fill(None)
+        return result
+    if not all(present) or any(isinstance(cell, list) for cell in present):
+        return _object_column(cells)
+    try:
+        # Usually all values in a column have the same datatype,
+        # check that with a single pass over the column.
+        sample = present[0]
+        if sample[0] == '"' and sample[-1] == '>':
+            suffix = sample[sample.rfind('"'):]
+            kind = _DATATYPE_KINDS.get(suffix[4:-1])
+            if kind is not None and all(cell.endswith(suffix) for cell in present):
+                cut = -len(suffix)
+                result = _typed_column(
+                    kind, [None if cell is None else cell[1:cut] for cell in cells], missing)
+                if result is not None:
+                    return result
+        elif all(cell[0] == '<' or cell[0] == '_' for cell in present):
+            return _categorical(cells)
+
+        kinds, values = _classify(cells)
+        if len(kinds) == 1:
+            result = _typed_column(kinds.pop(), values, missing)
+        elif kinds <= _NUMERIC:
+            result = _typed_column(_FLOAT, values, missing)
+        else:
+            result = None
+        if result is not None:
+            return result
+    except (ValueError, OverflowError, iso8601.ParseError):
+        # Malformed or out of range values.
+        pass
+    return _object_column(cells)
+
+
+def rows_to_numpy(rows, column_names):
+    """
+    Convert query result rows to arrays (see :func:`decode_column`).
+
+    :param rows: Result rows, each row is a list of terms in N-Triples format.
+    :type rows: list[list[string]]
+    :param column_names: Variable names.
+    :type column_names: list[string]
+    :return: A dictionary mapping variable names to columns.
+    :rtype: OrderedDict[string, numpy.ndarray|Categorical]
+    """
+    return OrderedDict((name, decode_column([row[index] for row in rows]))
+                       for index, name in enumerate(column_names))
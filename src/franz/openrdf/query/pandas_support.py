@@ -21,3 +21,13 @@ def rows_to_pandas(rows, column_names):
         for idx, term in enumerate(row):
             columns[idx].append(term_to_pandas(term))
     return pandas.DataFrame(OrderedDict(zip(column_names, columns)))
+
+
+def columns_to_pandas(columns):
+    from franz.openrdf.query.numpy_support import Categorical
+    data = OrderedDict()
+    for name, column in columns.items():
+        if isinstance(column, Categorical):
+            column = pandas.Categorical.from_codes(column.codes, column.categories)
+        data[name] = column
+    return pandas.DataFrame(data)
@@ -16,12 +16,13 @@ from past.builtins import basestring
 
 from future.utils import iteritems, python_2_unicode_compatible
 
+from franz.miniclient.streaming import ResponseStream, paged_request
 from franz.openrdf.rio.rdfformat import RDFFormat
 from franz.openrdf.rio.tupleformat import TupleFormat
 from franz.openrdf.util.contexts import output_to
 from ..exceptions import IllegalOptionException, QueryMissingFeatureException
 from .dataset import ALL_CONTEXTS, Dataset
-from .queryresult import GraphQueryResult, TupleQueryResult
+from .queryresult import GraphQueryResult, PagedTupleQueryResult, StreamingTupleQueryResult, TupleQueryResult
 
 
 @python_2_unicode_compatible
@@ -245,24 +246,20 @@ class Query(object):
         :rtype: dict|string|int|bool
         """
         conn = self._get_connection()
-        namedContexts = conn._contexts_to_ntriple_contexts(
-                        self.dataset.getNamedGraphs() if self.dataset else None)
-        regularContexts = conn._contexts_to_ntriple_contexts(
-                self.dataset.getDefaultGraphs() if self.dataset else ALL_CONTEXTS)
-        bindings = None
-        if self.bindings:
-            bindings = {}
-            for vbl, val in list(self.bindings.items()):
-                bindings[vbl] = conn._convert_term_to_mini_term(val)
         mini = conn._get_mini_repository()
         if self.queryLanguage == QueryLanguage.SPARQL:  
-            response = mini.evalSparqlQuery(self.queryString, context=regularContexts, namedContext=namedContexts, 
-                                            infer=self.includeInferred, bindings=bindings,
-                                            checkVariables=self.checkVariables, count=count,
-                                            accept=accept, callback=callback,
-                                            analyze=analyze, analysisTechnique=analysisTechnique,
-                                            analysisTimeout=analysisTimeout, update=update)
+            arguments = self._get_sparql_arguments(
+                count=count, accept=accept, analyze=analyze, analysisTechnique=analysisTechnique,
+                analysisTimeout=analysisTimeout, update=update)
+            cache = conn._query_cache
+            if cache is not None and callback is None and not update and not analyze:
+                return self._evaluate_cached(cache, arguments)
+            response = mini.evalSparqlQuery(callback=callback, **arguments)
+            if update:
+                conn._note_write()
         elif self.queryLanguage == QueryLanguage.PROLOG:
+            namedContexts = conn._contexts_to_ntriple_contexts(
+                            self.dataset.getNamedGraphs() if self.dataset else None)
             if namedContexts:
                 raise QueryMissingFeatureException("Prolog queries do not support the datasets (named graphs) option.")
             if analyze:
@@ -271,10 +268,60 @@ class Query(object):
             response = mini.evalPrologQuery(self.queryString,
                                             infer=self.includeInferred, count=count, accept=accept,
                                             callback=callback)
+            conn._note_write()
         else:
             raise ValueError('Unsupported query language: %s' % self.queryLanguage)
         return response
 
+    def _evaluate_cached(self, cache, arguments):
+        """
+        Evaluate a SPARQL query, using a cached response if the repository
+        has not changed since it was retrieved.
+
+        :param cache: The query cache of the connection.
+        :type cache: franz.openrdf.query.querycache.QueryCache
+        :param arguments: Arguments of ``evalSparqlQuery``
+                          (see :meth:`_get_sparql_arguments`).
+        :type arguments: dict
+        :return: Query response.
+        """
+        conn = self._get_connection()
+        mini = conn._get_mini_repository()
+        # User attributes can affect results if there is an attribute filter.
+        key = cache.make_key(dict(arguments, user_attributes=mini.user_attributes))
+        generation = cache.generation(conn)
+        response = cache.get(key, generation)
+        if response is None:
+            response = mini.evalSparqlQuery(**arguments)
+            cache.put(key, generation, response)
+        return response
+
+    def _get_sparql_arguments(self, count=False, accept=None, analyze=False,
+                              analysisTechnique=None, analysisTimeout=None, update=False):
+        """
+        Compute keyword arguments for the ``evalSparqlQuery`` method
+        of the mini-repository. See :meth:`evaluate_generic_query`
+        for a description of the parameters.
+
+        :return: A dictionary of arguments (without ``callback``).
+        :rtype: dict
+        """
+        conn = self._get_connection()
+        namedContexts = conn._contexts_to_ntriple_contexts(
+                        self.dataset.getNamedGraphs() if self.dataset else None)
+        regularContexts = conn._contexts_to_ntriple_contexts(
+                self.dataset.getDefaultGraphs() if self.dataset else ALL_CONTEXTS)
+        bindings = None
+        if self.bindings:
+            bindings = {}
+            for vbl, val in list(self.bindings.items()):
+                bindings[vbl] = conn._convert_term_to_mini_term(val)
+        return dict(query=self.queryString, context=regularContexts, namedContext=namedContexts,
+                    infer=self.includeInferred, bindings=bindings,
+                    checkVariables=self.checkVariables, count=count,
+                    accept=accept, analyze=analyze, analysisTechnique=analysisTechnique,
+                    analysisTimeout=analysisTimeout, update=update)
+
     @staticmethod
     def _check_language(queryLanguage):
         if queryLanguage == 'SPARQL':
@@ -294,13 +341,18 @@ class TupleQuery(Query):
     A query that returns tuples (i.e. sets of variable bindings).
     """
     def evaluate(self, count=False, output=None,
-                 output_format=TupleFormat.TABLE):
+                 output_format=TupleFormat.TABLE, streaming=False, columnar=False):
         """Execute the embedded query against the RDF store.
 
         Return an iterator that produces for each step a tuple of values
         (resources and literals) corresponding to the variables or
         expressions in a 'select' clause (or its equivalent).
 
+        By default the whole result is received and parsed before this
+        method returns. With ``streaming=True`` rows are parsed as they
+        arrive instead, so memory usage and the time to the first row
+        do not depend on the size of the result.
+
         :param count: If ``True`` return the number of result rows
                       instead of the usual iterator.
         :type count: bool
@@ -312,11 +364,30 @@ class TupleQuery(Query):
         :param output_format: Serialization format for ``output``.
                               The default is TABLE.
         :type output_format: RDFFormat
+        :param streaming: If ``True`` return a :class:`StreamingTupleQueryResult`
+                          that parses the response incrementally. Such a result
+                          must be closed if it is not consumed completely.
+                          Cannot be combined with ``count`` or ``output``.
+        :type streaming: bool
+        :param columnar: If ``True`` the result's ``toPandas()`` method decodes
+                         whole columns into typed arrays (see
+                         :meth:`TupleQueryResult.toNumpy`) instead of converting
+                         values one by one. This is much faster for large results.
+                         Cannot be combined with ``streaming``.
+        :type columnar: bool
         :return: Either an iterator over results, 
                  an integer (the number of results, if ``count`` is used) 
                  or ``None`` (if ``output`` is used).
-        :rtype: TupleQueryResult|int
+        :rtype: TupleQueryResult|StreamingTupleQueryResult|int
         """
+        if streaming:
+            if columnar:
+                raise ValueError('streaming cannot be used with columnar.')
+            if count or output is not None:
+                raise ValueError('streaming cannot be used with count or output.')
+            return StreamingTupleQueryResult(ResponseStream(
+                lambda callback: self.evaluate_generic_query(accept='application/json',
+                                                             callback=callback)))
 
         with output_to(output) as out:
             callback = None if output is None else out.write
@@ -330,7 +401,54 @@ class TupleQuery(Query):
             if output is not None:
                 return None
 
-            return TupleQueryResult(response['names'], response['values'], response.get('queryInfo'))
+            return TupleQueryResult(response['names'], response['values'], response.get('queryInfo'),
+                                    columnar=columnar)
+
+    def evaluatePaged(self, page_size=50000, prefetch=2, limit=None, offset=None):
+        """
+        Execute the query as a sequence of requests, each returning
+        at most ``page_size`` rows.
+
+        Pages are retrieved by a background thread, up to ``prefetch``
+        pages ahead of the page being consumed. Memory usage
+        depends on the page size, but not on the size of the result.
+
+        Each page is computed by a separate evaluation of the query.
+        The query should have an ORDER BY clause, otherwise the order
+        of rows (and so the contents of pages) is not guaranteed to be
+        the same in each evaluation. Changes made to the repository
+        while the result is being read might also cause rows to be
+        skipped or repeated.
+
+        :param page_size: Number of rows requested at once.
+        :type page_size: int
+        :param prefetch: Number of pages that can be retrieved ahead
+                         of the consumer.
+        :type prefetch: int
+        :param limit: Maximum number of rows to retrieve (``None`` means no limit).
+        :type limit: int
+        :param offset: Number of rows to skip.
+        :type offset: int
+        :return: An iterator over results. It must be closed if it is
+                 not consumed completely.
+        :rtype: PagedTupleQueryResult
+        """
+        if self.queryLanguage != QueryLanguage.SPARQL:
+            raise QueryMissingFeatureException("Only SPARQL queries can be evaluated in pages.")
+        mini = self._get_connection()._get_mini_repository()
+        arguments = self._get_sparql_arguments()
+        names = []
+
+        def fetch(position, count):
+            response = mini.evalSparqlQuery(limit=count, offset=position, **arguments)
+            if not names:
+                names.extend(response['names'])
+            return response['values']
+
+        return PagedTupleQueryResult(
+            ResponseStream(paged_request(fetch, page_size, offset=offset, limit=limit),
+                           max_chunks=max(prefetch, 1)),
+            names)
 
     def analyze(self, analysisTechnique=None, analysisTimeout=None):
         """
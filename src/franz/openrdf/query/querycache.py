@@ -0,0 +1,166 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Client-side cache of query results (see
+:meth:`.RepositoryConnection.enableQueryCache`).
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import threading
+import time
+
+from future.builtins import object
+
+from ..util.cache import LRUCache
+
+# Default maximum number of cached results.
+QUERY_CACHE_SIZE = 100
+
+# Default maximum number of rows in a cached result.
+QUERY_CACHE_MAX_ROWS = 10000
+
+
+def _freeze(value):
+    """
+    Convert lists and dictionaries to hashable tuples.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _result_rows(response):
+    """
+    Size of a query response, as counted by the max_rows limit.
+    """
+    if isinstance(response, dict):
+        return len(response.get('values') or ())
+    if isinstance(response, list):
+        return len(response)
+    return 1
+
+
+class QueryCache(object):
+    """
+    Stores responses of read-only queries, together with the repository
+    generation at the time the query was evaluated.
+
+    A cached response is returned only if the generation has not changed
+    since. Checking the generation requires a (cheap) request. With
+    ``max_staleness`` set, the generation is checked at most once every
+    ``max_staleness`` seconds, so changes made by other clients can go
+    unnoticed for that long. Changes made through the connection that
+    owns the cache always invalidate it (see :meth:`invalidate`).
+    """
+    def __init__(self, size=QUERY_CACHE_SIZE, max_staleness=0, max_rows=QUERY_CACHE_MAX_ROWS):
+        """
+        :param size: Maximum number of cached results.
+        :type size: int
+        :param max_staleness: Time (in seconds) during which the generation
+                              is not checked again (0 means always check).
+        :type max_staleness: float
+        :param max_rows: Results with more rows than this are not cached
+                         (``None`` means no limit).
+        :type max_rows: int
+        """
+        self.max_staleness = max_staleness
+        self.max_rows = max_rows
+        self._entries = LRUCache(size)
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = None
+        self.hits = 0
+        self.misses = 0
+        self.generation_checks = 0
+
+    @staticmethod
+    def make_key(arguments):
+        """
+        Compute the cache key of a query.
+
+        :param arguments: Query text and all other parameters that affect the result.
+        :type arguments: dict
+        """
+        return _freeze(arguments)
+
+    def generation(self, connection):
+        """
+        Return the current generation of the repository, or a recently
+        retrieved value (see ``max_staleness``).
+
+        :param connection: Connection used to get the generation.
+        :type connection: RepositoryConnection
+        """
+        with self._lock:
+            if (self._generation is not None and self.max_staleness and
+                    time.time() - self._checked_at < self.max_staleness):
+                return self._generation
+        generation = connection.getGeneration()
+        with self._lock:
+            self.generation_checks += 1
+            self._generation = generation
+            self._checked_at = time.time()
+        return generation
+
+    def get(self, key, generation):
+        """
+        Look up a response.
+
+        :return: The cached response or ``None``.
+        """
+        entry = self._entries.get(key)
+        with self._lock:
+            if entry is not None and entry[0] == generation:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, generation, response):
+        """
+        Store a response obtained at the given generation.
+        """
+        if response is None:
+            return
+        if self.max_rows is not None and _result_rows(response) > self.max_rows:
+            return
+        self._entries.put(key, (generation, response))
+
+    def invalidate(self):
+        """
+        Drop all cached responses and force a generation check.
+        """
+        self._entries.clear(reset_stats=False)
+        with self._lock:
+            self._generation = None
+            self._checked_at = None
+
+    def stats(self):
+        """
+        Get usage statistics.
+
+        The result is a dictionary with the following entries:
+
+           - ``size``: number of cached results.
+           - ``maxsize``: maximum number of cached results.
+           - ``hits``: number of queries answered from the cache.
+           - ``misses``: number of queries sent to the server.
+           - ``evictions``: number of results dropped to make room for new ones.
+           - ``generation_checks``: number of generation requests.
+
+        :rtype: dict
+        """
+        entries = self._entries.stats()
+        with self._lock:
+            return dict(size=entries['size'], maxsize=entries['maxsize'],
+                        hits=self.hits, misses=self.misses,
+                        evictions=entries['evictions'],
+                        generation_checks=self.generation_checks)
@@ -14,7 +14,9 @@ from past.builtins import unicode
 from ..model import Statement, parse_term
 from .repositoryresult import RepositoryResult
 
-from collections import namedtuple
+from collections import deque, namedtuple
+
+from franz.miniclient.streaming import SelectResponseParser
 
 
 try:
@@ -23,6 +25,12 @@ try:
 except ImportError:
     has_pandas = False
 
+try:
+    import franz.openrdf.query.numpy_support as numpy_support
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
 
 class QueryResult(object):
     """
@@ -76,7 +84,7 @@ class TupleQueryResult(QueryResult):
     bindings. Note: take care to always close a TupleQueryResult after use to
     free any resources it keeps hold of.
     """
-    def __init__(self, variable_names, string_tuples, metadata=None):
+    def __init__(self, variable_names, string_tuples, metadata=None, columnar=False):
         QueryResult.__init__(self)
         if not isinstance(variable_names, list):
             variable_names = [variable_names]
@@ -87,6 +95,7 @@ class TupleQueryResult(QueryResult):
         self.tuple_count = len(string_tuples)
         self.binding_set = ListBindingSet(self.variable_names)
         self.metadata = metadata
+        self.columnar = columnar
 
     def __iter__(self):
         return self
@@ -134,12 +143,188 @@ class TupleQueryResult(QueryResult):
     def rowCount(self):
         return len(self)
 
+    def toNumpy(self):
+        """
+        Convert the result to NumPy arrays, one for each variable.
+
+        Typed literals are decoded directly into numeric (int64, float64),
+        boolean and datetime64 arrays, URIs and blank nodes into
+        :class:`~franz.openrdf.query.numpy_support.Categorical` columns
+        (see :func:`~franz.openrdf.query.numpy_support.decode_column`).
+
+        :return: A dictionary mapping variable names to columns.
+        :rtype: OrderedDict[string, numpy.ndarray|Categorical]
+        """
+        if not has_numpy:
+            raise Exception('NumPy not installed.')
+        return numpy_support.rows_to_numpy(self.string_tuples, self.variable_names)
+
+    def toPandas(self):
+        """
+        Convert the result to a Pandas DataFrame.
+
+        If the result has been created with ``columnar=True``
+        the columns are built as in :meth:`toNumpy` (URIs become
+        categorical columns), otherwise each value is converted
+        with :meth:`.Literal.toPython`.
+
+        :rtype: pandas.DataFrame
+        """
+        if not has_pandas:
+            raise Exception('Pandas not installed.')
+        if self.columnar:
+            return pandas.columns_to_pandas(self.toNumpy())
+        return pandas.rows_to_pandas(self, self.variable_names)
+
+
+class StreamingTupleQueryResult(QueryResult):
+    """
+    A tuple query result that is parsed incrementally while it is being
+    received from the server (see ``TupleQuery.evaluate(streaming=True)``).
+
+    Only a bounded part of the response is held in memory at any time,
+    so the first rows are available long before a large result has been
+    transferred. The result can be iterated only once and its size is
+    not known in advance.
+
+    Close the result (or use it in a ``with`` statement) if it is
+    not consumed completely - this aborts the transfer.
+    """
+    def __init__(self, chunks):
+        """
+        Start processing a response.
+
+        :param chunks: An iterator over response chunks, with a ``close`` method.
+        :type chunks: franz.miniclient.streaming.ResponseStream
+        """
+        QueryResult.__init__(self)
+        self.chunks = chunks
+        self.parser = SelectResponseParser()
+        self.rows = deque()
+        # Variable names are sent before the rows, wait for them
+        # so that getBindingNames() works right away.
+        while self.parser.names is None and self._read_chunk():
+            pass
+        self.variable_names = self.parser.names or []
+        self.binding_set = ListBindingSet(self.variable_names)
+
+    def _read_chunk(self):
+        """
+        Parse the next chunk of the response.
+
+        :return: ``False`` if the whole response has been processed.
+        :rtype: bool
+        """
+        if self.parser.finished:
+            return False
+        for chunk in self.chunks:
+            self.rows.extend(self.parser.feed(chunk))
+            return True
+        self.rows.extend(self.parser.feed(b'', final=True))
+        return False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Return the next result tuple if there is one.
+
+        Note that the same binding set object is returned for each tuple.
+
+        :return: The next tuple.
+        :rtype: ListBindingSet
+        :raises StopIteration: If there are no more items to return.
+        """
+        rows = self.rows
+        while not rows:
+            if not self._read_chunk() and not rows:
+                raise StopIteration()
+        bset = self.binding_set
+        bset._reset(rows.popleft())
+        return bset
+
+    def close(self):
+        chunks = getattr(self, 'chunks', None)
+        if chunks is not None:
+            chunks.close()
+
+    def getBindingNames(self):
+        """
+        Get the names of the bindings, in order of projection.
+
+        :return: A list of names.
+        :rtype: list[string]
+        """
+        return self.variable_names
+
+    def getMetadata(self):
+        """
+        Get a nested dictionary containing query result metadata.
+
+        Metadata is sent after the rows, so this returns ``None``
+        until the whole result has been read.
+
+        :return: A dictionary
+        :rtype: dict
+        """
+        return self.parser.fields.get('queryInfo')
+
     def toPandas(self):
         if not has_pandas:
             raise Exception('Pandas not installed.')
         return pandas.rows_to_pandas(self, self.variable_names)
 
 
+class PagedTupleQueryResult(StreamingTupleQueryResult):
+    """
+    A tuple query result retrieved with a sequence of requests,
+    each returning a page of rows (see ``TupleQuery.evaluatePaged()``).
+
+    Pages are fetched by a background thread while the current page
+    is being consumed. The result can be iterated only once and its
+    size is not known in advance.
+
+    Close the result (or use it in a ``with`` statement) if it is
+    not consumed completely.
+    """
+    def __init__(self, pages, variable_names):
+        """
+        Start retrieving a result.
+
+        :param pages: An iterator over pages (lists of rows), with a ``close`` method.
+        :type pages: franz.miniclient.streaming.ResponseStream
+        :param variable_names: A list that will be filled with the variable names
+                               before the first page is returned.
+        :type variable_names: list[string]
+        """
+        QueryResult.__init__(self)
+        self.chunks = pages
+        self.rows = deque()
+        self._finished = False
+        # Wait for the first page, so that getBindingNames() works right away.
+        self._read_chunk()
+        self.variable_names = variable_names
+        self.binding_set = ListBindingSet(self.variable_names)
+
+    def _read_chunk(self):
+        if self._finished:
+            return False
+        for page in self.chunks:
+            self.rows.extend(page)
+            return True
+        self._finished = True
+        return False
+
+    def getMetadata(self):
+        """
+        Query metadata is not available for paged results.
+
+        :return: ``None``
+        """
+        return None
+
+
 @python_2_unicode_compatible
 class ListBindingSet(object):
     """
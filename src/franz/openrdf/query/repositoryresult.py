@@ -15,6 +15,7 @@ from future.builtins import next, object
 from past.builtins import unicode
 
 from ..model import Statement, Value
+from .duplicatefilter import BloomFilter, DigestFilter, BLOOM_FILTER_CAPACITY, BLOOM_FILTER_ERROR_RATE
 
 try:
     import franz.openrdf.query.pandas_support as pandas
@@ -38,7 +39,7 @@ class RepositoryResult(object):
     set: it may contain duplicate objects. Duplicate filtering can be
     enabled using :meth:`enableDuplicateFilter`, but this should not
     be used lightly as the filtering mechanism is potentially
-    memory-intensive.
+    memory-intensive (see the ``mode`` argument of that method).
     
     A RepositoryResult needs to be closed using :meth:`close` after use
     to free up any resources (open connections, read locks, etc.) it
@@ -48,6 +49,7 @@ class RepositoryResult(object):
         self.string_tuples = string_tuples
         self.cursor = 0
         self.nonDuplicateSet = None
+        self.duplicateFilter = None
         #self.limit = limit
         self.subjectFilter = subjectFilter
         self.triple_ids = tripleIDs
@@ -90,28 +92,67 @@ class RepositoryResult(object):
                 self.nonDuplicateSet = savedNonDuplicateSet
 #        elif self.limit and self.cursor >= self.limit:
 #            raise StopIteration
-        elif self.cursor < len(self.string_tuples):
+        while self.cursor < len(self.string_tuples):
             stringTuple = self.string_tuples[self.cursor]
             if self.triple_ids:
                 stringTuple = RepositoryResult.normalize_quint(stringTuple)
             self.cursor += 1
             if self.subjectFilter and not stringTuple[0] == self.subjectFilter:
-                return next(self)
-            return self._createStatement(stringTuple);
-        else:
-            raise StopIteration
+                continue
+            if self.duplicateFilter is not None and not self.duplicateFilter.add(stringTuple):
+                continue
+            return self._createStatement(stringTuple)
+        raise StopIteration
 
-    def enableDuplicateFilter(self):
+    def enableDuplicateFilter(self, mode='exact', error_rate=BLOOM_FILTER_ERROR_RATE, capacity=None):
         """
         Switch on duplicate filtering while iterating over objects.
 
-        The RepositoryResult will keep track of the previously returned objects in a set
-        and on calling next() will ignore any objects that already occur in this set.
-
-        Caution: use of this filtering mechanism is potentially memory-intensive.
+        The RepositoryResult will keep track of the previously returned
+        objects and on calling next() will ignore any objects that have
+        already been returned. The memory used for that depends on ``mode``:
+
+           - ``'exact'``: all returned statements are kept in a set.
+             Memory usage grows with the number and size of distinct
+             statements, typically by several hundred bytes per statement.
+           - ``'compact'``: only a 16 byte digest of each statement
+             (computed from the N-Triples text, without creating
+             :class:`Value` objects) is kept, which takes about
+             100 bytes per distinct statement.
+           - ``'bloom'``: a Bloom filter with fixed size, about
+             ``-1.44 * log2(error_rate)`` bits per statement of ``capacity``
+             (1.8 bytes for the default rate of 0.1%). Unique statements
+             are dropped with probability ``error_rate``, so use this mode
+             only if losing a few statements is acceptable.
+
+        Statements are compared by subject, predicate, object and context.
+        The compact and Bloom filter modes compare the text of terms, so
+        they treat e.g. literals in different lexical forms as distinct.
+
+        :param mode: ``'exact'``, ``'compact'`` or ``'bloom'``.
+        :type mode: string
+        :param error_rate: False positive rate of the Bloom filter.
+        :type error_rate: float
+        :param capacity: Expected number of distinct statements for
+                         the Bloom filter. The default is the size of
+                         the result, if known.
+        :type capacity: int
         """
-        self.nonDuplicateSet = set([])
-
+        self.nonDuplicateSet = None
+        self.duplicateFilter = None
+        if mode == 'exact':
+            self.nonDuplicateSet = set([])
+        elif mode == 'compact':
+            self.duplicateFilter = DigestFilter()
+        elif mode == 'bloom':
+            if capacity is None:
+                try:
+                    capacity = len(self) or BLOOM_FILTER_CAPACITY
+                except TypeError:
+                    capacity = BLOOM_FILTER_CAPACITY
+            self.duplicateFilter = BloomFilter(capacity, error_rate)
+        else:
+            raise ValueError('Unknown duplicate filter mode: %s' % mode)
 
     def asList(self):
         """
@@ -186,3 +227,51 @@ class RepositoryResult(object):
         return pandas.rows_to_pandas(
             self,
             ['s', 'p', 'o', 'g'] if include_graph else False)
+
+
+class PagedRepositoryResult(RepositoryResult):
+    """
+    A collection of statements retrieved with a sequence of requests,
+    each returning a page of statements (see
+    :meth:`.RepositoryConnection.iterStatements`).
+
+    Pages are fetched by a background thread while the current page
+    is being consumed. The result can be iterated only once and its
+    size is not known in advance.
+    """
+    def __init__(self, pages, tripleIDs=False):
+        """
+        :param pages: An iterator over pages (lists of statement tuples),
+                      with a ``close`` method.
+        :type pages: franz.miniclient.streaming.ResponseStream
+        :param tripleIDs: ``True`` if the pages contain triple IDs.
+        :type tripleIDs: bool
+        """
+        RepositoryResult.__init__(self, [], tripleIDs=tripleIDs)
+        self.pages = pages
+
+    def __next__(self):
+        while True:
+            while self.cursor >= len(self.string_tuples):
+                for page in self.pages:
+                    self.string_tuples = page
+                    self.cursor = 0
+                    break
+                else:
+                    raise StopIteration
+            try:
+                return RepositoryResult.__next__(self)
+            except StopIteration:
+                # The rest of the page has been filtered out.
+                continue
+
+    def close(self):
+        pages = getattr(self, 'pages', None)
+        if pages is not None:
+            pages.close()
+
+    def __len__(self):
+        raise TypeError('The size of a paged result is not known in advance.')
+
+    def __bool__(self):
+        return True
@@ -0,0 +1,487 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Statements stored column by column (see :class:`StatementBatch`).
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import array
+from collections import OrderedDict
+from itertools import chain, repeat
+
+from future.builtins import object, range
+from past.builtins import basestring, unicode
+from six.moves import zip
+
+from ..model import Literal, Statement, Value
+from ..util import strings
+
+try:
+    import numpy
+    import franz.openrdf.query.numpy_support as numpy_support
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+try:
+    import franz.openrdf.query.pandas_support as pandas
+    has_pandas = True
+except ImportError:
+    has_pandas = False
+
+#: Names of the columns of a :class:`StatementBatch`.
+COLUMNS = ('subject', 'predicate', 'object', 'graph', 'id')
+
+# Array type code of dictionary codes (32-bit signed integers).
+_CODE_TYPE = str('i')
+
+
+class EncodedColumn(object):
+    """
+    A dictionary-encoded column of terms in N-Triples format.
+
+    Each distinct value (including ``None``) is stored once in
+    :attr:`values`, :attr:`codes` contains an index into that list
+    for each row. The column behaves like a read-only list of values.
+    """
+    __slots__ = ('codes', 'values')
+
+    def __init__(self, codes, values):
+        #: Index of the value of each row (array of 32-bit integers).
+        self.codes = codes
+        #: Distinct values.
+        self.values = values
+
+    @staticmethod
+    def encode(cells):
+        """
+        Dictionary-encode a sequence of values.
+
+        :param cells: Terms in N-Triples format (or ``None``).
+        :type cells: Iterable[string]
+        :rtype: EncodedColumn
+        """
+        mapping = {}
+        codes = array.array(_CODE_TYPE, [mapping.setdefault(cell, len(mapping)) for cell in cells])
+        values = [None] * len(mapping)
+        for cell, code in mapping.items():
+            values[code] = cell
+        return EncodedColumn(codes, values)
+
+    def decode(self):
+        """
+        Get the value of each row.
+
+        :rtype: list[string]
+        """
+        values = self.values
+        return [values[code] for code in self.codes]
+
+    def take(self, indices):
+        """
+        Select rows, sharing the dictionary with this column.
+
+        :param indices: Row numbers.
+        :type indices: Iterable[int]
+        :rtype: EncodedColumn
+        """
+        if has_numpy and isinstance(indices, numpy.ndarray):
+            codes = array.array(_CODE_TYPE, self._code_array()[indices].tobytes())
+        else:
+            codes = self.codes
+            codes = array.array(_CODE_TYPE, [codes[index] for index in indices])
+        return EncodedColumn(codes, self.values)
+
+    def rows_matching(self, wanted):
+        """
+        Find rows that contain one of the given values.
+
+        :param wanted: Values to look for.
+        :type wanted: set[string]
+        :return: Row numbers, in ascending order.
+        :rtype: list[int]|numpy.ndarray
+        """
+        # Compare codes, each value is looked up only once.
+        codes = set(code for code, value in enumerate(self.values) if value in wanted)
+        if has_numpy:
+            return numpy.flatnonzero(numpy.isin(self._code_array(), list(codes)))
+        if len(codes) == 1:
+            code = codes.pop()
+            return [index for index, value in enumerate(self.codes) if value == code]
+        return [index for index, value in enumerate(self.codes) if value in codes]
+
+    def groups(self):
+        """
+        Find the rows of each distinct value.
+
+        :return: A dictionary mapping values to row numbers, in the order
+                 of first appearance.
+        :rtype: OrderedDict[string, list[int]]
+        """
+        values = self.values
+        rows = [None] * len(values)
+        order = []
+        for index, code in enumerate(self.codes):
+            bucket = rows[code]
+            if bucket is None:
+                bucket = rows[code] = []
+                order.append(code)
+            bucket.append(index)
+        return OrderedDict((values[code], rows[code]) for code in order)
+
+    def _code_array(self):
+        return numpy.frombuffer(self.codes, dtype=numpy.int32) if len(self.codes) else \
+            numpy.empty(0, dtype=numpy.int32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        values = self.values
+        for code in self.codes:
+            yield values[code]
+
+    def __repr__(self):
+        return 'EncodedColumn(%d rows, %d values)' % (len(self.codes), len(self.values))
+
+
+def _to_ntriples(term):
+    if term is None or isinstance(term, basestring):
+        return term
+    if isinstance(term, Value):
+        return term.toNTriples()
+    return Literal(term).toNTriples()
+
+
+def _wanted(value):
+    """
+    Convert a filter argument (a term or a collection of terms)
+    to a set of strings in N-Triples format.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return set(_to_ntriples(term) for term in value)
+    return {_to_ntriples(value)}
+
+
+class StatementBatch(object):
+    """
+    A set of statements stored column by column.
+
+    Each component (subject, predicate, object, graph and id) is kept in
+    a separate list of strings in N-Triples format, optionally
+    dictionary-encoded (see :class:`EncodedColumn`). Unlike a
+    :class:`.RepositoryResult` the batch does not create a
+    :class:`.Statement` object for each row, unless it is iterated over.
+    Filtering, grouping and conversion to NumPy or Pandas work directly
+    on the columns. Batches can be passed to
+    :meth:`.RepositoryConnection.addTriples`.
+
+    Batches are returned by :meth:`.RepositoryConnection.getStatements`
+    called with ``as_batch=True``.
+    """
+    def __init__(self, subjects, predicates, objects, graphs=None, ids=None, encoded=False):
+        """
+        :param subjects: Subjects (strings in N-Triples format).
+        :type subjects: list[string]|EncodedColumn
+        :param predicates: Predicates (strings in N-Triples format).
+        :type predicates: list[string]|EncodedColumn
+        :param objects: Objects (strings in N-Triples format).
+        :type objects: list[string]|EncodedColumn
+        :param graphs: Graphs (strings in N-Triples format or ``None``
+                       for the default graph), optional.
+        :type graphs: list[string]|EncodedColumn
+        :param ids: Triple ids, optional.
+        :type ids: list[string]
+        :param encoded: If ``True`` dictionary-encode all components except
+                        ids. This saves memory when values repeat and
+                        speeds up filtering and grouping.
+        :type encoded: bool
+        """
+        columns = [subjects, predicates, objects, graphs]
+        if encoded:
+            columns = [column if column is None or isinstance(column, EncodedColumn)
+                       else EncodedColumn.encode(column)
+                       for column in columns]
+        self.subjects, self.predicates, self.objects, self.graphs = columns
+        self.ids = ids
+        count = len(subjects)
+        for column in columns[1:] + [ids]:
+            if column is not None and len(column) != count:
+                raise ValueError('All columns must have the same length.')
+
+    @staticmethod
+    def fromTuples(string_tuples, tripleIDs=False, encoded=True):
+        """
+        Create a batch from statements returned by the server
+        (lists of terms in N-Triples format).
+
+        :param string_tuples: Triples or quads, or quints starting with
+                              the triple id if ``tripleIDs`` is ``True``.
+        :type string_tuples: list[list[string]]
+        :param tripleIDs: ``True`` if the tuples contain triple ids.
+        :type tripleIDs: bool
+        :param encoded: If ``True`` (the default) dictionary-encode the columns.
+        :type encoded: bool
+        :rtype: StatementBatch
+        """
+        start = 1 if tripleIDs else 0
+        subjects = [row[start] for row in string_tuples]
+        predicates = [row[start + 1] for row in string_tuples]
+        objects = [row[start + 2] for row in string_tuples]
+        graphs = [row[start + 3] if len(row) > start + 3 else None for row in string_tuples]
+        ids = [unicode(row[0]) for row in string_tuples] if tripleIDs else None
+        return StatementBatch(subjects, predicates, objects, graphs, ids, encoded=encoded)
+
+    def getColumn(self, name):
+        """
+        Get a column. Values are strings in N-Triples format.
+
+        :param name: Column name (see :data:`COLUMNS`).
+        :type name: string
+        :return: The column or ``None`` if the batch does not have it.
+        :rtype: list[string]|EncodedColumn
+        """
+        if name not in COLUMNS:
+            raise ValueError('Unknown column: %s' % name)
+        return getattr(self, 'ids' if name == 'id' else name + 's')
+
+    def _values(self, name):
+        """
+        Get a column as a list (``None`` if missing).
+        """
+        column = self.getColumn(name)
+        if isinstance(column, EncodedColumn):
+            return column.decode()
+        return column
+
+    def encode(self):
+        """
+        Get a dictionary-encoded copy of this batch (or the batch
+        itself if all columns are already encoded).
+
+        :rtype: StatementBatch
+        """
+        return StatementBatch(self.subjects, self.predicates, self.objects, self.graphs,
+                              self.ids, encoded=True)
+
+    def take(self, indices):
+        """
+        Create a batch containing selected rows.
+
+        :param indices: Row numbers.
+        :type indices: Iterable[int]|numpy.ndarray
+        :rtype: StatementBatch
+        """
+        if not (has_numpy and isinstance(indices, numpy.ndarray)):
+            indices = list(indices)
+
+        def select(column):
+            if column is None:
+                return None
+            if isinstance(column, EncodedColumn):
+                return column.take(indices)
+            return [column[index] for index in indices]
+
+        return StatementBatch(select(self.subjects), select(self.predicates),
+                              select(self.objects), select(self.graphs), select(self.ids))
+
+    def filter(self, subject=None, predicate=None, object=None, graph=None, mask=None):
+        """
+        Select statements with given components.
+
+        Each argument can be a term (a :class:`.Value`, a string in
+        N-Triples format or a Python value to be converted
+        to a literal), a collection of terms or ``None`` (no filtering).
+
+        .. code:: python
+
+            names = batch.filter(predicate=[FOAF.name, RDFS.label])
+
+        :param subject: Subject or subjects to look for.
+        :param predicate: Predicate or predicates to look for.
+        :param object: Object or objects to look for.
+        :param graph: Graph or graphs to look for.
+        :param mask: Optional sequence of booleans (e.g. a NumPy array),
+                     one for each row. Only rows where it is true are kept.
+        :type mask: Iterable[bool]
+        :rtype: StatementBatch
+        """
+        batch = self
+        if mask is not None:
+            if has_numpy and isinstance(mask, numpy.ndarray):
+                indices = numpy.flatnonzero(mask)
+            else:
+                indices = [index for index, selected in enumerate(mask) if selected]
+            batch = batch.take(indices)
+        for name, value in (('subject', subject), ('predicate', predicate),
+                            ('object', object), ('graph', graph)):
+            if value is None:
+                continue
+            column = batch.getColumn(name)
+            wanted = _wanted(value)
+            if column is None:
+                column = [None] * len(batch)
+            if isinstance(column, EncodedColumn):
+                indices = column.rows_matching(wanted)
+            else:
+                indices = [index for index, cell in enumerate(column) if cell in wanted]
+            batch = batch.take(indices)
+        return batch
+
+    def project(self, *names):
+        """
+        Get some of the columns.
+
+        :param names: Column names (see :data:`COLUMNS`).
+        :type names: string
+        :return: A dictionary mapping names to columns
+                 (see :meth:`getColumn`).
+        :rtype: OrderedDict[string, list[string]|EncodedColumn]
+        """
+        return OrderedDict((name, self.getColumn(name)) for name in names)
+
+    def groupBy(self, name):
+        """
+        Split the batch into groups of statements with the same
+        value of a component.
+
+        :param name: Column name (see :data:`COLUMNS`).
+        :type name: string
+        :return: A dictionary mapping values (strings in N-Triples format)
+                 to batches, in the order of first appearance.
+        :rtype: OrderedDict[string, StatementBatch]
+        """
+        column = self.getColumn(name)
+        if column is None:
+            return OrderedDict([(None, self)]) if len(self) else OrderedDict()
+        if isinstance(column, EncodedColumn):
+            groups = column.groups()
+        else:
+            groups = OrderedDict()
+            for index, cell in enumerate(column):
+                groups.setdefault(cell, []).append(index)
+        return OrderedDict((value, self.take(indices)) for value, indices in groups.items())
+
+    def toNumpy(self):
+        """
+        Convert the batch to NumPy arrays, one for each column.
+
+        Columns are decoded as in :meth:`.TupleQueryResult.toNumpy`.
+        Dictionary-encoded columns of URIs and blank nodes become
+        :class:`~franz.openrdf.query.numpy_support.Categorical`
+        columns without decoding each row. Missing columns are skipped.
+
+        :return: A dictionary mapping column names to columns.
+        :rtype: OrderedDict[string, numpy.ndarray|Categorical]
+        """
+        if not has_numpy:
+            raise Exception('NumPy not installed.')
+        result = OrderedDict()
+        for name in COLUMNS:
+            column = self.getColumn(name)
+            if column is None:
+                continue
+            if name == 'id':
+                result[name] = numpy.array([int(value) for value in column], dtype=numpy.int64)
+            elif isinstance(column, EncodedColumn) and all(
+                    value is None or value[:1] in ('<', '_') for value in column.values):
+                result[name] = self._categorical(column)
+            else:
+                result[name] = numpy_support.decode_column(list(column))
+        return result
+
+    @staticmethod
+    def _categorical(column):
+        # None is not a category, rows that have it get code -1.
+        categories = [value for value in column.values if value is not None]
+        mapping = numpy.empty(len(column.values), dtype=numpy.int32)
+        position = 0
+        for code, value in enumerate(column.values):
+            if value is None:
+                mapping[code] = -1
+            else:
+                mapping[code] = position
+                position += 1
+        values = numpy.empty(len(categories), dtype=object)
+        values[:] = [strings.uriref(value) if value[0] == '<' else value for value in categories]
+        return numpy_support.Categorical(mapping[column._code_array()], values)
+
+    def toPandas(self):
+        """
+        Convert the batch to a Pandas DataFrame, with columns built
+        as in :meth:`toNumpy`.
+
+        :rtype: pandas.DataFrame
+        """
+        if not has_pandas:
+            raise Exception('Pandas not installed.')
+        return pandas.columns_to_pandas(self.toNumpy())
+
+    def _mini_quads(self, contexts=None, attributes=None):
+        """
+        Produce quads for the mini-client's ``addStatements`` method
+        (see :meth:`.RepositoryConnection.addTriples`).
+
+        :param contexts: Graphs of statements that do not have one
+                         (strings in N-Triples format).
+        :type contexts: list[string]
+        :param attributes: Attributes of all statements (encoded as JSON).
+        :type attributes: string
+        :rtype: Iterable[tuple]
+        """
+        subjects, predicates, objects = (self._values(name) for name in ('subject', 'predicate', 'object'))
+        graphs = self._values('graph')
+        extra = [repeat(attributes)] if attributes else []
+        if not contexts:
+            graphs = repeat(None) if graphs is None else graphs
+            return zip(subjects, predicates, objects, graphs, *extra)
+        if graphs is None:
+            return chain.from_iterable(
+                zip(subjects, predicates, objects, repeat(context), *extra) for context in contexts)
+        if len(contexts) == 1:
+            graphs = [graph or contexts[0] for graph in graphs]
+            return zip(subjects, predicates, objects, graphs, *extra)
+        # Statements without a graph are added to each context.
+        with_graph = self.take([index for index, graph in enumerate(graphs) if graph])
+        without_graph = self.take([index for index, graph in enumerate(graphs) if not graph])
+        without_graph.graphs = None
+        return chain(with_graph._mini_quads(None, attributes),
+                     without_graph._mini_quads(contexts, attributes))
+
+    def asList(self):
+        """
+        Get all statements as a list of :class:`.Statement` objects.
+
+        :rtype: list[Statement]
+        """
+        return list(self)
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        return Statement(*[column[index] if column is not None else None
+                           for column in (self.subjects, self.predicates, self.objects,
+                                          self.graphs, self.ids)])
+
+    def __iter__(self):
+        columns = [self._values(name) for name in COLUMNS]
+        count = len(self)
+        columns = [repeat(None, count) if column is None else column for column in columns]
+        for row in zip(*columns):
+            yield Statement(*row)
+
+    def __repr__(self):
+        return 'StatementBatch(%d statements)' % len(self)
@@ -0,0 +1,385 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+An asyncio-based connection to an AllegroGraph repository.
+
+This module requires Python 3.5 or later and the aiohttp package
+(``pip install agraph-python[aiohttp]``).
+"""
+
+import asyncio
+
+from franz.miniclient.agjson import encode_json
+from franz.miniclient.asyncrepository import AsyncRepository
+from franz.miniclient.backends.aiohttp import closeSessions
+
+from ..model.literal import GeoSpatialRegion
+from ..query.asyncquery import AsyncBooleanQuery, AsyncGraphQuery, AsyncTupleQuery, AsyncUpdateQuery
+from ..query.dataset import ALL_CONTEXTS
+from ..query.query import QueryLanguage
+from ..query.statementbatch import StatementBatch
+from .repositoryconnection import NOT_GIVEN, RepositoryConnection
+from .repositoryresult import RepositoryResult
+
+__all__ = ['AsyncRepositoryConnection', 'closeSessions']
+
+
+class AsyncRepositoryConnection(object):
+    """
+    A connection whose methods that talk to the server are coroutines.
+
+    This mirrors a subset of :class:`RepositoryConnection`. All requests
+    made from one event loop share a single pool of keep-alive connections,
+    so many requests can be in flight at the same time:
+
+    .. code:: python
+
+        async def main():
+            async with repo.getAsyncConnection() as conn:
+                counts = await asyncio.gather(
+                    *[conn.size(g) for g in graphs])
+
+    Call :func:`closeSessions` before closing the event loop to release
+    the connection pool.
+
+    Just like :class:`RepositoryConnection` objects, connections in
+    a session must not be used concurrently - the same applies to
+    transaction control methods (:meth:`commit` and :meth:`rollback`).
+    """
+    def __init__(self, repository, close_repo=False):
+        """
+        Call through :meth:`~franz.openrdf.repository.repository.Repository.getAsyncConnection`.
+
+        :param repository: Repository to connect to.
+        :type repository: Repository
+        :param close_repo: If ``True`` shutdown the repository when this connection is closed.
+                          The default is ``False``.
+        :type close_repo: bool
+        """
+        self.repository = repository
+        self.mini_repository = repository.mini_repository._instance_from_url(AsyncRepository)
+        self.is_closed = False
+        self.is_session_active = False
+        self.add_commit_size = None
+        self._close_repo = close_repo
+        # Used only for converting terms, never sends requests.
+        self._converter = RepositoryConnection(repository)
+        # Query results are never cached (see RepositoryConnection.enableQueryCache).
+        self._query_cache = None
+
+    def _get_mini_repository(self, dedicated=False):
+        # We always have our own mini-repository.
+        return self.mini_repository
+
+    def _note_write(self):
+        # Nothing is cached, so there is nothing to invalidate.
+        pass
+
+    def _to_ntriples(self, term):
+        return self._converter._to_ntriples(term)
+
+    def _contexts_to_ntriple_contexts(self, contexts, none_is_mini_null=False):
+        return self._converter._contexts_to_ntriple_contexts(contexts, none_is_mini_null)
+
+    def _convert_term_to_mini_term(self, term, predicate_for_object=None):
+        return self._converter._convert_term_to_mini_term(term, predicate_for_object)
+
+    def getValueFactory(self):
+        """
+        Get the :class:`.ValueFactory` associated with this repository.
+
+        :return: A value factory.
+        :rtype: ValueFactory
+        """
+        return self.repository.getValueFactory()
+
+    def createLiteral(self, value, datatype=None, language=None):
+        """
+        Create a new literal, see :meth:`RepositoryConnection.createLiteral`.
+        """
+        return self.getValueFactory().createLiteral(value, datatype=datatype, language=language)
+
+    def createURI(self, uri=None, namespace=None, localname=None, canonical=True):
+        """
+        Create a new URI, see :meth:`RepositoryConnection.createURI`.
+        """
+        return self.getValueFactory().createURI(
+            uri=uri, namespace=namespace, localname=localname, canonical=canonical)
+
+    def createBNode(self, nodeID=None):
+        """
+        Create a new blank node, see :meth:`RepositoryConnection.createBNode`.
+
+        Note that fresh node ids are fetched from the server in batches
+        using a blocking request.
+        """
+        return self.getValueFactory().createBNode(nodeID=nodeID)
+
+    def createStatement(self, subject, predicate, object, context=None):
+        """
+        Create a new Statement object, see :meth:`RepositoryConnection.createStatement`.
+        """
+        return self.getValueFactory().createStatement(subject, predicate, object, context=context)
+
+    def namespace(self, prefix):
+        """
+        Creates an object that allows for simple creation of URIs in given namespace,
+        see :meth:`RepositoryConnection.namespace`.
+        """
+        return self.getValueFactory().namespace(prefix)
+
+    def prepareTupleQuery(self, queryLanguage=QueryLanguage.SPARQL,
+                          query=None, baseURI=None, queryString=None):
+        """
+        Parse ``query`` into a tuple query object whose ``evaluate``
+        method is a coroutine.
+
+        :return: A query object.
+        :rtype: AsyncTupleQuery
+        """
+        query = AsyncTupleQuery(queryLanguage, query or queryString, baseURI=baseURI)
+        query.setConnection(self)
+        return query
+
+    def prepareUpdate(self, queryLanguage=QueryLanguage.SPARQL,
+                      query=None, baseURI=None, queryString=None):
+        """
+        Parse ``query`` into an update query object whose ``evaluate``
+        method is a coroutine.
+
+        :return: A query object.
+        :rtype: AsyncUpdateQuery
+        """
+        query = AsyncUpdateQuery(queryLanguage, query or queryString, baseURI=baseURI)
+        query.setConnection(self)
+        return query
+
+    def prepareGraphQuery(self, queryLanguage=QueryLanguage.SPARQL,
+                          query=None, baseURI=None, queryString=None):
+        """
+        Parse ``query`` into a graph query object whose ``evaluate``
+        method is a coroutine.
+
+        :return: A query object.
+        :rtype: AsyncGraphQuery
+        """
+        query = AsyncGraphQuery(queryLanguage, query or queryString, baseURI=baseURI)
+        query.setConnection(self)
+        return query
+
+    def prepareBooleanQuery(self, queryLanguage=QueryLanguage.SPARQL,
+                            query=None, baseURI=None, queryString=None):
+        """
+        Parse ``query`` into a boolean query object whose ``evaluate``
+        method is a coroutine.
+
+        :return: A query object.
+        :rtype: AsyncBooleanQuery
+        """
+        query = AsyncBooleanQuery(queryLanguage, query or queryString, baseURI=baseURI)
+        query.setConnection(self)
+        return query
+
+    async def getContextIDs(self):
+        """
+        Return a list of context resources, one for each context referenced by a quad in
+        the triple store. Note that the default context will not be included in the result.
+
+        :return: A list of contexts (as :class:`URI` objects).
+        :rtype: list[URI]
+        """
+        return [self.createURI(cxt) for cxt in await self.mini_repository.listContexts()]
+
+    async def size(self, contexts=ALL_CONTEXTS):
+        """
+        Returns the number of (explicit) statements that are in the specified
+        contexts in this repository.
+
+        :param contexts: List of contexts (graph URIs) to count the statements in.
+                         By default statements in all graphs will be counted.
+        :type contexts: Iterable[string|URI]
+        """
+        cxts = self._contexts_to_ntriple_contexts(contexts, False)
+        if cxts == ALL_CONTEXTS or not cxts:
+            return await self.mini_repository.getSize()
+        sizes = await asyncio.gather(*[self.mini_repository.getSize(cxt) for cxt in cxts])
+        return sum(sizes)
+
+    async def getStatements(self, subject=None, predicate=None,  object=None, contexts=ALL_CONTEXTS,
+                            includeInferred=False, limit=None, offset=None, tripleIDs=False,
+                            as_batch=False):
+        """
+        Get all statements with a specific subject, predicate and/or
+        object from the repository, see :meth:`RepositoryConnection.getStatements`.
+
+        Geospatial regions are not supported.
+
+        :return: An iterator over the resulting statements.
+        :rtype: RepositoryResult|StatementBatch
+        """
+        if isinstance(object, GeoSpatialRegion):
+            raise ValueError('Geospatial queries are not supported by asynchronous connections.')
+        subj = self._convert_term_to_mini_term(subject)
+        pred = self._convert_term_to_mini_term(predicate)
+        obj = self._convert_term_to_mini_term(object, predicate)
+        cxt = self._contexts_to_ntriple_contexts(contexts)
+        result = await self.mini_repository.getStatements(
+            subj, pred, obj, cxt,
+            infer=includeInferred, limit=limit, offset=offset, tripleIDs=tripleIDs)
+        if as_batch:
+            return StatementBatch.fromTuples(result, tripleIDs=tripleIDs)
+        return RepositoryResult(result, tripleIDs=tripleIDs)
+
+    async def addTriple(self, subject, predicate, object, contexts=None, attributes=None):
+        """
+        Add a single triple to the repository, see :meth:`RepositoryConnection.addTriple`.
+        """
+        obj = self.getValueFactory().object_position_term_to_openrdf_term(object, predicate=predicate)
+        cxts = self._contexts_to_ntriple_contexts(contexts, none_is_mini_null=True)
+        subj = self._to_ntriples(subject)
+        pred = self._to_ntriples(predicate)
+        obj = self._convert_term_to_mini_term(obj)
+        await asyncio.gather(*[self.mini_repository.addStatement(subj, pred, obj, cxt, attributes=attributes)
+                               for cxt in cxts])
+
+    async def addTriples(self, triples_or_quads, context=None, ntriples=False, attributes=None):
+        """
+        Add the supplied triples or quads to this repository,
+        see :meth:`RepositoryConnection.addTriples`.
+        """
+        if isinstance(triples_or_quads, StatementBatch):
+            contexts = None if context is None else \
+                self._contexts_to_ntriple_contexts(context, none_is_mini_null=True)
+            quads = list(triples_or_quads._mini_quads(contexts, attributes and encode_json(attributes)))
+        else:
+            quads = list(self._converter._to_mini_quads(triples_or_quads, context=context,
+                                                        ntriples=ntriples, attributes=attributes))
+        await self.mini_repository.addStatements(quads, commitEvery=self.add_commit_size)
+
+    async def addStatement(self, statement, contexts=NOT_GIVEN, attributes=None):
+        """
+        Add the supplied statement to the specified contexts in the repository,
+        see :meth:`RepositoryConnection.addStatement`.
+        """
+        if contexts is NOT_GIVEN:
+            ctx = statement.getContext()
+            contexts = [ctx] if ctx is not None else None
+        await self.addTriple(statement.getSubject(), statement.getPredicate(), statement.getObject(),
+                             contexts=contexts, attributes=attributes)
+
+    async def removeTriples(self, subject, predicate, object, contexts=ALL_CONTEXTS):
+        """
+        Remove the statement(s) with the specified subject, predicate and object
+        from the repository, see :meth:`RepositoryConnection.removeTriples`.
+        """
+        subj = self._to_ntriples(subject)
+        pred = self._to_ntriples(predicate)
+        obj = self._to_ntriples(self.getValueFactory().object_position_term_to_openrdf_term(object))
+        ntripleContexts = self._contexts_to_ntriple_contexts(contexts, none_is_mini_null=True)
+        if ntripleContexts is None or len(ntripleContexts) == 0:
+            await self.mini_repository.deleteMatchingStatements(subj, pred, obj, None)
+        else:
+            await asyncio.gather(*[self.mini_repository.deleteMatchingStatements(subj, pred, obj, cxt)
+                                   for cxt in ntripleContexts])
+
+    async def removeQuads(self, quads, ntriples=False):
+        """
+        Remove enumerated quads from this repository,
+        see :meth:`RepositoryConnection.removeQuads`.
+        """
+        removeQuads = list(self._converter._to_mini_delete_quads(quads, ntriples=ntriples))
+        await self.mini_repository.deleteStatements(removeQuads)
+
+    async def getGeneration(self):
+        """
+        Get the current DB generation.
+
+        :return: Generation
+        :rtype: int
+        """
+        return await self.mini_repository.getGeneration()
+
+    async def openSession(self, autocommit=False, lifetime=None, loadinitfile=False):
+        """
+        Open a session, see :meth:`RepositoryConnection.openSession`.
+        """
+        if not self.is_session_active:
+            await self.mini_repository.openSession(autocommit, lifetime, loadinitfile)
+            self.is_session_active = True
+
+    async def closeSession(self):
+        """
+        Close a session.
+
+        It is not an error to call this when no session is active.
+        """
+        if self.is_session_active:
+            await self.mini_repository.closeSession()
+            self.is_session_active = False
+
+    def session(self, autocommit=False, lifetime=None, loadinitfile=False):
+        """
+        A session context manager for use with the ``async with`` statement:
+
+        .. code:: python
+
+            async with conn.session():
+                await conn.addTriple(s, p, o)
+                await conn.commit()
+
+        See :meth:`openSession` for a description of the parameters.
+        """
+        return _AsyncSessionContext(self, autocommit, lifetime, loadinitfile)
+
+    async def commit(self):
+        """
+        Commit changes on an open session.
+        """
+        return await self.mini_repository.commit()
+
+    async def rollback(self):
+        """
+        Roll back changes on open session.
+        """
+        return await self.mini_repository.rollback()
+
+    async def close(self):
+        """
+        Close the connection. This also closes the session if it is active.
+
+        It is safe to call this on a connection that has already been closed.
+        """
+        if not self.is_closed:
+            await self.closeSession()
+            self.is_closed = True
+            if self._close_repo:
+                self.repository.shutDown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        del args
+        await self.close()
+
+
+class _AsyncSessionContext(object):
+    """
+    Asynchronous context manager returned by :meth:`AsyncRepositoryConnection.session`.
+    """
+    def __init__(self, conn, autocommit, lifetime, loadinitfile):
+        self.conn = conn
+        self.args = (autocommit, lifetime, loadinitfile)
+
+    async def __aenter__(self):
+        await self.conn.openSession(*self.args)
+        return self.conn
+
+    async def __aexit__(self, *args):
+        del args
+        await self.conn.closeSession()
@@ -0,0 +1,246 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Write-behind buffering of updates made one statement at a time.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import time
+
+from future.builtins import object
+
+from ..exceptions import IllegalArgumentException
+from ..model import Statement, Value
+from ..model.literal import CompoundLiteral
+from ..query.dataset import ALL_CONTEXTS, MINI_NULL_CONTEXT
+
+# Default value of the max_triples parameter of BufferedWriter.
+DEFAULT_MAX_TRIPLES = 10000
+
+# Kinds of buffered operations
+_ADD = 'add'
+_DELETE = 'delete'
+
+# Used instead of None to detect missing 'contexts' in addStatement.
+_NOT_GIVEN = object()
+
+
+class BufferedWriter(object):
+    """
+    Accumulates additions and removals of statements and sends them to the
+    server in batches (see :meth:`.RepositoryConnection.bufferedWriter`).
+
+    The order of operations is preserved: consecutive additions (or removals)
+    are sent as a single request, but an addition is never moved past
+    a removal or vice versa.
+
+    Updates are not visible on the server (e.g. to queries) until
+    they are flushed. Buffered operations are flushed when any of the limits
+    passed to the constructor is exceeded, when :meth:`flush` or :meth:`close`
+    is called and at the end of a ``with`` block:
+
+    .. code:: python
+
+       with conn.bufferedWriter(max_triples=5000) as writer:
+           for s, p, o in triples:
+               writer.addTriple(s, p, o)
+
+    Removals that cannot be expressed as a list of quads (i.e. patterns
+    with wildcards or removals from all graphs or from the default graph)
+    are not buffered. Pending operations are flushed first and then the
+    removal is performed immediately.
+    """
+    def __init__(self, connection, max_triples=DEFAULT_MAX_TRIPLES, max_bytes=None, max_delay=None):
+        """
+        Invoke through :meth:`.RepositoryConnection.bufferedWriter`.
+
+        :param connection: Connection used to send the updates.
+        :type connection: RepositoryConnection
+        :param max_triples: Maximum number of statements kept in the buffer
+                            (``None`` means no limit).
+        :type max_triples: int
+        :param max_bytes: Maximum total size of N-Triples strings kept in the buffer
+                          (approximately the size of the request, ``None`` means no limit).
+        :type max_bytes: int
+        :param max_delay: Maximum time (in seconds) an operation is kept in the buffer
+                          (``None`` means no limit). Note that this is only checked
+                          when new operations are added.
+        :type max_delay: float
+        """
+        self.connection = connection
+        self.max_triples = max_triples
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        # List of [kind, quads, size] triples, in order.
+        self._runs = []
+        self._count = 0
+        self._bytes = 0
+        # Time when the oldest buffered operation has been added.
+        self._since = None
+
+    @property
+    def pending(self):
+        """
+        Number of buffered statements (additions and removals).
+        """
+        return self._count
+
+    def _buffer(self, kind, quads):
+        """
+        Add converted quads to the buffer and flush it if necessary.
+        """
+        runs = self._runs
+        if not runs or runs[-1][0] != kind:
+            runs.append([kind, [], 0])
+        run = runs[-1][1]
+        size = 0
+        count = 0
+        for quad in quads:
+            run.append(quad)
+            count += 1
+            # Plus a few bytes for JSON punctuation.
+            size += sum(len(part) for part in quad if part) + 12
+        if not run:
+            runs.pop()
+            return
+        runs[-1][2] += size
+        if self._since is None:
+            self._since = time.time()
+        self._count += count
+        self._bytes += size
+        if self._should_flush():
+            self.flush()
+
+    def _should_flush(self):
+        if self.max_triples is not None and self._count >= self.max_triples:
+            return True
+        if self.max_bytes is not None and self._bytes >= self.max_bytes:
+            return True
+        return (self.max_delay is not None and
+                time.time() - self._since >= self.max_delay)
+
+    def flush(self):
+        """
+        Send all buffered operations to the server.
+
+        If a request fails, the operations that have not been sent
+        (including those of the failed request) stay in the buffer.
+        """
+        mini = self.connection._get_mini_repository()
+        runs = self._runs
+        sent = False
+        try:
+            while runs:
+                kind, quads, size = runs[0]
+                if kind == _ADD:
+                    mini.addStatements(quads, commitEvery=self.connection.add_commit_size)
+                else:
+                    mini.deleteStatements(quads)
+                sent = True
+                runs.pop(0)
+                self._count -= len(quads)
+                self._bytes -= size
+        finally:
+            if not runs:
+                self._since = None
+            if sent:
+                self.connection._note_write()
+
+    def close(self):
+        """
+        Flush all buffered operations.
+
+        It is safe to call this more than once.
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def addTriple(self, subject, predicate, object, contexts=None, attributes=None):
+        """
+        Buffer the addition of a single triple.
+        See :meth:`.RepositoryConnection.addTriple`.
+        """
+        self.addTriples([(subject, predicate, object)], context=contexts, attributes=attributes)
+
+    def addTriples(self, triples_or_quads, context=None, ntriples=False, attributes=None):
+        """
+        Buffer the addition of triples or quads.
+        See :meth:`.RepositoryConnection.addTriples`.
+        """
+        self._buffer(_ADD, self.connection._to_mini_quads(
+            triples_or_quads, context=context, ntriples=ntriples, attributes=attributes))
+
+    def addStatement(self, statement, contexts=_NOT_GIVEN, attributes=None):
+        """
+        Buffer the addition of a statement.
+        See :meth:`.RepositoryConnection.addStatement`.
+        """
+        if contexts is _NOT_GIVEN:
+            ctx = statement.getContext()
+            contexts = [ctx] if ctx is not None else None
+        self.addTriple(statement.getSubject(), statement.getPredicate(), statement.getObject(),
+                       contexts=contexts, attributes=attributes)
+
+    def add(self, arg0, arg1=None, arg2=None, contexts=None, attributes=None):
+        """
+        Call :meth:`addTriple` or :meth:`addStatement`
+        (for a single statement or each element of an iterable).
+
+        See :meth:`.RepositoryConnection.add`, but note that
+        files cannot be passed to this method.
+        """
+        if contexts and not isinstance(contexts, list):
+            contexts = [contexts]
+        if isinstance(arg0, Value):
+            self.addTriple(arg0, arg1, arg2, contexts=contexts, attributes=attributes)
+        elif isinstance(arg0, Statement):
+            self.addStatement(arg0, contexts=contexts, attributes=attributes)
+        elif hasattr(arg0, '__iter__'):
+            for s in arg0:
+                self.addStatement(s, contexts=contexts, attributes=attributes)
+        else:
+            raise IllegalArgumentException("Illegal first argument to 'add'.  Expected a Value or Statement.")
+
+    def removeQuads(self, quads, ntriples=False):
+        """
+        Buffer the removal of quads.
+        See :meth:`.RepositoryConnection.removeQuads`.
+        """
+        self._buffer(_DELETE, self.connection._to_mini_delete_quads(quads, ntriples=ntriples))
+
+    def removeTriples(self, subject, predicate, object, contexts=ALL_CONTEXTS):
+        """
+        Remove statements matching a pattern.
+        See :meth:`.RepositoryConnection.removeTriples`.
+
+        The removal is buffered only if all parts of the triple and
+        a list of named graphs are given (and the object is not a range).
+        """
+        conn = self.connection
+        graphs = conn._contexts_to_ntriple_contexts(contexts, none_is_mini_null=True)
+        if (subject is None or predicate is None or object is None or
+                isinstance(object, CompoundLiteral) or
+                not graphs or MINI_NULL_CONTEXT in graphs):
+            self.flush()
+            conn.removeTriples(subject, predicate, object, contexts=contexts)
+        else:
+            self.removeQuads([(subject, predicate, object, graph) for graph in graphs])
+
+    def removeStatement(self, statement, contexts=None):
+        """
+        Remove a statement.
+        See :meth:`.RepositoryConnection.removeStatement`.
+        """
+        self.removeTriples(statement.getSubject(), statement.getPredicate(), statement.getObject(),
+                           contexts=contexts)
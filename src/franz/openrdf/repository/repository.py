@@ -200,6 +200,24 @@ class Repository(object):
         """
         return RepositoryConnection(self)
 
+    def getAsyncConnection(self):
+        """
+        Opens a connection to this store whose methods are coroutines:
+
+        .. code:: python
+
+           async with repo.getAsyncConnection() as conn:
+               ...
+
+        This requires Python 3.5 or later and the aiohttp package.
+
+        :return: An :class:`.AsyncRepositoryConnection` object.
+        :rtype: AsyncRepositoryConnection
+        """
+        # Imported here, since the module cannot be loaded in Python 2.
+        from .asyncrepositoryconnection import AsyncRepositoryConnection
+        return AsyncRepositoryConnection(self)
+
     def getValueFactory(self):
         """
         Return a ValueFactory for this store.
@@ -21,6 +21,7 @@ from contextlib import contextmanager
 
 import six
 from franz.miniclient.agjson import encode_json
+from franz.miniclient.streaming import ResponseStream, paged_request
 from franz.openrdf.repository.attributes import AttributeDefinition
 from franz.openrdf.rio.docformat import DocFormat
 from franz.openrdf.util.contexts import output_to
@@ -29,15 +30,20 @@ from future.builtins import object
 from past.builtins import basestring, map, unicode
 
 from ..exceptions import IllegalArgumentException, IllegalOptionException
-from ..model import URI, Statement, Value
+from ..model import URI, Statement, Value, parse_term
 from ..model.literal import (GeoBox, GeoCircle, GeoCoordinate, GeoPolygon,
                              GeoSpatialRegion, Literal, RangeLiteral)
 from ..query.dataset import ALL_CONTEXTS, MINI_NULL_CONTEXT
 from ..query.query import (BooleanQuery, GraphQuery, Query, QueryLanguage,
                            TupleQuery, UpdateQuery)
+from ..query.querycache import QUERY_CACHE_MAX_ROWS, QUERY_CACHE_SIZE, QueryCache
+from ..query.queryresult import TupleQueryResult
+from ..query.statementbatch import StatementBatch
 from ..rio.rdfformat import RDFFormat
 from ..util import uris
-from .repositoryresult import RepositoryResult
+from .bufferedwriter import DEFAULT_MAX_TRIPLES, BufferedWriter
+from .repositoryresult import PagedRepositoryResult, RepositoryResult
+from .subjectcache import SUBJECT_CACHE_MAX_BYTES, SUBJECT_CACHE_MAX_STALENESS, SUBJECT_CACHE_SIZE, SubjectCache
 from .transactions import DEFAULT_TRANSACTION_SETTINGS, TransactionSettings
 
 
@@ -55,6 +61,14 @@ if sys.version_info[0] > 2:
 # the actual value and the parameter not being present in the call.
 NOT_GIVEN = object()
 
+# addTriples streams lists longer than this to the server
+# instead of encoding the whole request body at once.
+ADD_STREAMING_THRESHOLD = 10000
+
+# Maximum number of subjects combined into a single request
+# by getStatementsBatch.
+BATCH_SUBJECTS_PER_REQUEST = 100
+
 class RepositoryConnection(object):
     """
     The RepositoryConnection class is the main interface for updating data
@@ -98,6 +112,8 @@ class RepositoryConnection(object):
         self._add_commit_size = None
         self._close_repo = close_repo
         self.is_session_active = is_session
+        self._query_cache = None
+        self._subject_cache = None
 
     def getSpec(self):
         """
@@ -404,7 +420,8 @@ class RepositoryConnection(object):
         return self._get_mini_repository().warmup(includeStrings, includeTriples, indices)
 
     def getStatements(self, subject=None, predicate=None,  object=None, contexts=ALL_CONTEXTS, includeInferred=False,
-                      limit=None, offset=None, tripleIDs=False, output=None, output_format=RDFFormat.NQX):
+                      limit=None, offset=None, tripleIDs=False, output=None, output_format=RDFFormat.NQX,
+                      as_batch=False):
         """
         Get all statements with a specific subject, predicate and/or
         object from the repository. The result is optionally
@@ -444,9 +461,14 @@ class RepositoryConnection(object):
         :param include_attributes: If true the returned statements will
             include triple attributes. The default is false.
         :type include_attributes: bool
+        :param as_batch: If ``True`` return a dictionary-encoded
+                         :class:`.StatementBatch` instead of a
+                         :class:`RepositoryResult`. No :class:`Statement`
+                         objects are created.
+        :type as_batch: bool
         :return: An iterator over the resulting statements
                  or ``None`` (if ``output`` is used).
-        :rtype: RepositoryResult
+        :rtype: RepositoryResult|StatementBatch
         """
         # note: so with tripleIDs we'll get triples that are quads consisting of five elements.
         with output_to(output) as out_file:
@@ -460,8 +482,15 @@ class RepositoryConnection(object):
             if isinstance(object, GeoSpatialRegion):
                 if cxt is not None and cxt != ALL_CONTEXTS:
                     raise ValueError('Geospatial queries cannot be limited to a context.')
-                return self._getStatementsInRegion(subj, pred, obj, limit=limit, offset=offset,
-                                                   accept=accept, callback=callback)
+                result = self._getStatementsInRegion(subj, pred, obj, limit=limit, offset=offset,
+                                                     accept=accept, callback=callback)
+                if as_batch and result is not None:
+                    return StatementBatch.fromTuples(result.string_tuples)
+                return result
+            elif (self._subject_cache is not None and output is None and limit is None and
+                  offset is None and not tripleIDs and obj is None and isinstance(subj, basestring) and
+                  (pred is None or isinstance(pred, basestring))):
+                result = self._get_cached_statements(subj, pred, cxt, includeInferred)
             else:
                 result = self._get_mini_repository().getStatements(
                     subj, pred, obj, cxt,
@@ -469,10 +498,169 @@ class RepositoryConnection(object):
                     accept=accept, callback=callback)
 
             if output is None:
+                if as_batch:
+                    return StatementBatch.fromTuples(result, tripleIDs=tripleIDs)
                 return RepositoryResult(result, tripleIDs=tripleIDs)
             else:
                 return None
 
+    def getStatementsBatch(self, patterns, includeInferred=False, tripleIDs=False, maxConcurrency=None):
+        """
+        Get statements matching multiple patterns.
+
+        This is much faster than calling :meth:`getStatements` for each
+        pattern. Patterns that differ only in the subject (a URI) are
+        combined into a single request, the remaining requests are
+        performed concurrently (as in :meth:`evaluateTupleQueries`).
+
+        .. code:: python
+
+            patterns = [(entity, None, None) for entity in entities]
+            for entity, result in zip(entities, conn.getStatementsBatch(patterns)):
+                ...
+
+        :param patterns: Tuples of the form ``(subject, predicate, object)``
+                         or ``(subject, predicate, object, contexts)``.
+                         Use ``None`` as a wildcard, ``contexts`` has the same
+                         meaning as in :meth:`getStatements`.
+        :type patterns: Iterable[tuple]
+        :param includeInferred: If ``True``, include triples inferred through
+                                RDFS++ reasoning.
+        :type includeInferred: bool
+        :param tripleIDs: If ``True`` the id field will be filled
+                          in the returned statements.
+        :type tripleIDs: bool
+        :param maxConcurrency: Maximum number of requests sent at the same time
+                               (default: chosen by the HTTP backend).
+        :type maxConcurrency: int
+        :return: A list of results, in the same order as the patterns.
+        :rtype: list[RepositoryResult]
+        """
+        # Convert patterns to arguments of the mini-client's getStatements.
+        # Patterns with a URI subject are grouped by the other arguments.
+        converted = []
+        groups = OrderedDict()
+        for pattern in patterns:
+            if len(pattern) == 3:
+                subject, predicate, object = pattern
+                contexts = ALL_CONTEXTS
+            else:
+                subject, predicate, object, contexts = pattern
+            if isinstance(object, GeoSpatialRegion):
+                raise ValueError('Geospatial patterns cannot be used in batches.')
+            args = dict(subj=self._convert_term_to_mini_term(subject),
+                        pred=self._convert_term_to_mini_term(predicate),
+                        obj=self._convert_term_to_mini_term(object, predicate),
+                        context=self._contexts_to_ntriple_contexts(contexts),
+                        infer=includeInferred, tripleIDs=tripleIDs)
+            key = None
+            if isinstance(args['subj'], basestring) and args['subj'].startswith('<'):
+                context = args['context']
+                key = (args['pred'], args['obj'], tuple(context) if isinstance(context, list) else context)
+                groups.setdefault(key, OrderedDict()).setdefault(args['subj'], args)
+            converted.append((key, args))
+
+        # Each group with more than one subject is fetched with requests
+        # for up to BATCH_SUBJECTS_PER_REQUEST subjects.
+        requests = []
+        merged = {}
+        for key, by_subject in groups.items():
+            if len(by_subject) < 2:
+                continue
+            subjects = list(by_subject)
+            for start in range(0, len(subjects), BATCH_SUBJECTS_PER_REQUEST):
+                chunk = subjects[start:start + BATCH_SUBJECTS_PER_REQUEST]
+                for subj in chunk:
+                    merged[key, subj] = len(requests)
+                requests.append(dict(by_subject[chunk[0]], subj=chunk))
+        # Pairs of (request index, subject to select from a merged response)
+        sources = []
+        for key, args in converted:
+            index = merged.get((key, args['subj']))
+            if index is None:
+                sources.append((len(requests), None))
+                requests.append(args)
+            else:
+                sources.append((index, args['subj']))
+
+        responses = self._get_mini_repository().getStatementsBatch(requests, maxConcurrency=maxConcurrency)
+
+        # Split responses of merged requests by subject
+        subject_index = 1 if tripleIDs else 0
+        split = {}
+        results = []
+        for index, subj in sources:
+            rows = responses[index]
+            if subj is not None:
+                if index not in split:
+                    by_subject = split[index] = {}
+                    for row in rows:
+                        by_subject.setdefault(parse_term(row[subject_index]), []).append(row)
+                rows = split[index].get(parse_term(subj), [])
+            results.append(RepositoryResult(rows, tripleIDs=tripleIDs))
+        return results
+
+    def iterStatements(self, subject=None, predicate=None, object=None, contexts=ALL_CONTEXTS,
+                       includeInferred=False, tripleIDs=False, page_size=50000, prefetch=2,
+                       limit=None, offset=None):
+        """
+        Iterate over statements matching a pattern (see :meth:`getStatements`),
+        retrieving them with a sequence of requests, each returning at most
+        ``page_size`` statements.
+
+        Pages are retrieved by a background thread, up to ``prefetch``
+        pages ahead of the page being consumed, so a scan of a large
+        repository runs in constant memory.
+
+        Changes made to the repository during the iteration
+        might cause statements to be skipped or repeated.
+
+        :param subject: Subject value or ``None`` (no subject filtering).
+        :type subject: Value
+        :param predicate: Predicate value or ``None`` (no predicate filtering).
+        :type predicate: URI
+        :param object: Object value or ``None`` (no object filtering).
+        :type object: Value
+        :param contexts: An optional list of graphs to retrieve the
+                         statements from.
+                         By default statements are taken from all graphs.
+        :type contexts: URI|string|Iterable[URI|string]
+        :param includeInferred: If ``True``, include triples inferred through
+                                RDFS++ reasoning.
+        :type includeInferred: bool
+        :param tripleIDs: If ``True`` the id field will be filled
+                          in the returned statements.
+        :type tripleIDs: bool
+        :param page_size: Number of statements requested at once.
+        :type page_size: int
+        :param prefetch: Number of pages that can be retrieved ahead
+                         of the consumer.
+        :type prefetch: int
+        :param limit: Maximum number of statements to retrieve (``None`` means no limit).
+        :type limit: int
+        :param offset: Number of statements to skip.
+        :type offset: int
+        :return: An iterator over statements. It must be closed if it is
+                 not consumed completely.
+        :rtype: PagedRepositoryResult
+        """
+        if isinstance(object, GeoSpatialRegion):
+            raise ValueError('Geospatial queries cannot be retrieved in pages.')
+        mini = self._get_mini_repository()
+        subj = self._convert_term_to_mini_term(subject)
+        pred = self._convert_term_to_mini_term(predicate)
+        obj = self._convert_term_to_mini_term(object, predicate)
+        cxt = self._contexts_to_ntriple_contexts(contexts)
+
+        def fetch(position, count):
+            return mini.getStatements(subj, pred, obj, cxt, infer=includeInferred,
+                                      limit=count, offset=position, tripleIDs=tripleIDs)
+
+        return PagedRepositoryResult(
+            ResponseStream(paged_request(fetch, page_size, offset=offset, limit=limit),
+                           max_chunks=max(prefetch, 1)),
+            tripleIDs=tripleIDs)
+
     def getStatementsById(self, ids, output=None, output_format=RDFFormat.NQX):
         """
         Return all statements whose triple ID matches an ID in the list 'ids'.
@@ -664,6 +852,7 @@ class RepositoryConnection(object):
             json_ld_context=json_ld_context,
             allow_external_references=allow_external_references,
             external_reference_timeout=external_reference_timeout)
+        self._note_write()
 
     def addData(self, data, rdf_format=None, base_uri=None, context=None, attributes=None,
                 json_ld_store_source=None,
@@ -733,6 +922,7 @@ class RepositoryConnection(object):
             json_ld_context=json_ld_context,
             allow_external_references=allow_external_references,
             external_reference_timeout=external_reference_timeout)
+        self._note_write()
 
     def addDocumentFile(self, doc, doc_format=None, base=None, rules=None,
                         subject=None, keys=None,
@@ -1002,6 +1192,7 @@ class RepositoryConnection(object):
         del args['keys']
         del args['self']
         self._get_mini_repository().loadDocument(**args)
+        self._note_write()
 
     def getGeneration(self):
         """
@@ -1034,6 +1225,7 @@ class RepositoryConnection(object):
         for cxt in cxts:
             self._get_mini_repository().addStatement(self._to_ntriples(subject), self._to_ntriples(predicate),
                         self._convert_term_to_mini_term(obj), cxt, attributes=attributes)
+        self._note_write()
 
     def _to_ntriples(self, term):
         """
@@ -1056,10 +1248,17 @@ class RepositoryConnection(object):
         Each triple or quad can have between 3 and 5 elements, the last one being
         the dictionary of attributes (or None if the default attributes should be used).
 
+        Any iterable (e.g. a generator) can be passed. Unless the input is
+        a short list, triples are converted while the request is being sent,
+        so memory usage does not depend on the number of triples.
+
+        A :class:`.StatementBatch` can also be passed, its columns
+        are sent without converting each statement.
+
         :param triples_or_quads: List of triples or quads. Each element can be
                                  either a statement or a list or tuple of :class:`Value` objects
                                  or strings.
-        :type triples_or_quads: Iterable[list[string|Value]|tuple[string|Value]|Statement]
+        :type triples_or_quads: Iterable[list[string|Value]|tuple[string|Value]|Statement]|StatementBatch
         :param context: Context (graph) or list of contexts to add the triples to.
                         Defaults to None (the default graph). Note that this will
                         be ignored for all input quads that already specify a context.
@@ -1073,7 +1272,27 @@ class RepositoryConnection(object):
                            contain their own attribute dictionaries.
         :type attributes: dict[str, str]
         """
-        quads = []
+        if isinstance(triples_or_quads, StatementBatch):
+            contexts = None if context is None else \
+                self._contexts_to_ntriple_contexts(context, none_is_mini_null=True)
+            quads = triples_or_quads._mini_quads(contexts, attributes and encode_json(attributes))
+        else:
+            quads = self._to_mini_quads(triples_or_quads, context=context, ntriples=ntriples,
+                                        attributes=attributes)
+        if isinstance(triples_or_quads, (list, tuple, StatementBatch)) and \
+                len(triples_or_quads) <= ADD_STREAMING_THRESHOLD:
+            # Small inputs are sent as a single, non-chunked request body.
+            quads = list(quads)
+        self._get_mini_repository().addStatements(quads, commitEvery=self.add_commit_size)
+        self._note_write()
+
+    def _to_mini_quads(self, triples_or_quads, context=None, ntriples=False, attributes=None):
+        """
+        Convert the arguments of :meth:`addTriples` to quads suitable
+        for the mini-client's ``addStatements`` method.
+
+        This is a generator, input triples are converted lazily.
+        """
         for q in triples_or_quads:
             # Note: Statement objects will work here, since they have a length
             # and support accessing components by index.
@@ -1094,18 +1313,17 @@ class RepositoryConnection(object):
             # We try to avoid passing the fifth element, since it might confuse older AG servers.
             if gs is None:
                 if quad_attributes:
-                    quads.append((s, p, o, None, encode_json(quad_attributes)))
+                    yield (s, p, o, None, encode_json(quad_attributes))
                 else:
-                    quads.append((s, p, o, None))
+                    yield (s, p, o, None)
             else:
                 ntriple_contexts = self._contexts_to_ntriple_contexts(gs, none_is_mini_null=True)
                 if quad_attributes:
                     for g in ntriple_contexts:
-                        quads.append((s, p, o, g, encode_json(quad_attributes)))
+                        yield (s, p, o, g, encode_json(quad_attributes))
                 else:
                     for g in ntriple_contexts:
-                        quads.append((s, p, o, g))
-        self._get_mini_repository().addStatements(quads, commitEvery=self.add_commit_size)
+                        yield (s, p, o, g)
 
     def addStatement(self, statement, contexts=NOT_GIVEN, attributes=None):
         """
@@ -1129,6 +1347,40 @@ class RepositoryConnection(object):
         self.addTriple(statement.getSubject(), statement.getPredicate(), statement.getObject(),
                        contexts=contexts, attributes=attributes)
 
+    def bufferedWriter(self, max_triples=DEFAULT_MAX_TRIPLES, max_bytes=None, max_delay=None):
+        """
+        Create an object that accumulates additions and removals of statements
+        and sends them to the server in batches.
+
+        The writer has the same methods as this connection for adding
+        and removing statements (:meth:`addTriple`, :meth:`addStatement`,
+        :meth:`removeTriples`, ...), so code that adds one triple at a time
+        can use it to get the throughput of :meth:`addTriples`:
+
+        .. code:: python
+
+           with conn.bufferedWriter() as writer:
+               for s, p, o in triples:
+                   writer.addTriple(s, p, o)
+
+        Buffered updates are sent when one of the limits is exceeded,
+        when the writer is flushed or closed and at the end of the ``with`` block.
+
+        :param max_triples: Maximum number of statements kept in the buffer
+                            (``None`` means no limit).
+        :type max_triples: int
+        :param max_bytes: Maximum total size (approximately, in bytes) of the buffered
+                          statements (``None`` means no limit).
+        :type max_bytes: int
+        :param max_delay: Maximum time (in seconds) an operation can stay
+                          in the buffer. This is only checked when
+                          new operations are added (``None`` means no limit).
+        :type max_delay: float
+        :return: A buffered writer.
+        :rtype: BufferedWriter
+        """
+        return BufferedWriter(self, max_triples=max_triples, max_bytes=max_bytes, max_delay=max_delay)
+
     def remove(self, arg0, arg1=None, arg2=None, contexts=None):
         """
         Call :meth:`removeTriples` or :meth:`removeStatement`.
@@ -1184,6 +1436,7 @@ class RepositoryConnection(object):
         else:
             for cxt in ntripleContexts:
                 self._get_mini_repository().deleteMatchingStatements(subj, pred, obj, cxt)
+        self._note_write()
 
     def removeQuads(self, quads, ntriples=False):
         """
@@ -1199,7 +1452,17 @@ class RepositoryConnection(object):
                          conversion.
         :type ntriples: bool
         """
-        removeQuads = []
+        removeQuads = list(self._to_mini_delete_quads(quads, ntriples=ntriples))
+        self._get_mini_repository().deleteStatements(removeQuads)
+        self._note_write()
+
+    def _to_mini_delete_quads(self, quads, ntriples=False):
+        """
+        Convert the arguments of :meth:`removeQuads` to quads suitable
+        for the mini-client's ``deleteStatements`` method.
+
+        This is a generator, input quads are converted lazily.
+        """
         for q in quads:
             quad = [None] * 4
             if ntriples:
@@ -1221,8 +1484,7 @@ class RepositoryConnection(object):
                 quad[1] = self._to_ntriples(predicate)
                 quad[2] = self._to_ntriples(obj)
                 quad[3] = self._to_ntriples(q.getContext())
-            removeQuads.append(quad)
-        self._get_mini_repository().deleteStatements(removeQuads)
+            yield quad
 
     def removeQuadsByID(self, tids):
         """
@@ -1232,6 +1494,7 @@ class RepositoryConnection(object):
         :type tids: list[int]
         """
         self._get_mini_repository().deleteStatementsById(tids)
+        self._note_write()
 
     def removeStatement(self, statement, contexts=None):
         """
@@ -1327,6 +1590,157 @@ class RepositoryConnection(object):
         """
         self._get_mini_repository().enableTripleCache(size=size)
 
+    def enableQueryCache(self, size=QUERY_CACHE_SIZE, max_staleness=0, max_rows=QUERY_CACHE_MAX_ROWS):
+        """
+        Cache the results of SPARQL queries evaluated through this connection.
+
+        A cached result is reused when the same query (with the same
+        bindings, dataset and inference setting) is evaluated again,
+        as long as the repository has not changed. Changes are detected
+        by comparing the repository generation (see :meth:`getGeneration`),
+        which costs a small request per query unless ``max_staleness``
+        is used. Changes made through this connection always invalidate
+        the cache.
+
+        Queries that write results to a file, streaming queries
+        and updates are never cached.
+
+        :param size: Maximum number of cached results. The least recently
+                     used results are discarded first.
+        :type size: int
+        :param max_staleness: Time (in seconds) for which the generation
+                              is not checked again. During that time changes
+                              made by other clients are not noticed.
+                              The default (0) is to check before every query.
+        :type max_staleness: float
+        :param max_rows: Results with more rows than this are not cached
+                         (``None`` means no limit).
+        :type max_rows: int
+        """
+        self._query_cache = QueryCache(size=size, max_staleness=max_staleness, max_rows=max_rows)
+
+    def disableQueryCache(self):
+        """
+        Disable the query result cache (see :meth:`enableQueryCache`).
+        """
+        self._query_cache = None
+
+    def getQueryCacheStats(self):
+        """
+        Get usage statistics of the query result cache (see :meth:`enableQueryCache`).
+
+        :return: A dictionary with the number of cached results (``size``),
+                 the limit (``maxsize``) and counts of ``hits``, ``misses``,
+                 ``evictions`` and ``generation_checks``.
+                 ``None`` if the cache is not enabled.
+        :rtype: dict
+        """
+        return self._query_cache.stats() if self._query_cache is not None else None
+
+    def enableClientSubjectCache(self, size=SUBJECT_CACHE_SIZE, max_bytes=SUBJECT_CACHE_MAX_BYTES,
+                                 max_staleness=SUBJECT_CACHE_MAX_STALENESS):
+        """
+        Cache all statements of recently accessed subjects in this process.
+
+        Once enabled, :meth:`getStatements` calls with a single subject
+        (optionally restricted to a predicate and/or graphs, but without
+        an object, ``limit``, ``offset``, ``tripleIDs`` or ``output``)
+        retrieve all statements of the subject once and answer later
+        requests for the same subject locally. Cached statements are used
+        only as long as the repository generation (see :meth:`getGeneration`)
+        does not change. The generation is checked at most once every
+        ``max_staleness`` seconds (one second by default), so most calls
+        need no request at all, but changes made by other clients can go
+        unnoticed for that long. Changes made through this connection
+        always invalidate the cache.
+
+        Unlike :meth:`enableSubjectTriplesCache`, which speeds up queries
+        on the server, this cache saves the round trip to the server.
+        With ``max_staleness=0`` the generation is checked before every
+        call, so a request is still made each time (but only a small one).
+
+        :param size: Maximum number of cached subjects. The least recently
+                     used subjects are discarded first.
+        :type size: int
+        :param max_bytes: Limit of the (estimated) memory used by cached
+                          statements. Subjects with more statements are
+                          never cached, requests for them are sent to
+                          the server as if the cache was disabled.
+                          ``None`` means no limit.
+        :type max_bytes: int
+        :param max_staleness: Time (in seconds) for which the generation
+                              is not checked again. During that time changes
+                              made by other clients are not noticed.
+                              Use 0 to check before every call.
+        :type max_staleness: float
+        """
+        self._subject_cache = SubjectCache(size=size, max_bytes=max_bytes, max_staleness=max_staleness)
+
+    def disableClientSubjectCache(self):
+        """
+        Disable the client-side subject cache (see :meth:`enableClientSubjectCache`).
+        """
+        self._subject_cache = None
+
+    def getClientSubjectCacheStats(self):
+        """
+        Get usage statistics of the client-side subject cache
+        (see :meth:`enableClientSubjectCache`).
+
+        :return: A dictionary with the number of cached subjects (``size``),
+                 the limit (``maxsize``), the estimated memory used
+                 (``bytes``) and its limit (``max_bytes``), counts of
+                 ``hits``, ``misses``, ``bypassed`` requests (for subjects
+                 too large to be cached), ``evictions`` and
+                 ``generation_checks`` and the ``hit_rate``.
+                 ``None`` if the cache is not enabled.
+        :rtype: dict
+        """
+        return self._subject_cache.stats() if self._subject_cache is not None else None
+
+    def _get_cached_statements(self, subj, pred, cxt, includeInferred):
+        """
+        Get statements of a subject using the client-side subject cache.
+        Predicate and graph filters are applied locally.
+
+        :param subj: Subject (in N-Triples format).
+        :param pred: Predicate (in N-Triples format) or ``None``.
+        :param cxt: List of graphs (in N-Triples format, ``'null'`` for
+                    the default graph) or ``None``.
+        :return: List of statements, as returned by the mini-client.
+        """
+        cache = self._subject_cache
+        mini = self._get_mini_repository()
+        # User attributes can affect results if there is an attribute filter.
+        key = cache.make_key(dict(subject=subj, infer=includeInferred,
+                                  user_attributes=mini.user_attributes))
+        if not cache.cacheable(key):
+            # Do not fetch all statements of a large subject for each request.
+            return mini.getStatements(subj, pred, None, cxt, infer=includeInferred)
+        generation = cache.generation(self)
+        rows = cache.get(key, generation)
+        if rows is None:
+            rows = mini.getStatements(subj, None, None, None, infer=includeInferred)
+            cache.put(key, generation, rows)
+        # Compare parsed terms, since the server might write the same
+        # term differently (e.g. escape other characters).
+        if pred is not None:
+            pred = parse_term(pred)
+            rows = [row for row in rows if parse_term(row[1]) == pred]
+        if cxt is not None:
+            cxt = set(None if context == MINI_NULL_CONTEXT else parse_term(context) for context in cxt)
+            rows = [row for row in rows if (parse_term(row[3]) if len(row) > 3 else None) in cxt]
+        return list(rows)
+
+    def _note_write(self):
+        """
+        Called after operations that might change query results.
+        """
+        if self._query_cache is not None:
+            self._query_cache.invalidate()
+        if self._subject_cache is not None:
+            self._subject_cache.invalidate()
+
     ## Indexing control methods
 
     def listIndices(self):
@@ -1444,6 +1858,23 @@ class RepositoryConnection(object):
         """
         return self.getValueFactory().createBNode(nodeID=nodeID)
 
+    def getBlankNodeStats(self):
+        """
+        Get statistics of blank node id allocation (:meth:`createBNode`).
+
+        Ids are reserved on the server in blocks that grow when many
+        blank nodes are created, the next block is fetched in the
+        background before the current one runs out.
+
+        :return: A dictionary with the number of ids handed out (``allocated``)
+                 and still available (``available``), the number of requests
+                 (``requests``, ``prefetches``, ``errors``), ids received
+                 (``fetched``), waits for another thread's request (``waits``)
+                 and the current block size (``block_size``).
+        :rtype: dict
+        """
+        return self.getValueFactory().getBlankNodeStats()
+
     def createStatement(self, subject, predicate, object, context=None):
         """
         Create a new Statement object.
@@ -1550,6 +1981,7 @@ class RepositoryConnection(object):
         :type name: string
         """
         self._get_mini_repository().addNamespace(prefix, name)
+        self._note_write()
 
     def removeNamespace(self, prefix):
         """
@@ -1560,6 +1992,7 @@ class RepositoryConnection(object):
         :type prefix: string
         """
         self._get_mini_repository().deleteNamespace(prefix)
+        self._note_write()
 
     def clearNamespaces(self, reset=True):
         """
@@ -1570,6 +2003,7 @@ class RepositoryConnection(object):
                       are cleared.
         """
         self._get_mini_repository().clearNamespaces(reset)
+        self._note_write()
 
     #############################################################################################
     ## Server-side implementation of query options
@@ -1611,6 +2045,7 @@ class RepositoryConnection(object):
         :raises RequestError: if given option name is not a defined query option.
         """
         self._get_mini_repository().setQueryOption(name, '{}'.format(value))
+        self._note_write()
 
     def removeQueryOption(self, name):
         """
@@ -1621,12 +2056,14 @@ class RepositoryConnection(object):
         :type prefix: string
         """
         self._get_mini_repository().deleteQueryOption(name)
+        self._note_write()
 
     def clearQueryOptions(self):
         """
         Delete all query options in this repository for the current user.
         """
         self._get_mini_repository().clearQueryOptions()
+        self._note_write()
 
     #############################################################################################
     ## Geo-spatial
@@ -2048,6 +2485,9 @@ class RepositoryConnection(object):
             mini_repo = self._get_mini_repository(dedicated=True)
             mini_repo.openSession(autocommit, lifetime, loadinitfile)
             self.is_session_active = True
+            # Do not mix results cached outside the session
+            # with those seen by the session.
+            self._note_write()
 
     def closeSession(self):
         """
@@ -2060,6 +2500,9 @@ class RepositoryConnection(object):
             # calls openSession again.
             self._get_mini_repository().closeSession()
             self.is_session_active = False
+            # Cached results might include uncommitted changes, which
+            # are discarded without changing the generation.
+            self._note_write()
 
     def __enter__(self):
         return self
@@ -2149,14 +2592,19 @@ class RepositoryConnection(object):
         """
         if settings or kwargs:
             with self.temporaryTransactionSettings(settings, **kwargs):
-                return self._get_mini_repository().commit()
-        return self._get_mini_repository().commit()
+                result = self._get_mini_repository().commit()
+        else:
+            result = self._get_mini_repository().commit()
+        self._note_write()
+        return result
 
     def rollback(self):
         """
         Roll back changes on open session.
         """
-        return self._get_mini_repository().rollback()
+        result = self._get_mini_repository().rollback()
+        self._note_write()
+        return result
 
     def evalInServer(self, code):
         """
@@ -2249,6 +2697,7 @@ class RepositoryConnection(object):
            Method :meth:`getDuplicateStatements`.
         """
         self._get_mini_repository().deleteDuplicates(mode)
+        self._note_write()
 
     def getDuplicateStatements(self, mode):
         """
@@ -2365,14 +2814,18 @@ class RepositoryConnection(object):
 
         commit indicates the number of triples per commit for the materializer.
         """
-        return self._get_mini_repository().materializeEntailed(_with=_with, without=without, useTypeSubproperty=useTypeSubproperty, commit=commit)
+        result = self._get_mini_repository().materializeEntailed(_with=_with, without=without, useTypeSubproperty=useTypeSubproperty, commit=commit)
+        self._note_write()
+        return result
 
     def deleteMaterialized(self):
         """
         Deletes all previously materialized triples.
         Returns the number of triples deleted.
         """
-        return self._get_mini_repository().deleteMaterialized()
+        result = self._get_mini_repository().deleteMaterialized()
+        self._note_write()
+        return result
 
     def namespace(self, prefix):
         """
@@ -2419,6 +2872,45 @@ class RepositoryConnection(object):
         return q.evaluate(output=output, output_format=output_format)
 
 
+    def evaluateTupleQueries(self, queries, maxConcurrency=None):
+        """
+        Evaluate multiple SPARQL SELECT queries concurrently.
+
+        This is much faster than evaluating the queries one by one
+        when there are many small queries, since it takes roughly
+        as long as the slowest query rather than the sum of all
+        round trips. With the curl backend all requests are driven
+        by the calling thread.
+
+        .. code:: python
+
+            queries = []
+            for entity in entities:
+                q = conn.prepareTupleQuery(query='SELECT ?p ?o { ?s ?p ?o }')
+                q.setBinding('s', entity)
+                queries.append(q)
+            results = conn.evaluateTupleQueries(queries)
+
+        :param queries: Query objects (created by :meth:`prepareTupleQuery`)
+                        or SPARQL query strings.
+        :type queries: Iterable[TupleQuery|string]
+        :param maxConcurrency: Maximum number of queries sent at the same time
+                               (default: chosen by the HTTP backend).
+        :type maxConcurrency: int
+        :return: A list of results, in the same order as the queries.
+        :rtype: list[TupleQueryResult]
+        """
+        arguments = []
+        for query in queries:
+            if isinstance(query, basestring):
+                query = self.prepareTupleQuery(QueryLanguage.SPARQL, query)
+            if query.queryLanguage != QueryLanguage.SPARQL:
+                raise IllegalArgumentException("Only SPARQL queries can be evaluated concurrently.")
+            arguments.append(query._get_sparql_arguments())
+        responses = self._get_mini_repository().evalSparqlQueries(arguments, maxConcurrency=maxConcurrency)
+        return [TupleQueryResult(response['names'], response['values'], response.get('queryInfo'))
+                for response in responses]
+
     def executeGraphQuery(self, query, language=QueryLanguage.SPARQL,
                           output=None, output_format=RDFFormat.NQX):
         """
@@ -2638,6 +3130,7 @@ class RepositoryConnection(object):
         :type attribute_filter: AttributeFilter|str
         """
         self._get_mini_repository().setAttributeFilter(attribute_filter)
+        self._note_write()
 
     def getAttributeFilter(self):
         """
@@ -2655,6 +3148,7 @@ class RepositoryConnection(object):
         Remove the static attribute filter (if set).
         """
         self._get_mini_repository().clearAttributeFilter()
+        self._note_write()
 
 
 def attribute_definition_from_dict(item):
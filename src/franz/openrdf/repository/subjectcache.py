@@ -0,0 +1,135 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Client-side cache of the statements of frequently accessed subjects
+(see :meth:`.RepositoryConnection.enableClientSubjectCache`).
+"""
+
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from ..query.querycache import QueryCache
+from ..util.cache import LRUCache
+
+# Default maximum number of cached subjects.
+SUBJECT_CACHE_SIZE = 10000
+
+# Default limit of the (estimated) memory used by cached statements.
+SUBJECT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Default time (in seconds) during which the generation is not checked again.
+SUBJECT_CACHE_MAX_STALENESS = 1.0
+
+
+def _estimate_size(rows):
+    """
+    Approximate memory used by a list of statements (lists of strings).
+    """
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(term) for term in row) for row in rows)
+
+
+class SubjectCache(QueryCache):
+    """
+    Stores all statements of a subject, together with the repository
+    generation at the time they were retrieved.
+
+    Entries are checked against the repository generation and
+    discarded after local writes in the same way as in :class:`QueryCache`.
+    The least recently used subjects are discarded when either the number
+    of subjects or the estimated memory used by their statements exceeds
+    its limit. Subjects whose statements alone exceed the memory limit
+    are remembered, so that later requests for them can be sent to the
+    server with their filters instead of fetching all statements again.
+    """
+    def __init__(self, size=SUBJECT_CACHE_SIZE, max_bytes=SUBJECT_CACHE_MAX_BYTES,
+                 max_staleness=SUBJECT_CACHE_MAX_STALENESS):
+        """
+        :param size: Maximum number of cached subjects.
+        :type size: int
+        :param max_bytes: Limit of the estimated memory used by cached
+                          statements (``None`` means no limit).
+        :type max_bytes: int
+        :param max_staleness: Time (in seconds) during which the generation
+                              is not checked again (0 means always check).
+        :type max_staleness: float
+        """
+        super(SubjectCache, self).__init__(size=size, max_staleness=max_staleness, max_rows=None)
+        self.max_bytes = max_bytes
+        self._entries = LRUCache(size, max_weight=max_bytes)
+        # Keys of subjects too large to be cached.
+        self._too_large = LRUCache(size)
+        self.bypassed = 0
+
+    def cacheable(self, key):
+        """
+        Check if a subject can be cached. If not, the request is
+        counted as bypassing the cache.
+
+        :rtype: bool
+        """
+        if self._too_large.get(key) is None:
+            return True
+        with self._lock:
+            self.bypassed += 1
+        return False
+
+    def put(self, key, generation, rows):
+        """
+        Store the statements of a subject obtained at the given generation.
+
+        :param rows: Statements as returned by the mini-client.
+        :type rows: list[list[string]]
+        """
+        rows = [tuple(row) for row in rows]
+        weight = _estimate_size(rows)
+        if self.max_bytes is not None and weight > self.max_bytes:
+            self._too_large.put(key, True)
+        else:
+            self._entries.put(key, (generation, rows), weight=weight)
+
+    def invalidate(self):
+        """
+        Drop all cached statements and force a generation check.
+        """
+        super(SubjectCache, self).invalidate()
+        # Subjects might have become smaller.
+        self._too_large.clear()
+
+    def stats(self):
+        """
+        Get usage statistics.
+
+        The result is a dictionary with the following entries:
+
+           - ``size``: number of cached subjects.
+           - ``maxsize``: maximum number of cached subjects.
+           - ``bytes``: estimated memory used by cached statements.
+           - ``max_bytes``: limit of ``bytes``.
+           - ``hits``: number of requests answered from the cache.
+           - ``misses``: number of requests that fetched all statements
+             of a subject from the server.
+           - ``bypassed``: number of requests for subjects too large to be
+             cached, sent to the server unchanged.
+           - ``uncacheable``: number of subjects known to be too large.
+           - ``hit_rate``: fraction of requests answered from the cache.
+           - ``evictions``: number of subjects dropped to make room for new ones.
+           - ``generation_checks``: number of generation requests.
+
+        :rtype: dict
+        """
+        result = super(SubjectCache, self).stats()
+        entries = self._entries.stats()
+        with self._lock:
+            bypassed = self.bypassed
+        lookups = result['hits'] + result['misses'] + bypassed
+        result.update(bytes=entries['weight'], max_bytes=entries['max_weight'],
+                      bypassed=bypassed, uncacheable=len(self._too_large),
+                      hit_rate=result['hits'] / lookups if lookups else 0.0)
+        return result
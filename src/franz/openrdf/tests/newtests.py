@@ -796,6 +796,17 @@ def test_attribute_filter_with_user_attributes(conn, ex, attr):
     assert get_statements(conn) == [[ex.s2, ex.p2, ex.o2, None]]
 
 
+def test_get_statements_batch_with_user_attributes(conn, ex, attr):
+    conn.addTriple(ex.s1, ex.p, ex.o1, attributes={'test': 'a'})
+    conn.addTriple(ex.s2, ex.p, ex.o2, attributes={'test': 'b'})
+    conn.addTriple(ex.s2, ex.p, ex.o3, attributes={'test': 'c'})
+    conn.setUserAttributes({'test': 'b'})
+    conn.setAttributeFilter(TripleAttribute.test == UserAttribute.test)
+    # Patterns with different predicates are sent as separate, concurrent requests.
+    results = conn.getStatementsBatch([(ex.s1, ex.p, None), (ex.s2, None, None), (None, ex.p, None)])
+    assert [[st.getObject() for st in result] for result in results] == [[], [ex.o2], [ex.o2]]
+
+
 @pytest.mark.parametrize("attr_set, expected_text", [
     ('raw-value', '"raw-value"'),
     ('value-with-"-inside', '"value-with-\\"-inside"'),
@@ -1265,3 +1276,486 @@ def test_query_option_management(conn):
     # Test clearing all query options.
     conn.clearQueryOptions()
     assert len(conn.getQueryOptions()) == 0
+
+
+def test_async_connection(conn, ex):
+    pytest.importorskip('aiohttp')
+    import asyncio
+    from franz.openrdf.repository.asyncrepositoryconnection import closeSessions
+    run = asyncio.get_event_loop().run_until_complete
+    aconn = conn.repository.getAsyncConnection()
+    try:
+        run(aconn.addTriples([(ex.s1, ex.p, ex.o1), (ex.s2, ex.p, ex.o2)]))
+        run(aconn.addTriple(ex.s3, ex.p, ex.o3, contexts=[ex.g]))
+        assert run(aconn.size()) == 3
+        assert run(aconn.size(ex.g)) == 1
+        assert [s.getObject() for s in run(aconn.getStatements(ex.s1))] == [ex.o1]
+        query = aconn.prepareTupleQuery(query='SELECT ?s { ?s ?p ?o } ORDER BY ?s')
+        sizes = run(asyncio.gather(*[query.evaluate(count=True) for _ in range(10)]))
+        assert sizes == [3] * 10
+        assert [row['s'] for row in run(query.evaluate())] == [ex.s1, ex.s2, ex.s3]
+        run(aconn.openSession())
+        run(aconn.removeTriples(ex.s1, None, None))
+        run(aconn.rollback())
+        run(aconn.closeSession())
+        assert conn.size() == 3
+    finally:
+        run(aconn.close())
+        run(closeSessions())
+
+
+def test_evaluate_tuple_queries(conn, ex):
+    conn.addTriples([(ex.s1, ex.p, ex.o1), (ex.s2, ex.p, ex.o2), (ex.s2, ex.p, ex.o3)])
+    queries = []
+    for subject in (ex.s1, ex.s2, ex.s3):
+        query = conn.prepareTupleQuery(query='SELECT ?o { ?s ?p ?o } ORDER BY ?o')
+        query.setBinding('s', subject)
+        queries.append(query)
+    results = conn.evaluateTupleQueries(queries, maxConcurrency=2)
+    assert [[row['o'] for row in result] for result in results] == [[ex.o1], [ex.o2, ex.o3], []]
+
+
+def test_streaming_tuple_query(conn, ex):
+    conn.addTriples([(ex['s%d' % i], ex.p, i) for i in range(100)])
+    query = conn.prepareTupleQuery(query='SELECT ?s ?o { ?s ?p ?o } ORDER BY ?o')
+    with query.evaluate() as result:
+        expected = [(row['s'], row['o']) for row in result]
+    with query.evaluate(streaming=True) as result:
+        assert result.getBindingNames() == ['s', 'o']
+        assert [(row['s'], row['o']) for row in result] == expected
+    # Closing the result early must abort the transfer.
+    with query.evaluate(streaming=True) as result:
+        assert next(iter(result))['s'] == ex.s0
+
+
+def test_curl_pool_limits():
+    pytest.importorskip('pycurl')
+    from franz.miniclient.backends.curl import Pool, PoolExhaustedError
+    import pycurl
+    pool = Pool(pycurl.Curl, os.getpid(), max_in_use=1, max_idle=1, wait=False)
+    first = pool.get('http://a')
+    with pytest.raises(PoolExhaustedError):
+        pool.get('http://a')
+    # Hosts are limited separately
+    other = pool.get('http://b')
+    pool.put(first, 'http://a')
+    assert pool.get('http://a') is first
+    pool.put(first, 'http://a')
+    pool.put(other, 'http://b')
+    stats = pool.stats('http://a')
+    assert (stats['hits'], stats['misses'], stats['in_use'], stats['idle']) == (1, 1, 0, 1)
+    assert pool.stats()['misses'] == 2
+    # Idle objects are evicted (a negative timeout means all of them)
+    pool.configure(idle_timeout=-1)
+    pool.get('http://c')
+    assert pool.stats()['evictions'] == 2
+
+
+def test_curl_pool_wakes_waiter_of_returned_host():
+    pytest.importorskip('pycurl')
+    from franz.miniclient.backends.curl import Pool
+    import pycurl
+    import threading
+    import time
+    pool = Pool(pycurl.Curl, os.getpid(), max_in_use=1, wait=True, wait_timeout=10)
+    taken = dict((host, pool.get(host)) for host in ('http://a', 'http://b'))
+    received = {}
+
+    def wait_for(host):
+        received[host] = pool.get(host)
+
+    threads = {}
+    # Start the waiter for 'b' first, so that it would be woken up by a
+    # notification meant for 'a' if the pool did not tell hosts apart.
+    for host in ('http://b', 'http://a'):
+        threads[host] = threading.Thread(target=wait_for, args=(host,))
+        threads[host].start()
+        while pool.stats(host)['waits'] == 0:
+            time.sleep(0.01)
+    pool.put(taken['http://a'], 'http://a')
+    threads['http://a'].join(5)
+    assert received.get('http://a') is taken['http://a']
+    pool.put(taken['http://b'], 'http://b')
+    threads['http://b'].join(5)
+    assert received.get('http://b') is taken['http://b']
+
+
+def test_buffered_writer(conn, ex):
+    with conn.bufferedWriter(max_triples=10) as writer:
+        for i in range(25):
+            writer.addTriple(ex['s%d' % i], ex.p, i)
+        # Two batches have been sent
+        assert conn.size() == 20
+        writer.removeTriples(ex.s0, ex.p, 0, contexts=[ex.g])
+        writer.addStatement(conn.createStatement(ex.s0, ex.p, 0, ex.g))
+        assert writer.pending == 7
+        # Not buffered (default graph), flushes the writer
+        writer.removeStatement(conn.createStatement(ex.s1, ex.p, 1))
+        assert writer.pending == 0
+    assert conn.size() == 25
+    assert conn.size(ex.g) == 1
+    assert not conn.getStatements(ex.s1, None, None).asList()
+
+
+def test_buffered_writer_keeps_unsent_runs(conn, ex, mocker):
+    writer = conn.bufferedWriter(max_triples=None)
+    writer.addTriple(ex.s1, ex.p, ex.o, contexts=[ex.g])
+    writer.removeTriples(ex.s1, ex.p, ex.o, contexts=[ex.g])
+    writer.addTriple(ex.s2, ex.p, ex.o, contexts=[ex.g])
+    assert writer.pending == 3
+    note_write = mocker.spy(conn, '_note_write')
+    mini = conn._get_mini_repository()
+    mocker.patch.object(mini, 'deleteStatements', side_effect=RequestError(500, 'failed'))
+    with pytest.raises(RequestError):
+        writer.flush()
+    # The first run has been sent, the failed run and the third one are still buffered.
+    assert conn.size() == 1
+    assert writer.pending == 2
+    assert note_write.call_count == 1
+    mocker.stopall()
+    writer.flush()
+    assert writer.pending == 0
+    assert [st.getSubject() for st in conn.getStatements()] == [ex.s2]
+
+
+def test_add_triples_from_generator(conn, ex):
+    from franz.openrdf.repository.repositoryconnection import ADD_STREAMING_THRESHOLD
+    count = ADD_STREAMING_THRESHOLD + 10
+    conn.addTriples((ex['s%d' % i], ex.p, i) for i in range(count))
+    assert conn.size() == count
+    assert conn.getStatements(ex.s17, ex.p, None).asList()[0].getObject().intValue() == 17
+
+
+def test_load_files(conn, tmpdir):
+    from franz.openrdf.tools.load import load_files
+    path = tmpdir.join('data.nt')
+    path.write(''.join('<ex://s%d> <ex://p> "%d" .\n' % (i, i) for i in range(1000)))
+    tmpdir.join('other.ttl').write('<ex://a> <ex://b> <ex://c> .\n')
+    status = load_files(conn, [str(tmpdir)], workers=2, chunk_size=4096)
+    assert not status.failed
+    assert status.chunks_done > 2
+    assert status.bytes_done == status.bytes_total
+    assert conn.size() == 1001
+
+
+def test_load_files_invalid_arguments(conn, tmpdir):
+    from franz.openrdf.tools.load import load_files
+    with pytest.raises(ValueError):
+        load_files(conn, [str(tmpdir)], workers=0)
+    with pytest.raises(ValueError):
+        load_files(conn, [str(tmpdir)], retries=-1)
+
+
+def test_export_repository(conn, ex, tmpdir):
+    from franz.openrdf.tools.export import export_repository
+    conn.addTriples([(ex['s%d' % i], ex['p%d' % (i % 3)], i, None if i % 4 == 0 else ex['g%d' % (i % 4)])
+                     for i in range(100)])
+    status = export_repository(conn, str(tmpdir), workers=2, compress=True)
+    assert not status.failed
+    assert len(status.partitions) == 4
+    assert status.statements_done == 100
+    # A second run finds all partitions in the checkpoint.
+    assert export_repository(conn, str(tmpdir)).partitions_skipped == 0
+    assert export_repository(conn, str(tmpdir), compress=True).partitions_skipped == 4
+    status = export_repository(conn, str(tmpdir.join('by-predicate')), by='predicate')
+    assert status.partitions_done == 3
+    assert status.statements_done == 100
+    conn.clear()
+    from franz.openrdf.tools.load import load_files
+    assert not load_files(conn, [str(tmpdir.join('by-predicate'))]).failed
+    assert conn.size() == 100
+    assert conn.size(ex.g1) == 25
+
+
+def test_export_reports_partitions_of_stopped_workers(conn, ex, tmpdir):
+    from franz.openrdf.tools.export import export_repository
+    conn.addTriples([(ex['s%d' % i], ex.p, i, ex['g%d' % (i % 4)]) for i in range(20)])
+
+    def progress(status):
+        raise ValueError('progress callback failed')
+    status = export_repository(conn, str(tmpdir), workers=2, progress=progress)
+    # Each worker stops after its first partition, the others are failed.
+    assert status.partitions_done == 2
+    assert len(status.failed) == 3
+    assert all(isinstance(error, ValueError) for partition, error in status.failed)
+    status = export_repository(conn, str(tmpdir))
+    assert (status.partitions_skipped, status.partitions_done, len(status.failed)) == (2, 3, 0)
+
+
+def test_export_repository_invalid_arguments(conn, tmpdir):
+    from franz.openrdf.tools.export import export_repository
+    with pytest.raises(ValueError):
+        export_repository(conn, str(tmpdir), workers=0)
+    with pytest.raises(ValueError):
+        export_repository(conn, str(tmpdir), retries=-1)
+
+
+def test_parse_term_escapes():
+    from franz.openrdf.model import BNode, parse_term
+    assert parse_term('<ex://a\\u00e9>') == URI('ex://aé')
+    assert parse_term('"a\\"b\\nc\\\\"') == Literal('a"b\nc\\')
+    assert parse_term('"\\u00e9\\U0001F600 日"@ja') == Literal('é\U0001F600 日', language='ja')
+    assert parse_term('"1"^^<http://www.w3.org/2001/XMLSchema#int>') == Literal(1, XMLSchema.INT)
+    assert parse_term('"\\101"') == Literal('A')
+    assert parse_term('_:b1') == BNode('b1')
+
+
+def test_term_cache(conn, ex):
+    from franz.openrdf.model import configure_term_cache, term_cache_stats
+    conn.addTriples([(ex['s%d' % i], ex.p, ex.o) for i in range(10)])
+    configure_term_cache(size=100)
+    try:
+        before = term_cache_stats()['hits']
+        with conn.executeTupleQuery('SELECT ?p ?o { ?s ?p ?o }') as result:
+            values = [(bs['p'], bs['o']) for bs in result]
+        assert len(values) == 10
+        assert all(p is values[0][0] and o is values[0][1] for p, o in values)
+        assert term_cache_stats()['hits'] - before >= 18
+        # Literals are mutable, so they are never shared.
+        from franz.openrdf.model import parse_term
+        parse_term('"42"^^<http://www.w3.org/2001/XMLSchema#int>').setLabel('99')
+        assert parse_term('"42"^^<http://www.w3.org/2001/XMLSchema#int>').getLabel() == '42'
+        configure_term_cache(size=0)
+        assert term_cache_stats()['size'] == 0
+    finally:
+        configure_term_cache()
+
+
+def test_columnar_query_result(conn, ex):
+    numpy = pytest.importorskip('numpy')
+    conn.addTriples([(ex['s%d' % i], ex.p, i) for i in range(5)])
+    conn.addTriple(ex.s0, ex.d, Literal(datetime(2018, 5, 1, 12, 30)))
+    result = conn.prepareTupleQuery(
+        query='SELECT ?s ?o ?d { ?s <ex://p> ?o OPTIONAL { ?s <ex://d> ?d } } ORDER BY ?o'
+    ).evaluate(columnar=True)
+    columns = result.toNumpy()
+    assert list(columns) == ['s', 'o', 'd']
+    assert columns['o'].dtype == numpy.int64
+    assert list(columns['o']) == [0, 1, 2, 3, 4]
+    assert list(columns['s'].categories[columns['s'].codes]) == ['ex://s%d' % i for i in range(5)]
+    assert columns['d'].dtype == numpy.dtype('datetime64[us]')
+    assert columns['d'][0] == numpy.datetime64('2018-05-01T12:30')
+    assert numpy.isnat(columns['d'][1])
+
+
+def test_query_cache(conn, ex):
+    conn.addTriple(ex.s, ex.p, ex.o1)
+    conn.enableQueryCache(size=10)
+    query = 'SELECT ?o { <ex://s> <ex://p> ?o }'
+    assert [bs['o'] for bs in conn.executeTupleQuery(query)] == [ex.o1]
+    assert [bs['o'] for bs in conn.executeTupleQuery(query)] == [ex.o1]
+    stats = conn.getQueryCacheStats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    # Writes through the connection invalidate the cache
+    conn.addTriple(ex.s, ex.p, ex.o2)
+    assert sorted(bs['o'] for bs in conn.executeTupleQuery(query)) == [ex.o1, ex.o2]
+    assert conn.getQueryCacheStats()['hits'] == 1
+    conn.disableQueryCache()
+    assert conn.getQueryCacheStats() is None
+
+
+def test_caches_discard_uncommitted_changes(conn, ex):
+    conn.addTriple(ex.s, ex.p, ex.o1)
+    conn.enableQueryCache()
+    conn.enableClientSubjectCache()
+    query = 'SELECT ?o { <ex://s> <ex://p> ?o }'
+    conn.openSession()
+    conn.addTriple(ex.s, ex.p, ex.o2)
+    assert len(conn.executeTupleQuery(query)) == 2
+    assert len(conn.getStatements(ex.s)) == 2
+    # Close without committing
+    conn.closeSession()
+    assert [bs['o'] for bs in conn.executeTupleQuery(query)] == [ex.o1]
+    assert [st.getObject() for st in conn.getStatements(ex.s)] == [ex.o1]
+
+
+def test_client_subject_cache(conn, ex, mocker):
+    conn.addTriples([(ex.s, ex.p1, ex.o1, ex.g1), (ex.s, ex.p2, ex.o2), (ex.t, ex.p1, ex.o1)])
+    conn.enableClientSubjectCache(size=10, max_staleness=0)
+    assert len(conn.getStatements(ex.s)) == 2
+    assert [st.getObject() for st in conn.getStatements(ex.s, ex.p2)] == [ex.o2]
+    assert [st.getContext() for st in conn.getStatements(ex.s, contexts=[ex.g1])] == [ex.g1]
+    assert [st.getObject() for st in conn.getStatements(ex.s, contexts=[None])] == [ex.o2]
+    # Terms are compared after parsing, not as strings.
+    assert len(conn.getStatements(ex.s, '<ex://\\u0070\\u0032>')) == 1
+    stats = conn.getClientSubjectCacheStats()
+    assert stats['hits'] == 4
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.8
+    assert stats['bytes'] > 0
+    # Writes through the connection invalidate the cache
+    conn.addTriple(ex.s, ex.p2, ex.o3)
+    assert len(conn.getStatements(ex.s, ex.p2)) == 2
+    # Changes made by other clients are detected through the generation
+    with conn.repository.getConnection() as other:
+        other.addTriple(ex.s, ex.p2, ex.o4)
+    assert len(conn.getStatements(ex.s, ex.p2)) == 3
+    assert conn.getClientSubjectCacheStats()['misses'] == 3
+    # By default the generation is not checked again for a while.
+    conn.enableClientSubjectCache()
+    for _ in range(3):
+        assert len(conn.getStatements(ex.s)) == 4
+    assert conn.getClientSubjectCacheStats()['generation_checks'] == 1
+    # Subjects too large for the memory limit are not cached, later
+    # requests for them are sent with their filters.
+    conn.enableClientSubjectCache(max_bytes=100)
+    conn.getStatements(ex.s)
+    get_statements = mocker.spy(conn._get_mini_repository(), 'getStatements')
+    assert [st.getObject() for st in conn.getStatements(ex.s, ex.p1)] == [ex.o1]
+    assert get_statements.call_args[0][1] == ex.p1.toNTriples()
+    stats = conn.getClientSubjectCacheStats()
+    assert (stats['size'], stats['misses'], stats['bypassed'], stats['uncacheable']) == (0, 1, 1, 1)
+    conn.disableClientSubjectCache()
+    assert conn.getClientSubjectCacheStats() is None
+
+
+def test_paged_results(conn, ex):
+    conn.addTriples([(ex['s%d' % i], ex.p, i) for i in range(25)])
+    with conn.iterStatements(predicate=ex.p, page_size=10) as result:
+        assert sorted(s.getObject().intValue() for s in result) == list(range(25))
+    query = conn.prepareTupleQuery(query='SELECT ?o { ?s <ex://p> ?o } ORDER BY ?o')
+    with query.evaluatePaged(page_size=7, prefetch=1, offset=2, limit=20) as result:
+        assert result.getBindingNames() == ['o']
+        assert [bs['o'].intValue() for bs in result] == list(range(2, 22))
+
+
+def test_get_statements_batch(conn, ex):
+    conn.addTriples([(ex['s%d' % (i % 3)], ex['p%d' % (i % 2)], i) for i in range(12)])
+    patterns = [(ex.s0, None, None), (ex.s1, None, None), (ex.s2, ex.p0, None),
+                (ex.s3, None, None), (None, ex.p1, None), (ex.s0, None, None)]
+    results = conn.getStatementsBatch(patterns)
+    assert len(results) == len(patterns)
+    for pattern, result in zip(patterns, results):
+        expected = sorted(s.getObject().intValue() for s in conn.getStatements(*pattern))
+        assert sorted(s.getObject().intValue() for s in result) == expected
+    assert [len(r) for r in results] == [4, 4, 2, 0, 6, 4]
+
+
+@pytest.mark.parametrize('mode', ['exact', 'compact', 'bloom'])
+def test_duplicate_filter_modes(conn, ex, mode):
+    conn.addTriples([(ex.s, ex.p, i) for i in range(10)])
+    conn.addTriples([(ex.s, ex.p, i) for i in range(5)])
+    with conn.getStatements(ex.s, ex.p, None) as result:
+        result.enableDuplicateFilter(mode)
+        values = sorted(s.getObject().intValue() for s in result)
+    assert values == list(range(10))
+
+
+def test_literal_datatype_resolution():
+    from franz.openrdf.model import parse_term
+    lit = parse_term('"1"^^<http://www.w3.org/2001/XMLSchema#int>')
+    assert lit.datatype is XMLSchema.INT
+    assert lit == Literal(1, XMLSchema.INT)
+    custom = Literal('x', datatype='<ex://t>')
+    assert custom == Literal('x', datatype=URI('ex://t'))
+    assert custom.toNTriples() == '"x"^^<ex://t>'
+    assert custom.datatype == URI('ex://t')
+    assert not hasattr(custom, '__dict__')
+
+
+def test_uri_interning():
+    from franz.openrdf.model import uri_intern_stats
+    before = uri_intern_stats()
+    uri = URI('<ex://interned>')
+    assert URI('ex://interned') is uri
+    assert URI(namespace='ex://', localname='interned') is uri
+    assert URI('ex://interned', canonical=False) is not uri
+    assert URI(URI('ex://interned', canonical=False)) is uri
+    after = uri_intern_stats()
+    assert after['hits'] >= before['hits'] + 3
+    assert after['size'] >= 1
+
+
+def test_ntriples_serialization_cache():
+    from franz.openrdf.util.strings import encode_ntriple_string
+    assert encode_ntriple_string('plain') == 'plain'
+    assert encode_ntriple_string('a\\b\n"c"\r') == 'a\\\\b\\n\\"c\\"\\r'
+    lit = Literal('x "y"', language='EN')
+    assert lit.toNTriples() == '"x \\"y\\""@en'
+    lit.setLabel('z')
+    lit.setLanguage(None)
+    lit.setDatatype(URI('ex://t'))
+    assert lit.toNTriples() == '"z"^^<ex://t>'
+    assert URI('ex://a b').toNTriples() == '<ex://a\\u0020b>'
+
+
+@pytest.mark.parametrize('codec', ['orjson', 'ujson', 'rapidjson', 'simplejson', 'json'])
+def test_json_codecs(codec):
+    from franz.miniclient import agjson
+    previous = agjson.get_json_codec()
+    try:
+        agjson.set_json_codec(codec)
+    except ImportError:
+        pytest.skip('%s is not installed' % codec)
+    try:
+        value = {'names': ['s'], 'values': [['"é\\n"', None], [1, 2.5, True]]}
+        assert agjson.decode_json(agjson.encode_json(value)) == value
+        assert agjson.decode_json(agjson.encode_json(value).encode('utf-8')) == value
+        assert agjson.decode_json(b'{"x": 12345678901234567890123}') == {'x': 12345678901234567890123}
+        assert agjson.decode_json('[18446744073709551616, -9223372036854775809]') == \
+            [18446744073709551616, -9223372036854775809]
+        assert type(agjson.decode_json(b'[18446744073709551616]')[0]) is not float
+        assert agjson.encode_json({'a': 'é'}, ensure_ascii=True) in ('{"a": "\\u00e9"}', '{"a":"\\u00e9"}',
+                                                                          '{"a":"\\u00E9"}')
+        with pytest.raises(agjson.JsonDecodeError):
+            agjson.decode_json(b'[1,')
+    finally:
+        agjson.set_json_codec(previous)
+
+
+def test_raw_response_body(conn, ex):
+    from franz.miniclient.request import makeRequest
+    conn.addTriple(ex.s, ex.p, ex.o)
+    mini = conn._get_mini_repository()
+    status, body = makeRequest(mini, 'GET', '/size', accept='text/integer', raw=True)
+    assert status == 200
+    assert isinstance(body, bytes)
+    assert int(body) == conn.size()
+    status, text = makeRequest(mini, 'GET', '/size', accept='text/integer')
+    assert not isinstance(text, bytes) or str is bytes
+    assert int(text) == conn.size()
+
+
+def test_statement_batch(conn, ex):
+    conn.addTriples([(ex['s%d' % (i % 3)], ex['p%d' % (i % 2)], i, ex.g if i % 4 else None)
+                     for i in range(12)])
+    batch = conn.getStatements(as_batch=True)
+    assert len(batch) == 12
+    assert sorted(s.getObject().intValue() for s in batch) == list(range(12))
+    p0 = batch.filter(predicate=ex.p0)
+    assert sorted(int(o.split('"')[1]) for o in p0.objects) == [0, 2, 4, 6, 8, 10]
+    assert len(batch.filter(subject=[ex.s0, ex.s1], predicate=ex.p1)) == 4
+    groups = batch.groupBy('subject')
+    assert sorted((key, len(group)) for key, group in groups.items()) == \
+        [('<ex://s0>', 4), ('<ex://s1>', 4), ('<ex://s2>', 4)]
+    assert list(batch.project('graph', 'subject')) == ['graph', 'subject']
+    conn.clear()
+    conn.addTriples(p0, context=ex.c)
+    assert conn.size() == 6
+    assert conn.size(ex.c) == 3
+    numpy = pytest.importorskip('numpy')
+    columns = conn.getStatements(as_batch=True).toNumpy()
+    assert columns['object'].dtype == numpy.int64
+    assert sorted(columns['predicate'].categories) == ['ex://p0']
+
+
+def test_blank_node_allocator(conn):
+    import threading
+    nodes = []
+
+    def create():
+        ids = [conn.createBNode().getId() for _ in range(500)]
+        nodes.extend(ids)
+
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(nodes)) == 2000
+    stats = conn.getBlankNodeStats()
+    assert stats['allocated'] >= 2000
+    assert stats['fetched'] == stats['allocated'] + stats['available']
+    assert stats['block_size'] > 10
+    assert stats['requests'] < 200
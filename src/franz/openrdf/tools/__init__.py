@@ -0,0 +1,11 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Utilities for bulk operations, each also usable as a command line program
+(``python -m franz.openrdf.tools.<name> --help``).
+"""
@@ -0,0 +1,457 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Parallel export of a repository to files.
+
+Statements are split into partitions (by graph and/or predicate),
+which are downloaded by a number of worker threads, each using its
+own connection, and written to separate files. Finished partitions are
+recorded in a checkpoint file, so an interrupted export can be resumed.
+The resulting files can be loaded with :mod:`franz.openrdf.tools.load`.
+
+This module can be used as a program::
+
+    python -m franz.openrdf.tools.export --help
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from future.builtins import object
+from six.moves import queue
+
+from ..query.dataset import ALL_CONTEXTS
+from ..query.query import QueryLanguage
+from ..rio.rdfformat import RDFFormat
+
+# Default number of worker threads.
+DEFAULT_WORKERS = 4
+
+# Name of the file (in the output directory) listing finished partitions.
+CHECKPOINT_FILE = 'checkpoint.jsonl'
+
+# Ways of splitting the data (see export_repository).
+PARTITION_MODES = ('context', 'predicate', 'both')
+
+# Formats with one statement per line, for which statements are counted.
+LINE_FORMATS = (RDFFormat.NTRIPLES, RDFFormat.NQUADS, RDFFormat.NQX)
+
+
+class ExportProgress(object):
+    """
+    Progress and result of an :func:`export_repository` call.
+    """
+    def __init__(self, partitions):
+        #: List of all partitions.
+        self.partitions = partitions
+        #: Number of partitions exported so far.
+        self.partitions_done = 0
+        #: Number of partitions skipped because a previous export finished them.
+        self.partitions_skipped = 0
+        #: Size of the data received so far (in bytes, before compression).
+        self.bytes_done = 0
+        #: Number of statements received so far (only counted for line-based formats).
+        self.statements_done = 0
+        #: Number of retried partitions.
+        self.retries = 0
+        #: List of (partition, exception) pairs for partitions that could not be exported.
+        self.failed = []
+        self.start_time = time.time()
+        self.end_time = None
+
+    @property
+    def elapsed(self):
+        """
+        Time since the export started (in seconds).
+        """
+        return (self.end_time or time.time()) - self.start_time
+
+    @property
+    def throughput(self):
+        """
+        Average number of bytes received per second.
+        """
+        elapsed = self.elapsed
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def statement_rate(self):
+        """
+        Average number of statements received per second.
+        """
+        elapsed = self.elapsed
+        return self.statements_done / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return '%d/%d partitions (%d skipped, %d failed), %d statements, %.1f MB in %.1fs, ' \
+            '%.2f MB/s, %.0f statements/s' % (
+                self.partitions_done + self.partitions_skipped, len(self.partitions),
+                self.partitions_skipped, len(self.failed), self.statements_done,
+                self.bytes_done / 1e6, self.elapsed, self.throughput / 1e6, self.statement_rate)
+
+
+class ExportPartition(object):
+    """
+    A subset of the statements of a repository, exported to a single file.
+    """
+    def __init__(self, context=ALL_CONTEXTS, predicate=None):
+        """
+        :param context: Graph of the statements (``None`` for the default graph)
+                        or ``ALL_CONTEXTS``.
+        :type context: URI|string
+        :param predicate: Predicate of the statements or ``None`` (any predicate).
+        :type predicate: URI|string
+        """
+        self.context = context
+        self.predicate = predicate
+
+    @property
+    def contexts(self):
+        """
+        Value of the ``contexts`` argument of :meth:`.RepositoryConnection.getStatements`.
+        """
+        return ALL_CONTEXTS if self.context is ALL_CONTEXTS else [self.context]
+
+    def key(self):
+        """
+        A description of the partition, used to find it in a checkpoint.
+
+        :rtype: string
+        """
+        if self.context is ALL_CONTEXTS:
+            context = '*'
+        elif self.context is None:
+            context = 'default'
+        else:
+            context = str(self.context)
+        return '%s %s' % (context, '*' if self.predicate is None else str(self.predicate))
+
+    def file_name(self, rdf_format, compress):
+        """
+        Name of the file the partition is written to. The name only
+        depends on the partition key, so it does not change when an
+        export is resumed.
+
+        :rtype: string
+        """
+        digest = hashlib.sha1(self.key().encode('utf-8')).hexdigest()[:16]
+        name = 'part-%s.%s' % (digest, rdf_format.file_extensions[0])
+        return name + '.gz' if compress else name
+
+    def __str__(self):
+        return self.key()
+
+
+class _CountingWriter(object):
+    """
+    Counts bytes and lines written to a file.
+    """
+    def __init__(self, target):
+        self.target = target
+        self.bytes = 0
+        self.lines = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        self.lines += data.count(b'\n')
+        self.target.write(data)
+        return len(data)
+
+
+def list_predicates(conn):
+    """
+    Find all predicates used in a repository.
+
+    :param conn: A connection to the repository.
+    :type conn: RepositoryConnection
+    :rtype: list[URI]
+    """
+    query = conn.prepareTupleQuery(QueryLanguage.SPARQL, 'SELECT DISTINCT ?p { ?s ?p ?o }')
+    with query.evaluate() as result:
+        return [bindings.getValue('p') for bindings in result]
+
+
+def make_partitions(conn, by='context'):
+    """
+    Split the statements of a repository into partitions.
+
+    :param conn: A connection to the repository.
+    :type conn: RepositoryConnection
+    :param by: ``'context'`` (one partition for each graph and one for the
+               default graph), ``'predicate'`` (one partition for each
+               predicate) or ``'both'`` (one partition for each
+               combination of graph and predicate, which might be
+               empty; only suitable for a small number of graphs).
+    :type by: string
+    :rtype: list[ExportPartition]
+    """
+    if by not in PARTITION_MODES:
+        raise ValueError('Invalid partitioning: %s (expected one of %s)' % (by, ', '.join(PARTITION_MODES)))
+    if by == 'predicate':
+        return [ExportPartition(predicate=predicate) for predicate in list_predicates(conn)]
+    contexts = [None] + conn.getContextIDs()
+    if by == 'context':
+        return [ExportPartition(context) for context in contexts]
+    predicates = list_predicates(conn)
+    return [ExportPartition(context, predicate) for context in contexts for predicate in predicates]
+
+
+def _read_checkpoint(path):
+    """
+    Get the file names of partitions recorded as finished.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line.decode('utf-8'))['file'])
+            except (ValueError, KeyError):
+                # A line cut short by a crash.
+                pass
+    return done
+
+
+def export_repository(conn, directory, by='context', partitions=None, workers=DEFAULT_WORKERS,
+                      rdf_format=RDFFormat.NQX, compress=False, include_inferred=False,
+                      resume=True, retries=2, retry_delay=1.0, progress=None):
+    """
+    Export statements to a directory, one file per partition, in parallel.
+
+    Each worker thread uses its own connection to the repository of ``conn``
+    (this means that a session opened on ``conn`` is not used). A partition
+    is first written to a temporary file, which is renamed once the whole
+    partition has been received, and then recorded in a checkpoint file
+    (:data:`CHECKPOINT_FILE`). When ``resume`` is true, partitions listed
+    there are not exported again, so an interrupted export can be completed
+    by calling this function again with the same arguments. Changes made
+    to the repository in the meantime might be partly missing from the
+    result.
+
+    Failed downloads are retried from the start of the partition. Partitions
+    that still cannot be exported are reported in the
+    :attr:`~ExportProgress.failed` list of the result, they do not stop
+    the export.
+
+    :param conn: A connection to the repository.
+    :type conn: RepositoryConnection
+    :param directory: Output directory (created if it does not exist).
+    :type directory: string
+    :param by: How to split the data, see :func:`make_partitions`.
+    :type by: string
+    :param partitions: Explicit list of partitions (``by`` is ignored if given).
+    :type partitions: list[ExportPartition]
+    :param workers: Number of partitions downloaded at the same time.
+    :type workers: int
+    :param rdf_format: Format of the files (default: N-Quads with attributes).
+    :type rdf_format: RDFFormat
+    :param compress: If ``True`` compress the files with gzip.
+    :type compress: bool
+    :param include_inferred: If ``True`` also export inferred statements.
+    :type include_inferred: bool
+    :param resume: If ``True`` (default) skip partitions recorded in
+                   the checkpoint file, otherwise export everything again.
+    :type resume: bool
+    :param retries: Number of times a failed partition is retried.
+    :type retries: int
+    :param retry_delay: Time to wait before the first retry (in seconds).
+                        The delay doubles after each failed attempt.
+    :type retry_delay: float
+    :param progress: A function called (from worker threads) with an
+                     :class:`ExportProgress` object after each partition.
+    :type progress: (ExportProgress) -> None
+    :return: Statistics, including the list of partitions that could not be exported.
+    :rtype: ExportProgress
+    """
+    if workers < 1:
+        raise ValueError('Invalid number of workers: %s (must be at least 1)' % workers)
+    if retries < 0:
+        raise ValueError('Invalid number of retries: %s (must not be negative)' % retries)
+    if partitions is None:
+        partitions = make_partitions(conn, by)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    checkpoint_path = os.path.join(directory, CHECKPOINT_FILE)
+    if not resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    done = _read_checkpoint(checkpoint_path)
+    status = ExportProgress(partitions)
+    lock = threading.Lock()
+    tasks = queue.Queue()
+    pending = []
+    for partition in partitions:
+        file_name = partition.file_name(rdf_format, compress)
+        if file_name in done and os.path.exists(os.path.join(directory, file_name)):
+            status.partitions_skipped += 1
+        else:
+            pending.append((partition, file_name))
+            tasks.put((partition, file_name))
+    # File names of partitions that have been exported or reported as failed.
+    finished = set()
+    # Exceptions that stopped worker threads (e.g. raised by the progress callback).
+    worker_errors = []
+
+    def download(worker_conn, partition, path):
+        temporary = path + '.part'
+        f = gzip.open(temporary, 'wb') if compress else open(temporary, 'wb')
+        try:
+            writer = _CountingWriter(f)
+            worker_conn.getStatements(None, partition.predicate, None, partition.contexts,
+                                      includeInferred=include_inferred,
+                                      output=writer, output_format=rdf_format)
+        except Exception:
+            f.close()
+            os.remove(temporary)
+            raise
+        f.close()
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(temporary, path)
+        return writer
+
+    def record(partition, file_name, writer):
+        entry = dict(file=file_name, partition=partition.key(), bytes=writer.bytes)
+        if rdf_format in LINE_FORMATS:
+            entry['statements'] = writer.lines
+        with open(checkpoint_path, 'ab') as f:
+            f.write((json.dumps(entry, sort_keys=True) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def work():
+        worker_conn = conn.repository.getConnection()
+        try:
+            while True:
+                try:
+                    partition, file_name = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                path = os.path.join(directory, file_name)
+                delay = retry_delay
+                for attempt in range(retries + 1):
+                    try:
+                        writer = download(worker_conn, partition, path)
+                        error = None
+                        break
+                    except Exception as e:
+                        error = e
+                        if attempt < retries:
+                            with lock:
+                                status.retries += 1
+                            time.sleep(delay)
+                            delay *= 2
+                with lock:
+                    if error is None:
+                        record(partition, file_name, writer)
+                        status.partitions_done += 1
+                        status.bytes_done += writer.bytes
+                        if rdf_format in LINE_FORMATS:
+                            status.statements_done += writer.lines
+                    else:
+                        status.failed.append((partition, error))
+                    finished.add(file_name)
+                    if progress is not None:
+                        progress(status)
+        finally:
+            worker_conn.close()
+
+    def guarded_work():
+        try:
+            work()
+        except Exception as e:
+            with lock:
+                worker_errors.append(e)
+
+    threads = [threading.Thread(target=guarded_work) for _ in range(max(min(workers, tasks.qsize()), 1))]
+    try:
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+    finally:
+        for thread in threads:
+            thread.join()
+        # Partitions left behind by workers that stopped early.
+        for partition, file_name in pending:
+            if file_name not in finished:
+                error = worker_errors[0] if worker_errors else RuntimeError('Export worker stopped.')
+                status.failed.append((partition, error))
+        status.end_time = time.time()
+    return status
+
+
+_FORMATS = dict(nqx=RDFFormat.NQX, nquads=RDFFormat.NQUADS, ntriples=RDFFormat.NTRIPLES)
+
+
+def main(args=None):
+    """
+    Command line interface, see ``--help``.
+    """
+    from ..connect import ag_connect
+
+    parser = argparse.ArgumentParser(
+        prog='python -m franz.openrdf.tools.export',
+        description='Export an AllegroGraph repository to a directory, one file per partition, '
+                    'in parallel. Running the same command again after a failure exports '
+                    'only the missing partitions. Connection parameters not given as options '
+                    'are taken from AGRAPH_HOST, AGRAPH_PORT, AGRAPH_USER and AGRAPH_PASSWORD.')
+    parser.add_argument('repository', help='source repository')
+    parser.add_argument('directory', help='output directory')
+    parser.add_argument('--catalog', help='catalog of the repository (default: root catalog)')
+    parser.add_argument('--host', help='server host, can include the protocol and port')
+    parser.add_argument('--port', type=int, help='server port')
+    parser.add_argument('--user', help='user name')
+    parser.add_argument('--password', help='password')
+    parser.add_argument('--by', choices=PARTITION_MODES, default='context',
+                        help='how to split the data into files (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='number of parallel downloads (default: %(default)s)')
+    parser.add_argument('--format', choices=sorted(_FORMATS), default='nqx',
+                        help='output format (default: %(default)s)')
+    parser.add_argument('--gzip', action='store_true', help='compress the files')
+    parser.add_argument('--include-inferred', action='store_true', help='also export inferred statements')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='number of retries after a failed download (default: %(default)s)')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore partitions finished by a previous export')
+    parser.add_argument('--quiet', action='store_true', help='only report the final result')
+    options = parser.parse_args(args)
+
+    last_report = [0.0]
+
+    def report(status):
+        now = time.time()
+        if not options.quiet and now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(status)
+            sys.stdout.flush()
+
+    with ag_connect(options.repository, catalog=options.catalog, create=False,
+                    host=options.host, port=options.port,
+                    user=options.user, password=options.password) as conn:
+        status = export_repository(conn, options.directory, by=options.by, workers=options.workers,
+                                   rdf_format=_FORMATS[options.format], compress=options.gzip,
+                                   include_inferred=options.include_inferred,
+                                   resume=not options.restart, retries=options.retries,
+                                   progress=report)
+    print(status)
+    for partition, error in status.failed:
+        print('FAILED: %s: %s' % (partition, error), file=sys.stderr)
+    return 1 if status.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,372 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+Parallel loading of RDF files.
+
+Files are uploaded by a number of worker threads, each using its own
+connection. Large N-Triples and N-Quads files are split into chunks
+at line boundaries, so that a single file can also be loaded in parallel.
+
+This module can be used as a program::
+
+    python -m franz.openrdf.tools.load --help
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from future.builtins import object
+from six.moves import queue
+
+from ..rio.rdfformat import RDFFormat
+
+# Default number of worker threads.
+DEFAULT_WORKERS = 4
+
+# Default size of chunks that large files are split into (in bytes).
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Formats with one statement per line, which can be split into chunks.
+LINE_FORMATS = (RDFFormat.NTRIPLES, RDFFormat.NQUADS, RDFFormat.NQX)
+
+# Size of blocks read when looking for blank nodes.
+_SCAN_BLOCK_SIZE = 1024 * 1024
+
+
+class LoadProgress(object):
+    """
+    Progress and result of a :func:`load_files` call.
+    """
+    def __init__(self, files, bytes_total):
+        #: List of files being loaded.
+        self.files = files
+        #: Total size of all files (in bytes).
+        self.bytes_total = bytes_total
+        #: Size of the data loaded so far (in bytes).
+        self.bytes_done = 0
+        #: Number of chunks (or whole files) loaded so far.
+        self.chunks_done = 0
+        #: Number of retried uploads.
+        self.retries = 0
+        #: List of (description, exception) pairs for chunks that could not be loaded.
+        self.failed = []
+        self.start_time = time.time()
+        self.end_time = None
+
+    @property
+    def elapsed(self):
+        """
+        Time since the load started (in seconds).
+        """
+        return (self.end_time or time.time()) - self.start_time
+
+    @property
+    def throughput(self):
+        """
+        Average number of bytes loaded per second.
+        """
+        elapsed = self.elapsed
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return '%.1f/%.1f MB (%d chunks, %d failed) in %.1fs, %.2f MB/s' % (
+            self.bytes_done / 1e6, self.bytes_total / 1e6, self.chunks_done,
+            len(self.failed), self.elapsed, self.throughput / 1e6)
+
+
+class _Chunk(object):
+    """
+    A piece of work: either a whole file or a part of a line-based file.
+    """
+    def __init__(self, path, rdf_format, size, data=None, offset=None):
+        self.path = path
+        self.format = rdf_format
+        self.size = size
+        # Contents of the chunk or None to upload the whole file.
+        self.data = data
+        self.offset = offset
+
+    def __str__(self):
+        if self.data is None:
+            return self.path
+        return '%s (bytes %d-%d)' % (self.path, self.offset, self.offset + self.size)
+
+
+def find_files(paths, recursive=True):
+    """
+    Expand directories into lists of the RDF files they contain.
+
+    :param paths: File and directory paths.
+    :type paths: Iterable[string]
+    :param recursive: If ``True`` (default) also search subdirectories.
+    :type recursive: bool
+    :return: File paths, in order. Directory contents are sorted
+             and only include files with known RDF extensions.
+    :rtype: list[string]
+    """
+    result = []
+    for path in paths:
+        if not os.path.isdir(path):
+            result.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            if not recursive:
+                del dirs[:]
+            for name in sorted(names):
+                if RDFFormat.format_for_file_name(name)[0] is not None:
+                    result.append(os.path.join(root, name))
+    return result
+
+
+def _has_blank_nodes(path):
+    """
+    Check if a line-based file might contain blank node labels.
+    """
+    with open(path, 'rb') as f:
+        previous = b''
+        while True:
+            block = f.read(_SCAN_BLOCK_SIZE)
+            if not block:
+                return False
+            if b'_:' in previous[-1:] + block:
+                return True
+            previous = block
+
+
+def _chunks(files, rdf_format, chunk_size):
+    """
+    Generate the pieces of work for a list of files.
+    """
+    for path in files:
+        fmt, compression = RDFFormat.format_for_file_name(path)
+        fmt = rdf_format or fmt
+        size = os.path.getsize(path)
+        # Blank node labels are only meaningful within a single upload,
+        # so files that contain them are never split.
+        if (fmt not in LINE_FORMATS or compression or not chunk_size or size <= chunk_size or
+                _has_blank_nodes(path)):
+            yield _Chunk(path, fmt, size)
+            continue
+        with open(path, 'rb') as f:
+            offset = 0
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                # Finish the last line
+                data += f.readline()
+                yield _Chunk(path, fmt, len(data), data, offset)
+                offset += len(data)
+
+
+def load_files(conn, paths, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE,
+               rdf_format=None, context=None, base=None, retries=2, retry_delay=1.0,
+               bulk_mode=False, recursive=True, progress=None):
+    """
+    Load RDF files in parallel.
+
+    Each worker thread uses its own connection to the repository of ``conn``
+    (this means that a session opened on ``conn`` is not used). Each chunk
+    is loaded in a separate transaction.
+
+    N-Triples and N-Quads files larger than ``chunk_size`` are split at
+    line boundaries, unless they are compressed or contain blank nodes
+    (splitting would change the meaning of blank node labels).
+    Other files are uploaded as a whole.
+
+    Failed uploads are retried. Chunks that still cannot be loaded
+    are reported in the :attr:`~LoadProgress.failed` list of the result,
+    they do not stop the load.
+
+    :param conn: A connection to the target repository.
+    :type conn: RepositoryConnection
+    :param paths: Files and directories to load.
+    :type paths: Iterable[string]
+    :param workers: Number of uploads performed at the same time.
+    :type workers: int
+    :param chunk_size: Size (in bytes) of the chunks that large files are split into
+                       (0 or ``None`` to never split files).
+    :type chunk_size: int
+    :param rdf_format: Format of all files. If ``None`` (default) the format
+                       is chosen based on each file name.
+    :type rdf_format: RDFFormat
+    :param context: Graph to load the data into (default: the default graph).
+    :type context: URI|string
+    :param base: Base URI used to resolve relative URIs.
+    :type base: string
+    :param retries: Number of times a failed upload is retried.
+    :type retries: int
+    :param retry_delay: Time to wait before the first retry (in seconds).
+                        The delay doubles after each failed attempt.
+    :type retry_delay: float
+    :param bulk_mode: If ``True`` the repository is switched to bulk mode
+                      for the duration of the load (see
+                      :attr:`~franz.openrdf.repository.repository.Repository.bulk_mode`).
+    :type bulk_mode: bool
+    :param recursive: If ``True`` (default) also load files from subdirectories
+                      of directories passed in ``paths``.
+    :type recursive: bool
+    :param progress: A function called (from worker threads) with a
+                     :class:`LoadProgress` object after each chunk.
+    :type progress: (LoadProgress) -> None
+    :return: Statistics, including the list of chunks that could not be loaded.
+    :rtype: LoadProgress
+    """
+    if workers < 1:
+        raise ValueError('Invalid number of workers: %s (must be at least 1)' % workers)
+    if retries < 0:
+        raise ValueError('Invalid number of retries: %s (must not be negative)' % retries)
+    files = find_files(paths, recursive=recursive)
+    status = LoadProgress(files, sum(os.path.getsize(path) for path in files))
+    lock = threading.Lock()
+    # Bounded, so that only a few chunks are held in memory.
+    tasks = queue.Queue(2 * workers)
+
+    def upload(worker_conn, chunk):
+        if chunk.data is None:
+            worker_conn.addFile(chunk.path, base=base, format=chunk.format, context=context)
+        else:
+            worker_conn.addData(chunk.data, rdf_format=chunk.format, base_uri=base, context=context)
+
+    def work():
+        worker_conn = conn.repository.getConnection()
+        worker_conn.add_commit_size = conn.add_commit_size
+        try:
+            while True:
+                chunk = tasks.get()
+                if chunk is None:
+                    return
+                delay = retry_delay
+                for attempt in range(retries + 1):
+                    try:
+                        upload(worker_conn, chunk)
+                        error = None
+                        break
+                    except Exception as e:
+                        error = e
+                        if attempt < retries:
+                            with lock:
+                                status.retries += 1
+                            time.sleep(delay)
+                            delay *= 2
+                with lock:
+                    if error is None:
+                        status.bytes_done += chunk.size
+                        status.chunks_done += 1
+                    else:
+                        status.failed.append((str(chunk), error))
+                    if progress is not None:
+                        progress(status)
+        finally:
+            worker_conn.close()
+
+    previous_bulk_mode = None
+    if bulk_mode:
+        previous_bulk_mode = conn.repository.bulk_mode
+        conn.repository.bulk_mode = True
+    threads = [threading.Thread(target=work) for _ in range(workers)]
+
+    def put(task):
+        # Do not wait forever if all workers died (e.g. the progress callback failed).
+        while True:
+            try:
+                tasks.put(task, timeout=1.0)
+                return
+            except queue.Full:
+                if not any(thread.is_alive() for thread in threads):
+                    raise RuntimeError('All load workers have stopped.')
+
+    try:
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for chunk in _chunks(files, rdf_format, chunk_size):
+            put(chunk)
+    finally:
+        try:
+            for _ in threads:
+                put(None)
+        except RuntimeError:
+            pass
+        for thread in threads:
+            thread.join()
+        status.end_time = time.time()
+        if bulk_mode and not previous_bulk_mode:
+            conn.repository.bulk_mode = False
+    return status
+
+
+def main(args=None):
+    """
+    Command line interface, see ``--help``.
+    """
+    from ..connect import ag_connect
+
+    parser = argparse.ArgumentParser(
+        prog='python -m franz.openrdf.tools.load',
+        description='Load RDF files into an AllegroGraph repository in parallel. '
+                    'Connection parameters not given as options are taken '
+                    'from AGRAPH_HOST, AGRAPH_PORT, AGRAPH_USER and AGRAPH_PASSWORD.')
+    parser.add_argument('repository', help='target repository')
+    parser.add_argument('paths', nargs='+', metavar='path', help='file or directory to load')
+    parser.add_argument('--catalog', help='catalog of the repository (default: root catalog)')
+    parser.add_argument('--host', help='server host, can include the protocol and port')
+    parser.add_argument('--port', type=int, help='server port')
+    parser.add_argument('--user', help='user name')
+    parser.add_argument('--password', help='password')
+    parser.add_argument('--create', action='store_true', help='create the repository if it does not exist')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='number of parallel uploads (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=float, default=DEFAULT_CHUNK_SIZE / 1024 / 1024,
+                        help='size of chunks large files are split into, in MB, 0 disables splitting '
+                             '(default: %(default)s)')
+    parser.add_argument('--context', help='graph URI to load the data into (default: the default graph)')
+    parser.add_argument('--base', help='base URI')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='number of retries after a failed upload (default: %(default)s)')
+    parser.add_argument('--bulk', action='store_true', help='enable bulk mode during the load')
+    parser.add_argument('--no-recursive', dest='recursive', action='store_false',
+                        help='do not load files from subdirectories')
+    parser.add_argument('--quiet', action='store_true', help='only report the final result')
+    options = parser.parse_args(args)
+
+    last_report = [0.0]
+
+    def report(status):
+        now = time.time()
+        if not options.quiet and now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(status)
+            sys.stdout.flush()
+
+    with ag_connect(options.repository, catalog=options.catalog, create=options.create,
+                    host=options.host, port=options.port,
+                    user=options.user, password=options.password) as conn:
+        context = conn.createURI(options.context) if options.context else None
+        size = conn.size()
+        status = load_files(conn, options.paths, workers=options.workers,
+                            chunk_size=int(options.chunk_size * 1024 * 1024),
+                            context=context, base=options.base, retries=options.retries,
+                            bulk_mode=options.bulk, recursive=options.recursive,
+                            progress=report)
+        added = conn.size() - size
+    print(status)
+    print('%d statements added (%.0f statements/s)' % (added, added / status.elapsed if status.elapsed else 0))
+    for description, error in status.failed:
+        print('FAILED: %s: %s' % (description, error), file=sys.stderr)
+    return 1 if status.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
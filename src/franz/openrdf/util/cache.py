@@ -0,0 +1,158 @@
+################################################################################
+# Copyright (c) 2006-2017 Franz Inc.
+# All rights reserved. This program and the accompanying materials are
+# made available under the terms of the MIT License which accompanies
+# this distribution, and is available at http://opensource.org/licenses/MIT
+################################################################################
+
+"""
+A bounded, thread-safe cache.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import threading
+from collections import OrderedDict
+
+from future.builtins import object
+
+# Marks missing entries.
+_MISSING = object()
+
+
+class LRUCache(object):
+    """
+    A mapping with a limited number of entries. When the cache is full
+    the least recently used entry is discarded.
+
+    Entries can also be given a weight (e.g. an estimate of their size
+    in bytes), in which case the total weight can be limited as well.
+
+    All operations are protected by a lock, so a single cache can be
+    shared by multiple threads.
+    """
+    def __init__(self, maxsize, max_weight=None):
+        """
+        :param maxsize: Maximum number of entries (0 disables the cache).
+        :type maxsize: int
+        :param max_weight: Maximum total weight of all entries
+                           (``None`` means no limit).
+        :type max_weight: int
+        """
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._weights = {}
+        self._maxsize = maxsize
+        self._max_weight = max_weight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        """
+        Maximum number of entries.
+        """
+        return self._maxsize
+
+    def get(self, key, default=None):
+        """
+        Return the value stored for a key and mark it as recently used.
+
+        :param key: A hashable key.
+        :param default: Value returned if the key is not in the cache.
+        :return: The cached value or ``default``.
+        """
+        with self._lock:
+            # Re-inserting moves the entry to the end.
+            value = self._data.pop(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value, weight=1):
+        """
+        Store a value, discarding old entries if the cache is full.
+        Values heavier than the weight limit are not stored.
+
+        :param key: A hashable key.
+        :param value: Value to store.
+        :param weight: Weight of the entry.
+        :type weight: int
+        """
+        with self._lock:
+            data = self._data
+            if data.pop(key, _MISSING) is not _MISSING:
+                self.weight -= self._weights.pop(key)
+            if self._maxsize <= 0 or (self._max_weight is not None and weight > self._max_weight):
+                return
+            data[key] = value
+            self._weights[key] = weight
+            self.weight += weight
+            self._shrink(self._maxsize)
+
+    def _shrink(self, size):
+        data = self._data
+        while len(data) > size or (self._max_weight is not None and self.weight > self._max_weight):
+            key, _ = data.popitem(last=False)
+            self.weight -= self._weights.pop(key)
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        """
+        Change the maximum number of entries. If the cache is larger
+        than the new limit old entries are discarded.
+
+        :param maxsize: Maximum number of entries (0 disables the cache).
+        :type maxsize: int
+        """
+        with self._lock:
+            self._maxsize = maxsize
+            self._shrink(max(maxsize, 0))
+
+    def clear(self, reset_stats=True):
+        """
+        Remove all entries.
+
+        :param reset_stats: If ``True`` (default) also reset statistics.
+        :type reset_stats: bool
+        """
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self.weight = 0
+            if reset_stats:
+                self.hits = 0
+                self.misses = 0
+                self.evictions = 0
+
+    def stats(self):
+        """
+        Get usage statistics.
+
+        The result is a dictionary with the following entries:
+
+           - ``size``: current number of entries.
+           - ``maxsize``: maximum number of entries.
+           - ``hits``: number of successful lookups.
+           - ``misses``: number of lookups of keys not in the cache.
+           - ``evictions``: number of entries discarded to make room for new ones.
+           - ``weight``: total weight of all entries.
+           - ``max_weight``: maximum total weight (``None`` if not limited).
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(size=len(self._data), maxsize=self._maxsize, hits=self.hits,
+                        misses=self.misses, evictions=self.evictions,
+                        weight=self.weight, max_weight=self._max_weight)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -50,3 +50,21 @@ def merge_headers(headers, extra_headers):
     if not headers:
         return extra_headers
     return normalize_headers(headers).update(normalize_headers(extra_headers))
+
+
+# Fields of the request tuples passed to the makeRequests function of a backend.
+BATCH_REQUEST_FIELDS = ('method', 'url', 'body', 'accept', 'contentType', 'headers')
+
+
+def batch_request_arguments(args):
+    """
+    Convert a request tuple, as passed to ``makeRequests``, to keyword
+    arguments of ``makeRequest``. Trailing fields may be omitted.
+
+    :param args: Values of the fields listed in :data:`BATCH_REQUEST_FIELDS`.
+    :type args: tuple
+    :rtype: dict
+    """
+    if len(args) > len(BATCH_REQUEST_FIELDS):
+        raise ValueError('Invalid batch request: %r' % (args,))
+    return dict(zip(BATCH_REQUEST_FIELDS, args))
@@ -37,6 +37,11 @@ def encode_ntriple_string(string):
     if not isinstance(string, unicode):
         string = unicode(string, 'utf-8')
 
+    # Most strings need no escaping. Each 'in' test is a fast
+    # C-level scan, much cheaper than a replace() or translate() pass.
+    if '\\' not in string and '\n' not in string \
+            and '\r' not in string and '"' not in string:
+        return string
     for char, replacement in ESCAPES:
         string = string.replace(char, replacement)
     return string
@@ -82,6 +87,69 @@ def ntriples_unescape(text):
     """
     if text is None:
         return None
+    # Most strings contain no escapes at all.
+    if '\\' not in text:
+        return text
+    try:
+        ascii_text = text.encode('ascii')
+    except UnicodeEncodeError:
+        return _unescape(text)
+    # For ASCII text Python's own escape decoder is the fastest option,
+    # it understands the same superset of escapes as literal_eval.
+    try:
+        return ascii_text.decode('unicode_escape')
+    except UnicodeDecodeError:
+        # Let literal_eval report the error.
+        return _literal_eval_unescape(text)
+
+
+def _unescape(text):
+    """
+    Decode N-Triples escape sequences in a string that might contain
+    characters that cannot be passed to the ``unicode_escape`` codec.
+    """
+    pieces = []
+    pos = 0
+    while True:
+        escape = text.find('\\', pos)
+        if escape < 0:
+            pieces.append(text[pos:])
+            return ''.join(pieces)
+        pieces.append(text[pos:escape])
+        kind = text[escape + 1:escape + 2]
+        if kind in _simple_escapes:
+            pieces.append(_simple_escapes[kind])
+            pos = escape + 2
+            continue
+        digits = _unicode_escape_lengths.get(kind)
+        hex_digits = text[escape + 2:escape + 2 + digits] if digits else ''
+        if not digits or len(hex_digits) != digits or not _hex_digits.match(hex_digits):
+            # Not an N-Triples escape - let Python deal with it
+            # (it knows about things like octal escapes).
+            return _literal_eval_unescape(text)
+        code = int(hex_digits, 16)
+        if code > sys.maxunicode:
+            return _literal_eval_unescape(text)
+        pieces.append(chr(code))
+        pos = escape + 2 + digits
+
+
+# Escape sequences that map to a single character.
+_simple_escapes = {
+    't': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f',
+    '"': '"', "'": "'", '\\': '\\',
+}
+
+# Number of hex digits that follow \u and \U.
+_unicode_escape_lengths = {'u': 4, 'U': 8}
+
+_hex_digits = re.compile(r'[0-9A-Fa-f]+\Z')
+
+
+def _literal_eval_unescape(text):
+    """
+    Decode escape sequences by treating text as a Python string literal.
+    """
     return ast.literal_eval(u'u"' + text + u'"')
 
 
@@ -90,13 +158,9 @@ def uriref(string):
     If `string` is a valid NTriples URI reference, extract and return the URI (as a string).
     Otherwise return `None`.
     """
-    match = uriref.pattern.match(string)
-    if not match:
+    if len(string) < 2 or string[0] != '<' or string[-1] != '>':
         return None
-    return ntriples_unescape(match.group(1))
-
-uri_pattern = r'<(.*)>'
-uriref.pattern = re.compile(uri_pattern + '$')
+    return ntriples_unescape(string[1:-1])
 
 
 def nodeid(string):
@@ -118,15 +182,21 @@ def literal(string):
     Use `None` if there is no language tag or no datatype.
     If `string` is not a valid literal return `None`.
     """
-    match = literal.pattern.match(string)
-    if not match:
+    # Language tags and datatypes cannot contain quotes (in a datatype
+    # a quote would have to be escaped as \u0022), so the last quote
+    # must be the one that ends the label.
+    end = string.rfind('"')
+    if end <= 0 or string[0] != '"':
         return None
-    label, lang, dtype = match.groups()
-    return ntriples_unescape(label), ntriples_unescape(dtype), lang
-
-litvalue = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
-litinfo = r'(?:@([a-z]+(?:-[a-z0-9]+)*)|\^\^' + uri_pattern + r')?'
-literal.pattern = re.compile(litvalue + litinfo + '$')
+    label = ntriples_unescape(string[1:end])
+    if end == len(string) - 1:
+        return label, None, None
+    marker = string[end + 1]
+    if marker == '@' and end + 2 < len(string):
+        return label, None, string[end + 2:]
+    if marker == '^' and string.startswith('^^<', end + 1) and string[-1] == '>':
+        return label, ntriples_unescape(string[end + 4:-1]), None
+    return None
 
 
 def to_bytes(text):
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""
+Usage: json_codecs.py [--rows N] [--repeat N]
+
+Compare the JSON libraries supported by franz.miniclient.agjson on
+typical AllegroGraph payloads: a SELECT query result (decoded from
+bytes, as received from the server) and an array of quads (encoded,
+as sent by addStatements).
+
+Libraries that are not installed are skipped. No server is needed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import sys
+import timeit
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.miniclient import agjson
+
+
+def select_result(rows):
+    return {
+        'names': ['s', 'label', 'count', 'date'],
+        'values': [['<http://example.com/resource/%d>' % i,
+                    '"Label number %d \\u00e9"@en' % i,
+                    '"%d"^^<http://www.w3.org/2001/XMLSchema#integer>' % i,
+                    '"2017-01-01T00:00:%02dZ"^^<http://www.w3.org/2001/XMLSchema#dateTime>' % (i % 60)]
+                   for i in range(rows)]}
+
+
+def quads(rows):
+    return [['<http://example.com/resource/%d>' % i,
+             '<http://example.com/property/%d>' % (i % 20),
+             '"A plain string literal %d"' % i,
+             '<http://example.com/graph>' if i % 2 else None]
+            for i in range(rows)]
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--rows', type='int', default=100000,
+                      help='number of rows in each payload [default=%default]')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='number of timing runs, the best is reported [default=%default]')
+    options, _args = parser.parse_args()
+
+    result = select_result(options.rows)
+    result_bytes = agjson.encode_json(result).encode('utf-8')
+    quad_list = quads(options.rows)
+
+    for name in agjson.JSON_CODECS:
+        try:
+            agjson.set_json_codec(name)
+        except ImportError:
+            print('%-10s not installed' % name)
+            continue
+        assert agjson.decode_json(result_bytes) == result
+        assert agjson.decode_json(agjson.encode_json(quad_list)) == quad_list
+        decode = min(timeit.repeat(lambda: agjson.decode_json(result_bytes),
+                                   number=1, repeat=options.repeat))
+        encode = min(timeit.repeat(lambda: agjson.encode_json(quad_list),
+                                   number=1, repeat=options.repeat))
+        print('%-10s decode SELECT: %.3fs  encode quads: %.3fs' % (name, decode, encode))
+
+
+if __name__ == '__main__':
+    main()
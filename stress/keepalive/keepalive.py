@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""
+Usage: keepalive.py [--queries N] [--max-connects N]
+
+Measure the number of TCP (and TLS) handshakes needed to run a number of
+queries whose results are streamed to a file (``output=``) using the
+curl backend. With keep-alive working this should be a small constant
+(one connection per thread), not one connection per query.
+
+The script exits with a non-zero status if the number of handshakes
+per 1000 queries exceeds --max-connects.
+
+Connection parameters are read from the following environment variables:
+AGRAPH_HOST [default=localhost]
+AGRAPH_PORT [default=10035]
+AGRAPH_USER [default=test]
+AGRAPH_PASSWORD [default=xyzzy]
+AGRAPH_CATALOG [default=root catalog]
+AGRAPH_REPOSITORY [default=keepalive]
+"""
+
+from __future__ import division
+from __future__ import print_function
+
+import io
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.miniclient import request
+from franz.miniclient.backends.curl import Pool
+from franz.openrdf.connect import ag_connect
+from franz.openrdf.rio.tupleformat import TupleFormat
+
+AG_HOST = os.environ.get('AGRAPH_HOST', 'localhost')
+AG_PORT = int(os.environ.get('AGRAPH_PORT', '10035'))
+AG_USER = os.environ.get('AGRAPH_USER', 'test')
+AG_PASSWORD = os.environ.get('AGRAPH_PASSWORD', 'xyzzy')
+AG_CATALOG = os.environ.get('AGRAPH_CATALOG')
+AG_REPOSITORY = os.environ.get('AGRAPH_REPOSITORY', 'keepalive')
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--queries', type='int', default=1000,
+                      help='number of streamed queries [default=%default]')
+    parser.add_option('--max-connects', type='int', default=10,
+                      help='maximum handshakes per 1000 queries [default=%default]')
+    options, _args = parser.parse_args()
+    if request.backend.__name__ != 'franz.miniclient.backends.curl':
+        parser.error('the curl backend is not in use (is pycurl installed?)')
+
+    with ag_connect(AG_REPOSITORY, catalog=AG_CATALOG, host=AG_HOST, port=AG_PORT,
+                    user=AG_USER, password=AG_PASSWORD) as conn:
+        conn.addData('<ex://s> <ex://p> <ex://o> .')
+        query = conn.prepareTupleQuery(query='SELECT * { ?s ?p ?o }')
+        pool = Pool.instance()
+        connects = pool.stats()['connects']
+        start = time.time()
+        for _ in range(options.queries):
+            query.evaluate(output=io.BytesIO(), output_format=TupleFormat.CSV)
+        elapsed = time.time() - start
+        connects = pool.stats()['connects'] - connects
+
+    per_1000 = connects * 1000 / options.queries
+    print('queries: %d, time: %.2fs, handshakes: %d (%.1f per 1000 queries)'
+          % (options.queries, elapsed, connects, per_1000))
+    if per_1000 > options.max_connects:
+        print('FAIL: more than %d handshakes per 1000 queries' % options.max_connects)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+
+"""
+Usage: codec.py [--size N] [--repeat N]
+
+Micro-benchmark of the stored procedure codec (serialize + encode for
+arguments, decode + deserialize for results) with a vector of N
+integers, a byte vector of N bytes and a vector of N / 10 strings,
+compared with the previous implementation (included below for
+reference). Requires Python 3.
+
+No server is needed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import array
+import os
+import sys
+import timeit
+from itertools import islice
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.miniclient.request import SerialConstants, decode, deserialize, encode, serialize
+
+
+# The previous implementation
+
+def old_serialize(obj):
+    def serialize_int(i):
+        i = abs(i)
+
+        def int_bytes(i):
+            rest = True
+            while rest:
+                lower = i & 0x7f
+                rest = i >> 7
+                yield lower | (0x80 if rest else 0)
+                i = rest
+
+        return bytes(int_bytes(i))
+
+    if obj is None:
+        return bytes([SerialConstants.SO_NULL])
+
+    if isinstance(obj, str):
+        return b''.join([bytes([SerialConstants.SO_STRING]), serialize_int(len(obj)),
+                         obj.encode('utf-8')])
+
+    if isinstance(obj, int):
+        return b''.join([bytes([SerialConstants.SO_POS_INTEGER]) if obj >= 0 else
+                         bytes([SerialConstants.SO_NEG_INTEGER]), serialize_int(obj)])
+
+    iobj = iter(obj)
+    return b''.join([bytes([SerialConstants.SO_VECTOR]),
+                     serialize_int(len(obj)),
+                     b''.join([old_serialize(elem) for elem in iobj])])
+
+
+def old_deserialize(string):
+    def posInteger(chars):
+        result = shift = 0
+        value = 0x80
+        while value & 0x80:
+            value = next(chars)
+            result += ((value & 0x7f) << shift)
+            shift += 7
+        return result
+
+    chars = iter(string)
+    value = next(chars)
+
+    if value == SerialConstants.SO_BYTEVECTOR:
+        length = posInteger(chars)
+        return array.array('b', bytes(islice(chars, 0, length)))
+
+    if value == SerialConstants.SO_VECTOR or value == SerialConstants.SO_LIST:
+        length = posInteger(chars)
+        return [old_deserialize(chars) for i in range(length)]
+
+    if value == SerialConstants.SO_STRING:
+        length = posInteger(chars)
+        return bytes(islice(chars, 0, length)).decode('utf-8')
+
+    if value == SerialConstants.SO_POS_INTEGER:
+        return posInteger(chars)
+
+    if value == SerialConstants.SO_NEG_INTEGER:
+        return - posInteger(chars)
+
+    return None
+
+
+OLD_CODES = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789*+"
+OLD_DECODE_CODES = [0] * 256
+for index, code in enumerate(OLD_CODES):
+    OLD_DECODE_CODES[code] = index
+
+
+def old_encode(string):
+    def convert(string):
+        codes = OLD_CODES
+        state = rem = 0
+        for byte in string:
+            if state == 0:
+                yield codes[byte & 0x3f]
+                rem = (byte >> 6) & 0x3
+                state = 1
+            elif state == 1:
+                yield codes[((byte & 0xf) << 2) | rem]
+                rem = (byte >> 4) & 0xf
+                state = 2
+            else:
+                yield codes[((byte & 0x3) << 4) | rem]
+                yield codes[((byte >> 2) & 0x3f)]
+                state = 0
+        if state:
+            yield codes[rem]
+
+    return bytes(convert(string))
+
+
+def old_decode(string):
+    def convert(string):
+        codes = OLD_DECODE_CODES
+        state = rem = 0
+        for byte in string:
+            byte = codes[byte]
+            if state == 0:
+                rem = byte
+                state = 1
+            elif state == 1:
+                yield rem | ((byte & 0x3) << 6)
+                rem = byte >> 2
+                state = 2
+            elif state == 2:
+                yield rem | ((byte & 0xf) << 4)
+                rem = byte >> 4
+                state = 3
+            else:
+                yield rem | (byte << 2)
+                state = 0
+
+    return bytes(convert(string))
+
+
+def sample_values(size):
+    return (
+        ('integers', [[i * 7919 - size for i in range(size)]]),
+        # The previous implementation sent byte vectors as vectors of
+        # integers on Python 3, but could not read them back.
+        ('bytes', [array.array('b', bytes(range(128)) * (size // 128))]),
+        ('strings', [['String number %d' % i for i in range(size // 10)]]),
+    )
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--size', type='int', default=1000000,
+                      help='number of vector elements [default=%default]')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='number of timing runs, the best is reported [default=%default]')
+    options, _args = parser.parse_args()
+
+    implementations = (
+        ('old', old_serialize, old_encode, old_decode, old_deserialize),
+        ('new', serialize, encode, decode, deserialize),
+    )
+    for case, value in sample_values(options.size):
+        text = encode(serialize(value))
+        assert text == old_encode(old_serialize(value)) or case == 'bytes'
+        assert deserialize(decode(text)) == value
+        for name, ser, enc, dec, deser in implementations:
+            args = min(timeit.repeat(lambda: enc(ser(value)), number=1, repeat=options.repeat))
+            result = min(timeit.repeat(lambda: deser(dec(text)), number=1, repeat=options.repeat))
+            print('%-8s %s: arguments %.3fs, result %.3fs (%d bytes encoded)'
+                  % (case, name, args, result, len(text)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""
+Usage: literal_memory.py [--rows N]
+
+Measure the memory used by Literal objects parsed from typical query
+result cells (typed, language tagged and plain literals), excluding
+the labels themselves. Requires Python 3 (uses tracemalloc).
+
+No server is needed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import sys
+import time
+import tracemalloc
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.openrdf.model import configure_term_cache, parse_term
+from franz.openrdf.util import strings
+
+
+def sample_cells(rows):
+    cells = []
+    for i in range(rows):
+        cells.extend([
+            '"%d"^^<http://www.w3.org/2001/XMLSchema#integer>' % i,
+            '"%d.5"^^<http://www.w3.org/2001/XMLSchema#double>' % i,
+            '"2017-01-01T00:00:%02dZ"^^<http://www.w3.org/2001/XMLSchema#dateTime>' % (i % 60),
+            '"Label number %d"@en' % i,
+            '"A plain string literal %d"' % i,
+        ])
+    return cells
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--rows', type='int', default=20000,
+                      help='number of groups of sample literals [default=%default]')
+    options, _args = parser.parse_args()
+
+    # Measure distinct objects, not cache hits.
+    configure_term_cache(size=0)
+    cells = sample_cells(options.rows)
+
+    tracemalloc.start()
+    labels = [strings.literal(cell)[0] for cell in cells]
+    label_bytes = tracemalloc.get_traced_memory()[0]
+    del labels
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.time()
+    literals = [parse_term(cell) for cell in cells]
+    elapsed = time.time() - start
+    total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print('%d literals: %.2f us/literal, %.0f bytes/literal (excluding labels)'
+          % (len(literals), elapsed * 1e6 / len(literals),
+             (total - label_bytes) / len(literals)))
+
+
+if __name__ == '__main__':
+    main()
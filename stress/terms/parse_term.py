@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""
+Usage: parse_term.py [--rows N] [--repeat N]
+
+Micro-benchmark of N-Triples term parsing (franz.openrdf.model.parse_term)
+on terms typical of query results, compared with the previous
+implementation based on regular expressions and ast.literal_eval
+(included below for reference).
+
+No server is needed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import ast
+import os
+import re
+import sys
+import timeit
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.openrdf.model import BNode, Literal, URI, parse_term
+
+
+# The previous implementation
+
+def old_ntriples_unescape(text):
+    if text is None:
+        return None
+    return ast.literal_eval(u'u"' + text + u'"')
+
+
+old_uri_pattern = r'<(.*)>'
+old_uriref_pattern = re.compile(old_uri_pattern + '$')
+old_literal_pattern = re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"' +
+                                 r'(?:@([a-z]+(?:-[a-z0-9]+)*)|\^\^' + old_uri_pattern + r')?' + '$')
+old_nodeid_pattern = re.compile(r'_:([A-Za-z][A-Za-z0-9]*)$')
+
+
+def old_uriref(string):
+    match = old_uriref_pattern.match(string)
+    if not match:
+        return None
+    return old_ntriples_unescape(match.group(1))
+
+
+def old_literal(string):
+    match = old_literal_pattern.match(string)
+    if not match:
+        return None
+    label, lang, dtype = match.groups()
+    return old_ntriples_unescape(label), old_ntriples_unescape(dtype), lang
+
+
+def old_parse_term(string_term):
+    if not string_term:
+        return string_term
+    if string_term.startswith('<'):
+        return URI(old_uriref(string_term))
+    elif string_term.startswith('"'):
+        return Literal(*old_literal(string_term))
+    elif string_term.startswith('_'):
+        return BNode(old_nodeid_pattern.match(string_term).group(1))
+    elif string_term.startswith('default-graph'):
+        return None
+    return Literal(string_term)
+
+
+def sample_terms(rows):
+    terms = []
+    for i in range(rows):
+        terms.extend([
+            '<http://example.com/resource/%d>' % i,
+            '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>',
+            '"%d"^^<http://www.w3.org/2001/XMLSchema#integer>' % i,
+            '"Label number %d"@en' % i,
+            '"A plain string literal %d"' % i,
+            '"Line one\\nLine \\"two\\" \\u00e9 %d"' % i,
+            '_:b%d' % i,
+        ])
+    return terms
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--rows', type='int', default=10000,
+                      help='number of groups of sample terms [default=%default]')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='number of timing runs, the best is reported [default=%default]')
+    options, _args = parser.parse_args()
+
+    terms = sample_terms(options.rows)
+    for term in terms:
+        assert parse_term(term) == old_parse_term(term), term
+
+    results = {}
+    for name, function in (('old', old_parse_term), ('new', parse_term)):
+        best = min(timeit.repeat(lambda: [function(term) for term in terms],
+                                 number=1, repeat=options.repeat))
+        results[name] = best
+        print('%s: %.3fs for %d terms (%.2f us/term)'
+              % (name, best, len(terms), best * 1e6 / len(terms)))
+    print('speedup: %.2fx' % (results['old'] / results['new']))
+
+
+if __name__ == '__main__':
+    main()
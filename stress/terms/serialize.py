@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+Usage: serialize.py [--literals N] [--repeat N]
+
+Micro-benchmark of N-Triples serialization (Literal.toNTriples) of
+a mix of plain, language tagged, typed and escaped literals,
+compared with the previous implementation (included below for
+reference). Each literal is serialized once, as in addTriples.
+
+No server is needed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import sys
+import timeit
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.openrdf.model import Literal
+from franz.openrdf.util import strings
+from franz.openrdf.vocabulary.xmlschema import XMLSchema
+
+
+# The previous implementation
+
+OLD_ESCAPES = [('\\', r'\\'), ('\n', r'\n'), ('\r', r'\r'), ('"', r'\"')]
+
+
+def old_encode_ntriple_string(string):
+    for char, replacement in OLD_ESCAPES:
+        string = string.replace(char, replacement)
+    return string
+
+
+def old_to_ntriples(literal):
+    sb = []
+    sb.append('"')
+    sb.append(old_encode_ntriple_string(literal.getLabel()))
+    sb.append('"')
+    if literal.language:
+        sb.append('@')
+        sb.append(literal.language)
+    if literal.datatype:
+        sb.append("^^")
+        sb.append(strings.encode_ntriple_uri(literal.datatype.uri))
+    return ''.join(sb)
+
+
+def sample_literals(count):
+    literals = []
+    for i in range(count // 5):
+        literals.extend([
+            Literal('A plain string literal %d' % i),
+            Literal('Label number %d' % i, language='en'),
+            Literal(i),
+            Literal('%d.5' % i, datatype=XMLSchema.DOUBLE),
+            Literal('Line one\nLine "two" é %d' % i),
+        ])
+    return literals
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--literals', type='int', default=1000000,
+                      help='number of literals [default=%default]')
+    parser.add_option('--repeat', type='int', default=3,
+                      help='number of timing runs, the best is reported [default=%default]')
+    options, _args = parser.parse_args()
+
+    results = {}
+    for name, function in (('old', old_to_ntriples), ('new', Literal.toNTriples)):
+        def run():
+            # Fresh objects, so that cached N-Triples strings are not reused.
+            literals = sample_literals(options.literals)
+            start = timeit.default_timer()
+            for literal in literals:
+                function(literal)
+            return timeit.default_timer() - start
+        best = min(run() for _ in range(options.repeat))
+        results[name] = best
+        print('%s: %.3fs for %d literals (%.3f us/literal)'
+              % (name, best, options.literals, best * 1e6 / options.literals))
+    print('speedup: %.2fx' % (results['old'] / results['new']))
+
+    literals = sample_literals(options.literals)
+    for literal in literals:
+        assert literal.toNTriples() == old_to_ntriples(literal), literal
+
+
+if __name__ == '__main__':
+    main()
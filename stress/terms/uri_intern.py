@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+"""
+Usage: uri_intern.py [--uris N] [--repeat N]
+
+Micro-benchmark of URI construction: interned (canonical) URIs that
+already exist, new canonical URIs, URIs built from a namespace and
+a local name and non-canonical URIs.
+
+No server is needed.
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import sys
+import timeit
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../src'))
+
+from franz.openrdf.model import URI
+
+try:
+    from franz.openrdf.model import uri_intern_stats
+except ImportError:
+    uri_intern_stats = None
+
+
+def main():
+    parser = OptionParser(usage=__doc__)
+    parser.add_option('--uris', type='int', default=100000,
+                      help='number of distinct URIs [default=%default]')
+    parser.add_option('--repeat', type='int', default=5,
+                      help='number of timing runs, the best is reported [default=%default]')
+    options, _args = parser.parse_args()
+
+    namespace = 'http://example.com/resource/'
+    texts = [namespace + str(i) for i in range(options.uris)]
+    names = [str(i) for i in range(options.uris)]
+    interned = [URI(text) for text in texts]
+
+    cases = (
+        ('existing', lambda: [URI(text) for text in texts]),
+        ('new', lambda: [URI(text + '/new') for text in texts]),
+        ('namespace', lambda: [URI(namespace=namespace, localname=name) for name in names]),
+        ('non-canonical', lambda: [URI(text, canonical=False) for text in texts]),
+    )
+    for name, function in cases:
+        best = min(timeit.repeat(function, number=1, repeat=options.repeat))
+        print('%-14s %.3fs for %d URIs (%.3f us/URI)'
+              % (name + ':', best, len(texts), best * 1e6 / len(texts)))
+    del interned
+
+    if uri_intern_stats is not None:
+        print('intern table: %s' % uri_intern_stats())
+
+
+if __name__ == '__main__':
+    main()